@@ -1,15 +1,20 @@
+import contextlib
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+
 import streamlit as st
-import matplotlib
-
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import math
-import numpy as np
-import io
-import base64
 import streamlit.components.v1 as components
 
+from beam_calc import BAR_INFO, ENGINEERING_KEYS, process_calculation
+from beam_report import (PENDING_SECTION, generate_full_html_report, harvest_report_sections,
+                         submit_report_sections)
+from instrument import Trace, profile_call
+from result_cache import cached_process_calculation
+
+# the optional features (NumPy, fpdf, sqlite) are imported in the branches that use them
+SWEEP_FIELDS = ENGINEERING_KEYS  # sweep.SWEEP_FIELDS
+
 # ==========================================
 # 1. SETUP & CSS
 # ==========================================
@@ -51,472 +56,20 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# ==========================================
-# 2. DATABASE & HELPER
-# ==========================================
-BAR_INFO = {
-    'RB6': {'A_cm2': 0.283, 'd_mm': 6},
-    'RB9': {'A_cm2': 0.636, 'd_mm': 9},
-    'DB10': {'A_cm2': 0.785, 'd_mm': 10},
-    'DB12': {'A_cm2': 1.131, 'd_mm': 12},
-    'DB16': {'A_cm2': 2.011, 'd_mm': 16},
-    'DB20': {'A_cm2': 3.142, 'd_mm': 20},
-    'DB25': {'A_cm2': 4.909, 'd_mm': 25},
-    'DB28': {'A_cm2': 6.158, 'd_mm': 28}
-}
-
-
-def fmt(n, digits=3):
-    try:
-        val = float(n)
-        if math.isnan(val): return "-"
-        return f"{val:,.{digits}f}"
-    except:
-        return "-"
-
-
-# ==========================================
-# 3. CALCULATION LOGIC (DETAILED)
-# ==========================================
-def beta1FromFc(fc_MPa):
-    if fc_MPa <= 28: return 0.85
-    b1 = 0.85 - 0.05 * ((fc_MPa - 28) / 7)
-    return max(0.65, b1)
-
-
-def phiFlexureFromStrain(eps_t):
-    if eps_t <= 0.002: return 0.65
-    if eps_t >= 0.005: return 0.90
-    return 0.65 + (eps_t - 0.002) * (0.25 / 0.003)
-
-
-def flexureSectionResponse(As_mm2, fc_MPa, fy_MPa, bw_mm, d_mm, Es=200000, eps_cu=0.003):
-    beta1 = beta1FromFc(fc_MPa)
-    fs = fy_MPa
-    a = (As_mm2 * fs) / (0.85 * fc_MPa * bw_mm) if fc_MPa > 0 else 0
-    c = a / beta1 if beta1 > 0 else 0
-
-    for i in range(50):
-        if c <= 0.1: c = 0.1
-        eps_t = eps_cu * (d_mm - c) / c
-        fs_new = min(fy_MPa, Es * eps_t)
-        fs_new = max(fs_new, -fy_MPa)
-        a_new = (As_mm2 * fs_new) / (0.85 * fc_MPa * bw_mm)
-        if abs(fs_new - fs) < 0.1 and abs(a_new - a) < 0.1:
-            fs = fs_new;
-            a = a_new;
-            break
-        fs = fs_new;
-        a = a_new;
-        c = a / beta1
-
-    c = a / beta1
-    eps_t = eps_cu * (d_mm - c) / c if c > 0 else 0.005
-    phi = phiFlexureFromStrain(eps_t)
-
-    T = As_mm2 * fs
-    Mn = T * (d_mm - a / 2.0)
-    phiMn = phi * Mn
-
-    return {'phi': phi, 'phiMn': phiMn, 'eps_t': eps_t, 'Mn': Mn}
-
-
-def solve_required_as(Mu_Nmm, As_min, As_max, fc, fy, bw, d):
-    As_lo = As_min
-    As_hi = As_lo
-    for _ in range(30):
-        r = flexureSectionResponse(As_hi, fc, fy, bw, d)
-        if r['phiMn'] >= Mu_Nmm: break
-        As_hi *= 1.3
-        if As_hi > As_max: As_hi = As_max; break
-    for _ in range(50):
-        As_mid = 0.5 * (As_lo + As_hi)
-        r = flexureSectionResponse(As_mid, fc, fy, bw, d)
-        if r['phiMn'] >= Mu_Nmm:
-            As_hi = As_mid
-        else:
-            As_lo = As_mid
-    return As_hi
-
-
-def process_calculation(inputs):
-    rows = []
-
-    def sec(title):
-        rows.append(["SECTION", title, "", "", "", "", ""])
-
-    def row(item, formula, subs, result, unit, status=""):
-        rows.append([item, formula, subs, result, unit, status])
-
-    b_cm = inputs['b'];
-    h_cm = inputs['h'];
-    cover_cm = inputs['cover']
-    bw = b_cm * 10;
-    h = h_cm * 10;
-    cover = cover_cm * 10
-    agg_mm = inputs['agg']
-
-    fc_ksc = inputs['fc'];
-    fy_ksc = inputs['fy'];
-    fyt_ksc = inputs['fyt']
-    ksc_to_MPa = 0.0980665
-    fc_MPa = fc_ksc * ksc_to_MPa
-    fy_MPa = fy_ksc * ksc_to_MPa
-    fyt_MPa = fyt_ksc * ksc_to_MPa
-
-    barKey = inputs['mainBar']
-    stirKey = inputs['stirrupBar']
-    db_main = BAR_INFO[barKey]['d_mm']
-    db_st = BAR_INFO[stirKey]['d_mm']
-
-    d = h - cover - db_st - (db_main / 2.0)
-
-    # 1. MATERIALS
-    sec("1. MATERIAL & SECTION PARAMETERS")
-    row("Concrete & Steel", "fc', fy, fyt", f"fc'={fmt(fc_MPa, 2)} MPa, fy={fmt(fy_MPa, 0)} MPa", "-", "-")
-    row("Section (b x h)", "-", f"{fmt(bw, 0)} x {fmt(h, 0)}", "-", "mm")
-    row("Effective depth d", "d = h - cover - db(st) - db/2",
-        f"{fmt(h, 0)} - {fmt(cover, 0)} - {fmt(db_st, 0)} - {fmt(db_main / 2, 1)}", f"{fmt(d, 1)}", "mm")
-
-    beta1 = beta1FromFc(fc_MPa)
-    row("β1", "ACI 318-19", f"fc'={fmt(fc_MPa, 2)} MPa", f"{fmt(beta1, 2)}", "-")
-
-    term1 = 0.25 * math.sqrt(fc_MPa) / fy_MPa
-    term2 = 1.4 / fy_MPa
-    rho_min = max(term1, term2)
-    As_min = rho_min * bw * d
-    row("As,min", "max(0.25√fc'/fy, 1.4/fy) bw·d", f"max({fmt(term1, 5)}, {fmt(term2, 5)})·{fmt(bw, 0)}·{fmt(d, 0)}",
-        f"{fmt(As_min, 0)}", "mm²")
-
-    Es = 200000;
-    eps_cu = 0.003;
-    eps_y = fy_MPa / Es
-    rho_bal = 0.85 * beta1 * (fc_MPa / fy_MPa) * (eps_cu / (eps_cu + eps_y))
-    As_max = 0.75 * rho_bal * bw * d
-
-    # 2. FLEXURE
-    sec("2. FLEXURE DESIGN")
-    MuCases = [
-        {'key': "L_TOP", 't': "Left (Top) Mu(-)", 'v': inputs['mu_L_n']},
-        {'key': "L_BOT", 't': "Left (Bot) Mu(+)", 'v': inputs['mu_L_p']},
-        {'key': "M_TOP", 't': "Mid (Top) Mu(-)", 'v': inputs['mu_M_n']},
-        {'key': "M_BOT", 't': "Mid (Bot) Mu(+)", 'v': inputs['mu_M_p']},
-        {'key': "R_TOP", 't': "Right (Top) Mu(-)", 'v': inputs['mu_R_n']},
-        {'key': "R_BOT", 't': "Right (Bot) Mu(+)", 'v': inputs['mu_R_p']}
-    ]
-    bar_counts = {}
-
-    for case in MuCases:
-        title = case['t']
-        Mu_tfm = case['v']
-        key = case['key']
-
-        row(f"{title}: Mu", "-", "-", f"{fmt(Mu_tfm, 3)}", "tf-m", "")
-
-        if Mu_tfm <= 0.001:
-            bar_counts[key] = 2
-            continue
-
-        Mu_Nmm = Mu_tfm * 9806650.0
-        As_req = solve_required_as(Mu_Nmm, As_min, As_max, fc_MPa, fy_MPa, bw, d)
-        row(f"{title}: As,req", "Solve φMn(As) ≥ Mu", f"As_min={fmt(As_min, 0)}", f"{fmt(As_req, 0)}", "mm²")
-
-        bar_area = BAR_INFO[barKey]['A_cm2'] * 100
-        n = math.ceil(As_req / bar_area)
-        if n < 2: n = 2
-        As_prov = n * bar_area
-        bar_counts[key] = n
-
-        row(f"{title}: Provide", f"Use {barKey} (As={fmt(bar_area, 0)})", f"Req: {fmt(As_req, 0)}",
-            f"{n}-{barKey} ({fmt(As_prov, 0)})", "mm²", "OK")
-
-        res = flexureSectionResponse(As_prov, fc_MPa, fy_MPa, bw, d)
-        phiMn_kNm = res['phiMn'] / 1e6
-        Mu_kNm = Mu_Nmm / 1e6
-
-        row(f"{title}: φ (Strain)", "φ = f(εt)", f"εt = {fmt(res['eps_t'], 4)}", f"{fmt(res['phi'], 2)}", "-")
-        status_str = "PASS" if res['phiMn'] >= Mu_Nmm else "FAIL"
-        row(f"{title}: Check Strength", "φMn ≥ Mu", f"{fmt(phiMn_kNm, 2)} ≥ {fmt(Mu_kNm, 2)} kNm", status_str, "-",
-            status_str)
-
-        usable_width = bw - 2 * (cover + db_st)
-        clear_spacing = (usable_width - n * db_main) / (n - 1) if n > 1 else usable_width - db_main
-        req_clr = max(db_main, 25.0, 4 / 3 * agg_mm)
-        status_clr = "PASS" if clear_spacing >= req_clr - 1 else "FAIL"
-        row(f"{title}: Clear Spacing", "s_clr ≥ max(db, 25, 4/3 agg)", f"{fmt(clear_spacing, 1)} ≥ {fmt(req_clr, 1)}",
-            status_clr, "mm", status_clr)
-
-    # 3. SHEAR
-    sec("3. SHEAR DESIGN")
-    Vc_N = 0.17 * math.sqrt(fc_MPa) * bw * d
-    Vc_tf = Vc_N / 9806.65
-    row("Vc", "0.17√fc' bw·d", f"0.17·√{fmt(fc_MPa, 1)}·{fmt(bw, 0)}·{fmt(d, 0)}", f"{fmt(Vc_tf, 3)}", "tf")
-
-    phi_v = 0.75
-    phiVc_tf = phi_v * Vc_tf
-    row("φVc", "0.75 · Vc", f"0.75 · {fmt(Vc_tf, 3)}", f"{fmt(phiVc_tf, 3)}", "tf")
-
-    Av = 2 * BAR_INFO[stirKey]['A_cm2'] * 100
-    row("Stirrup Av", f"2-leg {stirKey}", "-", f"{fmt(Av, 1)}", "mm²")
-
-    term1_v = 0.062 * math.sqrt(fc_MPa) * bw / fyt_MPa
-    term2_v = 0.35 * bw / fyt_MPa
-    Av_per_s_min = max(term1_v, term2_v)
-    s_max_Av_min = Av / Av_per_s_min
-    row("s(Av,min)", "Av / max(0.062√fc' bw/fyt, 0.35 bw/fyt)", f"{fmt(Av, 1)} / {fmt(Av_per_s_min, 2)}",
-        f"{fmt(s_max_Av_min, 0)}", "mm")
-
-    VuCases = [
-        {'key': "V_L", 't': "Left", 'v': inputs['vu_L']},
-        {'key': "V_M", 't': "Mid", 'v': inputs['vu_M']},
-        {'key': "V_R", 't': "Right", 'v': inputs['vu_R']}
-    ]
-    shear_res = {}
-
-    for case in VuCases:
-        loc = case['t']
-        Vu_tf = case['v']
-        row(f"{loc}: Vu", "-", "-", f"{fmt(Vu_tf, 3)}", "tf", "")
-
-        Vu_N = Vu_tf * 9806.65
-        phiVc_N = phiVc_tf * 9806.65
-        needVs = Vu_N > phiVc_N
-
-        Vs_req_tf = 0
-        if needVs:
-            Vs_req_N = (Vu_N / phi_v) - Vc_N
-            Vs_req_tf = Vs_req_N / 9806.65
-            row(f"{loc}: Vs,req", "Vu/φ - Vc", f"{fmt(Vu_tf, 3)}/0.75 - {fmt(Vc_tf, 3)}", f"{fmt(Vs_req_tf, 3)}", "tf")
-        else:
-            row(f"{loc}: Vs,req", "Vu ≤ φVc", "-", "0", "tf")
-
-        s_req = 9999
-        if needVs and Vs_req_tf > 0:
-            s_req = (Av * fyt_MPa * d) / (Vs_req_N)
-            row(f"{loc}: s,req", "Av·fyt·d / Vs,req",
-                f"{fmt(Av, 1)}·{fmt(fyt_MPa, 0)}·{fmt(d, 0)} / {fmt(Vs_req_N, 0)}", f"{fmt(s_req, 0)}", "mm")
-
-        limit_high_shear = (Vs_req_tf * 9806.65) > (2 * Vc_N)
-        s_geom_max = min(d / 4, 300) if limit_high_shear else min(d / 2, 600)
-        s_limit = min(s_max_Av_min, s_geom_max)
-        if needVs: s_limit = min(s_limit, s_req)
-
-        s_prov = math.floor(s_limit / 10.0) * 10.0
-        if s_prov < 50: s_prov = 50
-        shear_res[case['key']] = s_prov
-
-        row(f"{loc}: s limit", "min(s_req, s(Av,min), d/2)",
-            f"min({fmt(s_req, 0)}, {fmt(s_max_Av_min, 0)}, {fmt(s_geom_max, 0)})", f"{fmt(s_limit, 0)}", "mm")
-        row(f"{loc}: Provide", f"Use {stirKey}", "-", f"{stirKey} @ {fmt(s_prov / 10, 0)} cm", "-", "OK")
-
-        Vs_prov_N = (Av * fyt_MPa * d) / s_prov
-        phiVn_N = phi_v * (Vc_N + Vs_prov_N)
-        phiVn_tf = phiVn_N / 9806.65
-        status_shear = "PASS" if phiVn_tf >= Vu_tf - 0.05 else "FAIL"
-        row(f"{loc}: Check", "φ(Vc+Vs) ≥ Vu", f"{fmt(phiVn_tf, 2)} ≥ {fmt(Vu_tf, 2)}", status_shear, "tf", status_shear)
-
-    sec("4. FINAL STATUS")
-    row("Overall", "-", "-", "DESIGN COMPLETE", "-", "OK")
-    return rows, bar_counts, shear_res
-
-
-# ==========================================
-# 4. PLOTTING & REPORT GEN
-# ==========================================
-def fig_to_base64(fig):
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png', bbox_inches='tight')
-    buf.seek(0)
-    return f"data:image/png;base64,{base64.b64encode(buf.read()).decode()}"
-
-
-def create_beam_section(b, h, cover, top_n, bot_n, stir_txt, m_db, s_db, title, bar_name):
-    fig, ax = plt.subplots(figsize=(3, 4))
-    rect = patches.Rectangle((0, 0), b, h, linewidth=2, edgecolor='#333', facecolor='#FFF')
-    ax.add_patch(rect)
-    margin = cover + s_db / 20
-    rect_s = patches.Rectangle((margin, margin), b - 2 * margin, h - 2 * margin, linewidth=2, edgecolor='#2E7D32',
-                               facecolor='none', linestyle='-')
-    ax.add_patch(rect_s)
-
-    def draw_row(n, y, color):
-        n = int(n);
-        dia = m_db / 10
-        if n == 1:
-            xs = [b / 2]
-        else:
-            xs = np.linspace(margin + dia / 2, b - margin - dia / 2, n)
-        for x in xs:
-            ax.add_patch(patches.Circle((x, y), radius=dia / 2, edgecolor='black', facecolor=color))
-
-    draw_row(int(top_n or 2), h - margin - m_db / 20, '#1976D2')
-    draw_row(int(bot_n or 2), margin + m_db / 20, '#D32F2F')
-
-    ax.set_xlim(-5, b + 5);
-    ax.set_ylim(-h * 0.2, h * 1.2);
-    ax.axis('off');
-    ax.set_aspect('equal')
-    ax.set_title(title, fontsize=10, fontweight='bold')
-    ax.text(b / 2, h * 1.05, f"{top_n}-{bar_name}", ha='center', color='#1976D2', fontsize=9)
-    ax.text(b / 2, -h * 0.05, f"{bot_n}-{bar_name}", ha='center', color='#D32F2F', fontsize=9)
-    ax.text(b / 2, -h * 0.15, f"Stir: {stir_txt}", ha='center', color='#2E7D32', fontsize=9)
-    return fig
-
-
-def generate_full_html_report(inputs, rows, img_b64_list):
-    table_rows = ""
-    for r in rows:
-        if r[0] == "SECTION":
-            table_rows += f"<tr class='sec-row'><td colspan='6'>{r[1]}</td></tr>"
-        else:
-            status_cls = "pass-ok" if "OK" in r[5] or "PASS" in r[5] else "pass-no"
-            val_cls = "load-value" if r[1] == "-" and (r[4] == "tf-m" or r[4] == "tf") else ""
-            table_rows += f"""
-            <tr>
-                <td>{r[0]}</td>
-                <td>{r[1]}</td>
-                <td>{r[2]}</td>
-                <td class='{val_cls}'>{r[3]}</td>
-                <td>{r[4]}</td>
-                <td class='{status_cls}'>{r[5]}</td>
-            </tr>
-            """
-
-    html = f"""
-    <!DOCTYPE html>
-    <html lang="th">
-    <head>
-        <meta charset="UTF-8">
-        <title>Engineering Design Report</title>
-        <link href="https://fonts.googleapis.com/css2?family=Sarabun:wght@400;700&display=swap" rel="stylesheet">
-        <style>
-            body {{ font-family: 'Sarabun', sans-serif; padding: 20px; -webkit-print-color-adjust: exact; color: black; background: white; }}
-            h1, h3 {{ text-align: center; margin: 5px; }}
-            .header {{ position: relative; margin-bottom: 20px; border-bottom: 2px solid #333; padding-bottom: 10px; }}
-
-            .beam-box {{
-                position: absolute;
-                top: 0;
-                right: 0;
-                border: 2px solid #333;
-                padding: 8px 20px;
-                font-size: 20px;
-                font-weight: bold;
-                background: #fff;
-            }}
-
-            .info-container {{ display: flex; justify-content: space-between; margin-bottom: 20px; }}
-            .info-box {{ width: 48%; border: 1px solid #ddd; padding: 10px; border-radius: 5px; background: #f9f9f9; }}
-            .images {{ display: flex; justify-content: space-around; margin: 20px 0; }}
-            .images img {{ width: 30%; border: 1px solid #ddd; padding: 5px; }}
-
-            table {{ width: 100%; border-collapse: collapse; margin-top: 20px; font-size: 12px; }}
-            th, td {{ border: 1px solid #444; padding: 6px; }}
-            th {{ background-color: #eee; }}
-            .sec-row {{ background-color: #ddd; font-weight: bold; }}
-            .pass-ok {{ color: green; font-weight: bold; text-align: center; }}
-            .pass-no {{ color: red; font-weight: bold; text-align: center; }}
-            .load-value {{ color: #D32F2F !important; font-weight: bold; }}
-
-            .footer-section {{
-                margin-top: 50px;
-                page-break-inside: avoid;
-            }}
-            .signature-block {{
-                width: 300px;
-                text-align: center;
-            }}
-            .sign-line {{
-                border-bottom: 1px solid #000;
-                margin: 40px 0 10px 0;
-                width: 100%;
-            }}
-
-            @media print {{
-                .no-print {{ display: none !important; }}
-                body {{ padding: 0; margin: 0; }}
-                .info-box {{ border: 1px solid #333; }}
-                .load-value {{ color: #D32F2F !important; -webkit-print-color-adjust: exact; }}
-            }}
-
-            .print-btn-internal {{
-                background-color: #4CAF50; color: white; padding: 12px 24px;
-                border: none; border-radius: 5px; cursor: pointer; font-size: 16px;
-                margin-bottom: 20px; font-weight: bold; font-family: 'Sarabun', sans-serif;
-                box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            }}
-            .print-btn-internal:hover {{ background-color: #45a049; }}
-        </style>
-    </head>
-    <body>
-        <div class="no-print" style="text-align: center;">
-            <button onclick="window.print()" class="print-btn-internal">🖨️ Print This Page / พิมพ์หน้านี้</button>
-        </div>
-
-        <div class="header">
-            <div class="beam-box">{inputs['beam_id']}</div>
-            <h1>ENGINEERING DESIGN REPORT</h1>
-            <h3>RC Beam Design SDM</h3>
-        </div>
-
-        <div class="info-container">
-            <div class="info-box">
-                <strong>Project:</strong> {inputs['project']}<br>
-                <strong>Engineer:</strong> {inputs['engineer']}<br>
-                <strong>Date:</strong> 15/12/2568
-            </div>
-            <div class="info-box">
-                <strong>Materials:</strong> fc'={inputs['fc']} ksc, fy={inputs['fy']} ksc<br>
-                <strong>Section:</strong> {inputs['b']} x {inputs['h']} cm, Cover={inputs['cover']} cm
-            </div>
-        </div>
-
-        <h3>Design Summary</h3>
-        <div class="images">
-            <img src="{img_b64_list[0]}" />
-            <img src="{img_b64_list[1]}" />
-            <img src="{img_b64_list[2]}" />
-        </div>
-
-        <br><br><br><br><br><br><br><br><br><br><br><br><br><br><br>
-
-        <h3>Calculation Details</h3>
-        <table>
-            <thead>
-                <tr>
-                    <th width="20%">Item</th>
-                    <th width="30%">Formula</th>
-                    <th width="25%">Substitution</th>
-                    <th>Result</th>
-                    <th>Unit</th>
-                    <th>Status</th>
-                </tr>
-            </thead>
-            <tbody>
-                {table_rows}
-            </tbody>
-        </table>
-
-        <div class="footer-section">
-            <div class="signature-block">
-                <div style="text-align: left; font-weight: bold;">Designed by:</div>
-                <div class="sign-line"></div>
-                <div>({inputs['engineer']})</div>
-                <div>วิศวกรโครงสร้าง</div>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    return html
-
-
 # ==========================================
 # 5. UI MAIN
 # ==========================================
 # --- CHANGED: Main Title ---
 st.title("RC Beam Design SDM")
 
+@st.cache_resource
+def project_store():
+    # one connection for every session; ProjectStore serializes access itself
+    from project_store import ProjectStore
+
+    return ProjectStore(os.environ.get('BEAM_PROJECT_DB', 'projects.db'))
+
+
 if 'calc_done' not in st.session_state:
     st.session_state['calc_done'] = False
 
@@ -525,6 +78,7 @@ with st.sidebar.form("inputs"):
     project_name = st.text_input("Project Name", value="อาคารสำนักงาน 2 ชั้น")
     beam_id = st.text_input("Beam Number", value="B-01")
     engineer_name = st.text_input("Engineer Name", value="นายไกรฤทธิ์ ด่านพิทักษ์")
+    save_beam = st.checkbox("💾 บันทึกลงโปรเจกต์ (Save to project store)", value=False, key='save_beam')
 
     st.header("1. Parameters")
     c1, c2, c3 = st.columns(3)
@@ -535,6 +89,7 @@ with st.sidebar.form("inputs"):
     c1, c2 = st.columns(2)
     mainBarKey = c1.selectbox("Main Bar", list(BAR_INFO.keys()), index=4)
     stirrupBarKey = c2.selectbox("Stirrup", list(BAR_INFO.keys()), index=0)
+    auto_arrange = st.checkbox("Mixed sizes / 2 layers when bars fail", value=False, key='arrange')
 
     st.header("2. Geometry")
     c1, c2, c3 = st.columns(3)
@@ -561,6 +116,39 @@ with st.sidebar.form("inputs"):
     mu_R_n = c1.number_input("Mu- Top (tf-m)", value=8.0, key='R_mn')
     mu_R_p = c2.number_input("Mu+ Bot (tf-m)", value=4.0, key='R_mp')
     vu_R = st.number_input("Vu Right (tf)", value=12.0, key='R_v')
+    analysis = st.checkbox("Compute Mu / Vu from continuous-beam analysis", value=False, key='analysis')
+    spans_text = st.text_input("Spans (m, comma separated)", value="6, 6, 5", key='spans')
+    c1, c2, c3 = st.columns(3)
+    w_dead = c1.number_input("DL (tf/m)", value=2.5, key='w_dead')
+    w_live = c2.number_input("LL (tf/m)", value=1.2, key='w_live')
+    design_span = c3.number_input("Span no.", value=1, min_value=1, step=1, key='design_span')
+    service = st.checkbox("Deflection & crack control under DL / LL of these spans", value=False, key='service')
+    diagrams = st.file_uploader("Mu / Vu diagrams (CSV: combo, x, Mu, Vu or JSON) — envelope design",
+                                type=['csv', 'json'], key='diagrams')
+
+    st.header("4. Optimizer")
+    optimize = st.checkbox("Find cheapest b, h, Main Bar & Stirrup", value=False, key='optimize')
+    c1, c2 = st.columns(2)
+    concrete_cost = c1.number_input("Concrete (฿/m³)", value=2500.0, key='cost_c')
+    steel_cost = c2.number_input("Steel (฿/kg)", value=30.0, key='cost_s')
+
+    st.header("5. Parametric Sweep")
+    sweep_on = st.checkbox("Sweep two inputs (As_req, ρ, φ, PASS maps)", value=False, key='sweep')
+    c1, c2 = st.columns(2)
+    sweep_x = c1.selectbox("X field", SWEEP_FIELDS, index=SWEEP_FIELDS.index('h'), key='sweep_x')
+    sweep_x_range = c2.text_input("X values (start:stop:step or a,b,c)", value="30:80:1", key='sweep_x_range')
+    c1, c2 = st.columns(2)
+    sweep_y = c1.selectbox("Y field", SWEEP_FIELDS, index=SWEEP_FIELDS.index('fc'), key='sweep_y')
+    sweep_y_range = c2.text_input("Y values (start:stop:step or a,b,c)", value="180:350:5", key='sweep_y_range')
+
+    st.header("6. Reliability (existing beam)")
+    reliability = st.checkbox("Monte Carlo Pf / β of the designed bars", value=False, key='reliability')
+    mc_samples = st.select_slider("Samples", options=[10 ** 5, 10 ** 6, 10 ** 7], value=10 ** 6,
+                                  format_func=lambda n: f"{n:,}", key='mc_samples')
+
+    st.header("7. Diagnostics")
+    diagnostics = st.checkbox("Stage timings & counters", value=False, key='diag')
+    profile = st.checkbox("cProfile this run (bypasses cache)", value=False, key='profile')
 
     run_btn = st.form_submit_button("Run Calculation")
 
@@ -577,11 +165,121 @@ if run_btn:
         'vu_L': vu_L, 'vu_M': vu_M, 'vu_R': vu_R
     }
 
-    rows, bars, shears = process_calculation(inputs)
+    trace = Trace('app', beam_id=beam_id) if diagnostics or profile else None
+    stage = trace.stage if trace else (lambda name: contextlib.nullcontext())
+
+    st.session_state['analysis_info'] = None
+    spans = None
+    if analysis or service:
+        from continuous import parse_spans
+
+        try:
+            spans = parse_spans(spans_text)
+        except ValueError as e:
+            st.session_state['analysis_info'] = f"Spans: {e}"
+    if analysis and spans:
+        from continuous import ContinuousBeam, analyze, span_inputs
+
+        with stage('analysis'):
+            try:
+                cbeam = ContinuousBeam(spans)
+                x, span, Mu, Vu, combos = analyze(cbeam, w_dead, w_live)
+                s = min(int(design_span), len(spans)) - 1
+                loads = span_inputs(inputs, cbeam, x, span, Mu, Vu)[s]
+                inputs.update({k: v for k, v in loads.items() if k.startswith(('mu_', 'vu_'))})
+                st.session_state['analysis_info'] = (len(spans), s + 1, len(combos))
+            except ValueError as e:
+                st.session_state['analysis_info'] = f"Continuous-beam analysis: {e}"
+
+    st.session_state['opt'] = None
+    st.session_state['profile_text'] = None
+    st.session_state['trace_report'] = None
+    if optimize:
+        from optimizer import optimize_section
+
+        with stage('optimize'):
+            best = optimize_section(inputs, workers=1,
+                                    cost={'concrete_per_m3': concrete_cost, 'steel_per_kg': steel_cost})
+        st.session_state['opt'] = best
+        if best:
+            inputs.update(b=best[0]['b'], h=best[0]['h'], mainBar=best[0]['mainBar'],
+                          stirrupBar=best[0]['stirrupBar'])
+
+    with stage('solve'):
+        if profile:
+            (rows, bars, shears), st.session_state['profile_text'] = profile_call(
+                process_calculation, inputs, counters=trace.counters, memo=False)
+            from_cache = False
+        else:
+            rows, bars, shears, from_cache = cached_process_calculation(
+                inputs, counters=trace.counters if trace else None)
+    layouts = {}
+    if auto_arrange:
+        from bar_arrangement import arrange_failing_cases, insert_rows, mark_resolved
+
+        with stage('arrange'):
+            layouts, extra_rows = arrange_failing_cases(inputs)
+            rows = insert_rows(mark_resolved(rows, layouts), extra_rows)
+    if service and spans:
+        from bar_arrangement import insert_rows
+        from continuous import ContinuousBeam
+        from serviceability import service_batch, service_rows, span_service_diagrams
+
+        with stage('serviceability'):
+            try:
+                s = min(int(design_span), len(spans)) - 1
+                x, M_D, M_L = span_service_diagrams(ContinuousBeam(spans), w_dead, w_live, s)
+                # the bars as provided, including any rearranged in 2.1
+                rows = insert_rows(rows, service_rows(service_batch([(inputs, bars, layouts)], x, M_D, M_L)))
+            except ValueError as e:
+                st.session_state['analysis_info'] = f"Serviceability: {e}"
+    st.session_state['envelope'] = None
+    if diagrams is not None:
+        from bar_arrangement import insert_rows
+        from envelope import design_envelope, envelope_rows, load_diagrams
+
+        with stage('envelope'):
+            try:
+                x, Mu, Vu, combos = load_diagrams(diagrams)
+                env = design_envelope(inputs, x, Mu, Vu)
+                rows = insert_rows(rows, envelope_rows(inputs, env, len(combos)))
+                st.session_state['envelope'] = env
+            except ValueError as e:
+                st.session_state['envelope'] = f"{diagrams.name}: {e}"
+    st.session_state['sweep_plot'] = None
+    if sweep_on:
+        from sweep import parse_axis, sweep, sweep_figure
+
+        with stage('sweep'):
+            try:
+                if sweep_x == sweep_y:
+                    raise ValueError("X and Y fields must differ")
+                axes = dict([parse_axis(f"{sweep_x}={sweep_x_range}"), parse_axis(f"{sweep_y}={sweep_y_range}")])
+                res = sweep(inputs, axes)
+                st.session_state['sweep_plot'] = (sweep_figure(res, sweep_x, sweep_y), res['ok'].size,
+                                                  float(res['ok'].mean()))
+            except (ValueError, KeyError) as e:
+                st.session_state['sweep_plot'] = str(e)
+    st.session_state['reliability_res'] = None
+    if reliability:
+        from reliability import run_reliability
+
+        with stage('reliability'):
+            st.session_state['reliability_res'] = run_reliability(inputs, mc_samples)
+    st.session_state['stored'] = None
+    if save_beam:
+        store = project_store()
+        store.upsert_beams([inputs])
+        st.session_state['stored'] = next((p for p in store.projects() if p[0] == project_name), None)
     st.session_state['data'] = inputs
     st.session_state['rows'] = rows
     st.session_state['bars'] = bars
     st.session_state['shears'] = shears
+    st.session_state['from_cache'] = from_cache
+    st.session_state['layouts'] = layouts
+    st.session_state['pdf_data'] = None
+    st.session_state['bundle_data'] = None
+    st.session_state['trace'] = trace
     st.session_state['calc_done'] = True
 
 if st.session_state['calc_done']:
@@ -589,25 +287,112 @@ if st.session_state['calc_done']:
     rows = st.session_state['rows']
     bars = st.session_state['bars']
     shears = st.session_state['shears']
-    m_db = BAR_INFO[data['mainBar']]['d_mm']
-    s_db = BAR_INFO[data['stirrupBar']]['d_mm']
-
-    # 1. Generate Images
-    fig1 = create_beam_section(data['b'], data['h'], data['cover'], bars.get('L_TOP', 2), bars.get('L_BOT', 2),
-                               f"@{shears['V_L'] / 10:.0f}cm", m_db, s_db, "Left Support", data['mainBar'])
-    img1_b64 = fig_to_base64(fig1)
-    fig2 = create_beam_section(data['b'], data['h'], data['cover'], bars.get('M_TOP', 2), bars.get('M_BOT', 2),
-                               f"@{shears['V_M'] / 10:.0f}cm", m_db, s_db, "Mid Span", data['mainBar'])
-    img2_b64 = fig_to_base64(fig2)
-    fig3 = create_beam_section(data['b'], data['h'], data['cover'], bars.get('R_TOP', 2), bars.get('R_BOT', 2),
-                               f"@{shears['V_R'] / 10:.0f}cm", m_db, s_db, "Right Support", data['mainBar'])
-    img3_b64 = fig_to_base64(fig3)
-
-    # 2. Generate HTML Report
-    html_report = generate_full_html_report(data, rows, [img1_b64, img2_b64, img3_b64])
+    # the trace covers the rerun that calculated; later reruns only redraw
+    trace = st.session_state.pop('trace', None)
+    stage = trace.stage if trace else (lambda name: contextlib.nullcontext())
+    # section images are drawn in the background while the summary is shown
+    reuse = st.session_state.setdefault('section_images', {})
+    jobs = submit_report_sections(data, bars, shears, layouts=st.session_state.get('layouts'), reuse=reuse,
+                                  trace=trace)
 
     st.success("✅ คำนวณเสร็จสิ้น (Calculation Finished)")
-    st.components.v1.html(html_report, height=800, scrolling=True)
+    failed = [r[0] for r in rows if r[0] != "SECTION" and r[5] == "FAIL"]
+    if failed:
+        st.error("❌ ไม่ผ่าน (FAIL): " + ", ".join(failed))
+    else:
+        st.success("✅ ผ่านทุกรายการ (PASS)")
+    opt = st.session_state.get('opt')
+    if opt is not None:
+        if opt:
+            st.markdown("**Optimizer: cheapest passing designs (per metre)**")
+            st.table([{'b (cm)': r['b'], 'h (cm)': r['h'], 'Main Bar': r['mainBar'], 'Stirrup': r['stirrupBar'],
+                       'Concrete (m³)': f"{r['concrete_m3']:.3f}", 'Steel (kg)': f"{r['steel_kg']:.1f}",
+                       'Cost': f"{r['cost']:,.0f}"} for r in opt])
+        else:
+            st.warning("Optimizer: no candidate section passes all checks — report shows the input section.")
+    info = st.session_state.get('analysis_info')
+    if isinstance(info, str):
+        st.warning(info)
+    elif info:
+        st.caption(f"Mu / Vu of span {info[1]} of {info[0]} from continuous-beam analysis ({info[2]} combinations)")
+    env = st.session_state.get('envelope')
+    if isinstance(env, str):
+        st.warning(f"Envelope: {env}")
+    elif env is not None:
+        st.markdown("**Envelope (Mu: tf-m, Vu: tf)**")
+        st.line_chart({'x (m)': env['x'], 'Mu- Top': -env['Mu_neg'], 'Mu+ Bot': env['Mu_pos'], 'Vu': env['Vu']},
+                      x='x (m)')
+    sweep_plot = st.session_state.get('sweep_plot')
+    if isinstance(sweep_plot, str):
+        st.warning(f"Sweep: {sweep_plot}")
+    elif sweep_plot:
+        fig, n_points, pass_frac = sweep_plot
+        st.markdown(f"**Parametric sweep: {n_points:,} points, PASS {pass_frac:.0%}**")
+        st.pyplot(fig)
+    rel = st.session_state.get('reliability_res')
+    if rel:
+        sysr = rel['system']
+        st.markdown(f"**Reliability: Pf = {sysr['pf']:.2e}, β = {sysr['beta']:.2f}** "
+                    f"({rel['samples']:,} samples, c.o.v. of Pf {sysr['cov']:.3f})")
+        st.table([{'Limit state': s['name'], 'Pf': f"{s['pf']:.2e}", 'β': f"{s['beta']:.2f}",
+                   'c.o.v.': f"{s['cov']:.3f}", 'β (mean value)': f"{s['beta_mv']:.2f}"}
+                  for s in rel['limit_states']])
+    if st.session_state.get('from_cache'):
+        st.caption("⚡ ผลคำนวณจากแคช (Result from cache)")
+    stored = st.session_state.get('stored')
+    if stored:
+        st.caption(f"💾 Saved to project '{stored[0]}': {stored[1]} beams (PASS {stored[2]}, FAIL {stored[3]})")
+    diag_slot = st.container()
+    pdf_slot = st.container()
+    report_slot = st.empty()
+
+    # the report fills in as the images complete
+    images = harvest_report_sections(jobs, reuse)
+    with stage('sections'):
+        while PENDING_SECTION in images:
+            with report_slot:
+                st.components.v1.html(generate_full_html_report(data, rows, images), height=800, scrolling=True)
+            wait([f for (_, f), img in zip(jobs, images) if img is PENDING_SECTION], return_when=FIRST_COMPLETED)
+            images = harvest_report_sections(jobs, reuse)
+    with stage('html'):
+        html_report = generate_full_html_report(data, rows, images)
+    with report_slot:
+        st.components.v1.html(html_report, height=800, scrolling=True)
+    if trace:
+        trace.payload('html_report', html_report)
+        trace.log()
+        st.session_state['trace_report'] = trace.to_dict()
+
+    report = st.session_state.get('trace_report')
+    if report or st.session_state.get('profile_text'):
+        with diag_slot.expander("🔍 Diagnostics"):
+            if report:
+                st.markdown(f"**Total {report['total_s'] * 1e3:,.1f} ms**")
+                st.table([{'Stage': r['stage'], 'Time (ms)': f"{r['wall_s'] * 1e3:,.2f}", 'Calls': r['calls']}
+                          for r in report['stages']])
+                st.table([{'Counter': k, 'Value': v} for k, v in report['counters'].items()]
+                         + [{'Counter': f"{k} (bytes)", 'Value': v} for k, v in report['payload_bytes'].items()])
+                st.download_button("Download trace (JSON)", json.dumps(report, ensure_ascii=False, indent=2),
+                                   file_name=f"trace_{data['beam_id']}.json", mime="application/json")
+            if st.session_state.get('profile_text'):
+                st.code(st.session_state['profile_text'], language=None)
+    # the PDF and the bundle are built only on request and kept until the next calculation
+    beam = (data, rows, bars, shears, st.session_state.get('layouts'))
+    pdf_col, zip_col = pdf_slot.columns(2)
+    if pdf_col.button("📄 เตรียม PDF (Prepare PDF)", key='prepare_pdf'):
+        from pdf_report import pdf_bytes
+
+        st.session_state['pdf_data'] = pdf_bytes([beam])
+    if st.session_state.get('pdf_data'):
+        pdf_col.download_button("📄 ดาวน์โหลด PDF (Download PDF)", st.session_state['pdf_data'],
+                                file_name=f"{data['beam_id']}.pdf", mime="application/pdf")
+    if zip_col.button("🗂️ เตรียมรายงาน (Prepare report bundle)", key='prepare_bundle'):
+        from report_bundle import bundle_bytes
+
+        st.session_state['bundle_data'] = bundle_bytes([beam])
+    if st.session_state.get('bundle_data'):
+        zip_col.download_button("🗂️ ดาวน์โหลดรายงาน (Report bundle .zip)", st.session_state['bundle_data'],
+                                file_name=f"{data['beam_id']}.zip", mime="application/zip")
 
 else:
-    st.info("👈 กรุณากรอกข้อมูลทางด้านซ้าย แล้วกดปุ่ม 'Run Calculation'")
\ No newline at end of file
+    st.info("👈 กรุณากรอกข้อมูลทางด้านซ้าย แล้วกดปุ่ม 'Run Calculation'")
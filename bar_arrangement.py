@@ -0,0 +1,219 @@
+"""Mixed-diameter, multi-layer bar arrangement solver.
+
+process_calculation provides ``n`` bars of a single size and only reports
+when they do not fit.  This module finds the lightest arrangement of up to
+two bar sizes in one or two layers that carries Mu with every layer
+satisfying the clear spacing rule ``max(db, 25, 4/3 agg)``:
+
+* one layer: ``n1`` bars of size k1 (corner bars) plus ``n2`` smaller bars of size k2;
+* two layers: ``n1`` bars of k1 on the stirrup and ``n2 <= n1`` bars of k2 <= k1
+  in a second layer ``layer_gap`` (25 mm) clear above it.
+
+Effective depth is taken to the centroid of the steel, so a second layer
+lowers d and the strength check uses that d.  Per metre, steel weight is
+proportional to bar area, so ``objective='area'`` is also the minimum-weight
+arrangement; ``objective='bars'`` prefers the fewest bars.
+
+Candidates for a bar catalogue are enumerated once, sorted by area and kept;
+a query skips every candidate below a lower bound on As (strength at the
+largest d, As_min at the smallest) with a binary search and checks the rest
+as arrays.
+"""
+import functools
+
+import numpy as np
+
+from beam_calc import BAR_INFO, MU_CASES, beam_result
+from design_batch import KSC_TO_MPA, TFM_TO_NMM
+from flexure_batch import flexure_limits, flexure_response, solve_required_as
+
+DEFAULT_BARS = ('DB12', 'DB16', 'DB20', 'DB25', 'DB28')
+MAX_PER_SIZE = 10
+OBJECTIVE_LABELS = {'area': "Min. area", 'bars': "Fewest bars"}
+
+
+@functools.lru_cache(maxsize=16)
+def build_catalogue(bar_keys=DEFAULT_BARS, max_per_size=MAX_PER_SIZE, layer_gap=25.0):
+    """All candidate arrangements for a bar catalogue, as arrays sorted by steel area."""
+    keys = sorted(bar_keys, key=lambda k: BAR_INFO[k]['d_mm'])
+    db = [float(BAR_INFO[k]['d_mm']) for k in keys]
+    area = [BAR_INFO[k]['A_cm2'] * 100 for k in keys]
+    recs = []
+    for i in range(len(keys)):
+        for n1 in range(2, max_per_size + 1):
+            # one layer, optionally mixed with a smaller size between the corner bars
+            recs.append((i, n1, -1, 0, 0, n1 * area[i], n1, n1 * db[i], n1, db[i], 0.0, 0, 0.0, db[i] / 2))
+            for j in range(i):
+                for n2 in range(1, max_per_size + 1):
+                    As = n1 * area[i] + n2 * area[j]
+                    y = (n1 * area[i] * db[i] / 2 + n2 * area[j] * db[j] / 2) / As
+                    recs.append((i, n1, j, n2, 0, As, n1 + n2, n1 * db[i] + n2 * db[j], n1 + n2, db[i],
+                                 0.0, 0, 0.0, y))
+            # two layers: k1 on the stirrup, k2 <= k1 above it
+            for j in range(i + 1):
+                for n2 in range(2, n1 + 1):
+                    As = n1 * area[i] + n2 * area[j]
+                    y = (n1 * area[i] * db[i] / 2 + n2 * area[j] * (db[i] + layer_gap + db[j] / 2)) / As
+                    recs.append((i, n1, j, n2, 1, As, n1 + n2, n1 * db[i], n1, db[i],
+                                 n2 * db[j], n2, db[j], y))
+    cols = np.array(recs, dtype=float)
+    order = np.lexsort((cols[:, 6], cols[:, 5]))
+    cols = cols[order]
+    names = ['k1', 'n1', 'k2', 'n2', 'two_layer', 'As', 'n_total', 'sum_db1', 'count1', 'max_db1',
+             'sum_db2', 'count2', 'max_db2', 'y_centroid']
+    cat = {name: cols[:, i] for i, name in enumerate(names)}
+    for name in ('k1', 'n1', 'k2', 'n2', 'n_total', 'count1', 'count2'):
+        cat[name] = cat[name].astype(int)
+    cat['two_layer'] = cat['two_layer'].astype(bool)
+    cat['keys'] = tuple(keys)
+    cat['layer_gap'] = layer_gap
+    return cat
+
+
+def _describe(cat, i):
+    keys = cat['keys']
+    k1, n1, k2, n2 = keys[cat['k1'][i]], int(cat['n1'][i]), cat['k2'][i], int(cat['n2'][i])
+    if cat['two_layer'][i]:
+        layers = [[k1] * n1, [keys[k2]] * n2]
+        label = f"{n1}-{k1} / {n2}-{keys[k2]}"
+    elif n2:
+        # corner bars of the larger size; any extra large bars go in the middle
+        mid = [keys[k2]] * n2
+        mid[n2 // 2:n2 // 2] = [k1] * (n1 - 2)
+        layers = [[k1] + mid + [k1]]
+        label = f"{n1}-{k1} + {n2}-{keys[k2]}"
+    else:
+        layers = [[k1] * n1]
+        label = f"{n1}-{k1}"
+    return layers, label
+
+
+def solve_arrangement(Mu_Nmm, fc_MPa, fy_MPa, bw_mm, h_mm, cover_mm, db_st_mm, agg_mm,
+                      bar_keys=DEFAULT_BARS, objective='area', layer_gap=25.0):
+    """Best arrangement for one moment, or None if nothing in the catalogue works.
+
+    Returns a dict with the bar layers (outer layer first, bar keys left to
+    right), label, As_prov, number of bars, effective depth d, φMn and the
+    clear spacing of each layer.
+    """
+    cat = build_catalogue(tuple(bar_keys), MAX_PER_SIZE, layer_gap)
+    usable = bw_mm - 2 * (cover_mm + db_st_mm)
+    d_top = h_mm - cover_mm - db_st_mm
+
+    # lower bound on As: strength alone at the largest d (a single layer of the
+    # smallest bar), and As_min at the smallest d (the highest steel centroid)
+    d1 = d_top - cat['max_db1'].min() / 2
+    _, As_max1 = flexure_limits(fc_MPa, fy_MPa, bw_mm, d1)
+    As_str = solve_required_as(Mu_Nmm, 0.0, As_max1, fc_MPa, fy_MPa, bw_mm, d1)[0]
+    As_min_lo, _ = flexure_limits(fc_MPa, fy_MPa, bw_mm, d_top - cat['y_centroid'].max())
+    As_lb = max(As_str, As_min_lo[0])
+    start = int(np.searchsorted(cat['As'], As_lb * (1 - 1e-9)))
+    agg_req = max(25.0, 4 / 3 * agg_mm)
+
+    # candidates are sorted by area, so for 'area' the first block holding a
+    # feasible candidate contains the answer; 'bars' has to see all of them
+    if objective not in ('area', 'bars'):
+        raise ValueError(f"unknown objective '{objective}'")
+    block = 128 if objective == 'area' else len(cat['As'])
+    for lo in range(start, len(cat['As']), block):
+        sl = slice(lo, lo + block)
+        clr1 = (usable - cat['sum_db1'][sl]) / np.maximum(cat['count1'][sl] - 1, 1)
+        ok = clr1 >= np.maximum(cat['max_db1'][sl], agg_req) - 1
+        two = cat['two_layer'][sl]
+        clr2 = np.where(two, (usable - cat['sum_db2'][sl]) / np.maximum(cat['count2'][sl] - 1, 1), np.inf)
+        ok &= ~two | (clr2 >= np.maximum(cat['max_db2'][sl], agg_req) - 1)
+        idx = np.nonzero(ok)[0]
+        if not idx.size:
+            continue
+        d = d_top - cat['y_centroid'][sl][idx]
+        As = cat['As'][sl][idx]
+        As_min, _ = flexure_limits(fc_MPa, fy_MPa, bw_mm, d)
+        res = flexure_response(As, fc_MPa, fy_MPa, bw_mm, d)
+        good = np.nonzero((As >= As_min) & (res['phiMn'] >= Mu_Nmm))[0]
+        if good.size:
+            break
+    else:
+        return None
+
+    if objective == 'bars':
+        pick = good[np.lexsort((As[good], cat['n_total'][sl][idx][good]))[0]]
+    else:
+        pick = good[0]
+    i = lo + int(idx[pick])
+    clr1, clr2 = clr1[idx], clr2[idx]
+    layers, label = _describe(cat, i)
+    return {
+        'layers': layers, 'label': label, 'As_prov': float(cat['As'][i]), 'n': int(cat['n_total'][i]),
+        'd': float(d[pick]), 'phi': float(res['phi'][pick]), 'phiMn': float(res['phiMn'][pick]),
+        'eps_t': float(res['eps_t'][pick]),
+        'clear_spacing': [float(clr1[pick])] + ([float(clr2[pick])] if cat['two_layer'][i] else []),
+    }
+
+
+def solve_arrangements(Mu_Nmm, fc_MPa, fy_MPa, bw_mm, h_mm, cover_mm, db_st_mm, agg_mm,
+                       bar_keys=DEFAULT_BARS, objective='area', layer_gap=25.0):
+    """solve_arrangement over broadcast arrays of moment cases; returns a list."""
+    args = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float))
+                                 for x in (Mu_Nmm, fc_MPa, fy_MPa, bw_mm, h_mm, cover_mm, db_st_mm, agg_mm)))
+    return [solve_arrangement(*(float(a[i]) for a in args), bar_keys=bar_keys, objective=objective,
+                              layer_gap=layer_gap)
+            for i in range(args[0].size)]
+
+
+def arrange_failing_cases(inputs, bar_keys=DEFAULT_BARS, objective='area'):
+    """Re-arrange the moment cases whose strength or clear spacing check failed.
+
+    Returns ``(layouts, extra_rows)``: layouts maps a bar_counts key (e.g.
+    'L_TOP') to its layers for create_beam_section, and extra_rows is a report
+    section to insert before the final status.
+    """
+    failed = {c.key for c in beam_result(inputs).flexure if not (c.strength_ok and c.spacing_ok)}
+    layouts, extra = {}, []
+    if not failed:
+        return layouts, extra
+
+    fc = inputs['fc'] * KSC_TO_MPA
+    fy = inputs['fy'] * KSC_TO_MPA
+    bw, h, cover = inputs['b'] * 10, inputs['h'] * 10, inputs['cover'] * 10
+    db_st = BAR_INFO[inputs['stirrupBar']]['d_mm']
+    extra.append(["SECTION", "2.1 BAR ARRANGEMENT (MIXED SIZES / 2 LAYERS)", "", "", "", "", ""])
+    for key, title, mu_key in MU_CASES:
+        if key not in failed:
+            continue
+        Mu_Nmm = inputs[mu_key] * TFM_TO_NMM
+        arr = solve_arrangement(Mu_Nmm, fc, fy, bw, h, cover, db_st, inputs['agg'], bar_keys, objective)
+        if arr is None:
+            extra.append([f"{title}: Arrangement", "≤ 2 sizes, ≤ 2 layers", "-", "No arrangement fits", "-",
+                          "FAIL"])
+            continue
+        layouts[key] = arr['layers']
+        status = "PASS" if arr['phiMn'] >= Mu_Nmm else "FAIL"
+        extra.append([f"{title}: Provide", f"{OBJECTIVE_LABELS[objective]}, s_clr ≥ max(db, 25, 4/3 agg)", "-",
+                      f"{arr['label']} ({arr['As_prov']:,.0f})", "mm²", "OK"])
+        extra.append([f"{title}: d (centroid)", "h - cover - db(st) - ȳ", "-", f"{arr['d']:,.1f}", "mm", ""])
+        extra.append([f"{title}: Check Strength", "φMn ≥ Mu",
+                      f"{arr['phiMn'] / 1e6:,.2f} ≥ {Mu_Nmm / 1e6:,.2f} kNm", status, "-", status])
+        extra.append([f"{title}: Clear Spacing", "per layer",
+                      " / ".join(f"{s:,.1f}" for s in arr['clear_spacing']), "PASS", "mm", "PASS"])
+    return layouts, extra
+
+
+def mark_resolved(rows, layouts):
+    """rows with the single-size FAIL checks of the re-arranged cases marked as resolved in 2.1.
+
+    Call before insert_rows; the rows are copied, not changed in place.
+    """
+    names = {f"{title}: {check}" for key, title, _ in MU_CASES if key in layouts
+             for check in ("Check Strength", "Clear Spacing")}
+    if not names:
+        return rows
+    return [[r[0], r[1], r[2], f"{r[3]} → 2.1", r[4], "OK (2.1)"] if r[0] in names and r[5] == "FAIL" else r
+            for r in rows]
+
+
+def insert_rows(rows, extra):
+    """rows with ``extra`` inserted before the final status section."""
+    if not extra:
+        return rows
+    at = next((i for i, r in enumerate(rows) if r[0] == "SECTION" and r[1].startswith("4.")), len(rows))
+    return rows[:at] + extra + rows[at:]
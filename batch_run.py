@@ -0,0 +1,248 @@
+"""Headless batch runner for whole beam schedules.
+
+Reads a CSV or JSON schedule whose fields are the keys of the ``inputs`` dict
+built by the Streamlit form, runs ``process_calculation`` for every beam on a
+process pool and appends one JSON line per beam to the output file as soon as
+it finishes.  Beams already present in the output file are skipped, so an
+interrupted run resumes where it stopped.
+
+    python batch_run.py schedule.csv -o results.jsonl [-j 8]
+    python batch_run.py schedule.csv --trace     # per-beam stage timings and counters
+    python batch_run.py schedule.csv --report schedule.zip    # or .html for one self-contained file
+"""
+import argparse
+import csv
+import functools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from beam_calc import beam_result, process_calculation
+from instrument import Trace, aggregate
+
+INPUT_KEYS = [
+    'project', 'beam_id', 'engineer',
+    'b', 'h', 'cover', 'agg',
+    'fc', 'fy', 'fyt',
+    'mainBar', 'stirrupBar',
+    'mu_L_n', 'mu_L_p',
+    'mu_M_n', 'mu_M_p',
+    'mu_R_n', 'mu_R_p',
+    'vu_L', 'vu_M', 'vu_R',
+]
+TEXT_KEYS = {'project', 'beam_id', 'engineer', 'mainBar', 'stirrupBar'}
+OPTIONAL_KEYS = {'project': '', 'engineer': ''}
+
+
+def _number(value):
+    if isinstance(value, (int, float)):
+        return value
+    text = str(value).strip()
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def normalize_beam(raw):
+    beam = {}
+    for key in INPUT_KEYS:
+        if key not in raw or raw[key] in (None, ''):
+            if key in OPTIONAL_KEYS:
+                beam[key] = OPTIONAL_KEYS[key]
+                continue
+            raise ValueError(f"beam {raw.get('beam_id', '?')}: missing '{key}'")
+        beam[key] = str(raw[key]).strip() if key in TEXT_KEYS else _number(raw[key])
+    return beam
+
+
+def load_schedule(path):
+    if path.lower().endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data['beams']
+    else:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            data = list(csv.DictReader(f))
+
+    beams = [normalize_beam(raw) for raw in data]
+    seen = set()
+    for beam in beams:
+        key = beam_key(beam)
+        if key in seen:
+            raise ValueError(f"duplicate beam '{beam['beam_id']}' in project '{beam['project']}'")
+        seen.add(key)
+    return beams
+
+
+def beam_key(beam):
+    return beam['project'], beam['beam_id']
+
+
+def design_beam(inputs, trace=False, table=False):
+    """JSON record for one beam; report rows are never formatted.
+
+    With ``table`` the record also carries 'values', the flattened numbers for
+    result_table (popped by run_schedule before the record is written).
+    """
+    tr = Trace('beam', beam_id=inputs['beam_id']) if trace else None
+    try:
+        if tr:
+            with tr.stage('solve'):
+                res = beam_result(inputs, counters=tr.counters)
+        else:
+            res = beam_result(inputs)
+    except Exception as e:
+        return {'project': inputs['project'], 'beam_id': inputs['beam_id'], 'status': 'ERROR',
+                'error': f"{type(e).__name__}: {e}"}
+    failed = res.failed_checks()
+    rec = {
+        'project': inputs['project'], 'beam_id': inputs['beam_id'],
+        'status': "FAIL" if failed else "PASS",
+        'bar_counts': res.bar_counts(), 'shear_res': res.shear_res(),
+        'failed_checks': failed,
+    }
+    if tr:
+        rec['trace'] = tr.to_dict()
+    if table:
+        from result_table import record_values
+        rec['values'] = record_values(res)
+    return rec
+
+
+def iter_designed(beams):
+    """(inputs, rows, bar_counts, shear_res) per beam, designed when the consumer asks for it."""
+    for inputs in beams:
+        yield (inputs, *process_calculation(inputs))
+
+
+def write_report(beams, path, renderer=None):
+    """Stream the calculation report of every beam into a bundle (.zip) or one HTML file; returns its size."""
+    from report_bundle import write_report_file
+
+    return write_report_file(path, iter_designed(beams), renderer)
+
+
+def load_done(out_path):
+    """Keys of beams with a PASS or FAIL record, so a resumed run skips them.
+
+    ERROR records and lines that are not complete records (a partial last
+    line left by an interrupted run, or a corrupted line anywhere) are dropped
+    from the file, so those beams are designed again and each beam keeps one
+    record.
+    """
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    tmp = f"{out_path}.{os.getpid()}.tmp"
+    dropped = False
+    with open(out_path, 'rb') as f, open(tmp, 'wb') as keep:
+        for line in f:
+            try:
+                rec = json.loads(line) if line.endswith(b'\n') else None
+            except ValueError:
+                rec = None
+            if not (isinstance(rec, dict) and rec.get('status') in ('PASS', 'FAIL')
+                    and 'project' in rec and 'beam_id' in rec):
+                dropped = True
+                continue
+            done.add(beam_key(rec))
+            keep.write(line)
+    if dropped:
+        os.replace(tmp, out_path)
+    else:
+        os.remove(tmp)
+    return done
+
+
+def run_schedule(beams, out_path, workers=None, resume=True, chunksize=None, progress=None, trace=False,
+                 table_path=None):
+    """Design ``beams`` in parallel, streaming results to ``out_path`` (JSON lines).
+
+    Returns a summary dict with counts, elapsed time and throughput.  With
+    ``trace`` every record carries a 'trace' (stage times and solver counters)
+    and the summary their aggregate under 'trace'.  ``table_path`` (.npz or
+    .csv) also saves the numbers of the beams designed in this run as a
+    result_table.
+    """
+    done = load_done(out_path) if resume else set()
+    todo = [b for b in beams if beam_key(b) not in done]
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, min(32, len(todo) // (workers * 8)))
+
+    counts = {'PASS': 0, 'FAIL': 0, 'ERROR': 0}
+    traces, values = [], []
+    fn = functools.partial(design_beam, trace=trace, table=bool(table_path))
+    t0 = time.perf_counter()
+    with open(out_path, 'a' if resume else 'w', encoding='utf-8') as out:
+        if todo:
+            with multiprocessing.Pool(workers) as pool:
+                for i, rec in enumerate(pool.imap_unordered(fn, todo, chunksize), 1):
+                    if 'values' in rec:
+                        values.append(rec.pop('values'))
+                    out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                    out.flush()
+                    counts[rec['status']] += 1
+                    if 'trace' in rec:
+                        traces.append(rec['trace'])
+                    if progress:
+                        progress(i, len(todo), time.perf_counter() - t0)
+    elapsed = time.perf_counter() - t0
+    if table_path:
+        from result_table import results_table, save_table
+        save_table(results_table(values), table_path)
+
+    stats = {
+        'total': len(beams), 'skipped': len(beams) - len(todo), 'designed': len(todo),
+        'pass': counts['PASS'], 'fail': counts['FAIL'], 'error': counts['ERROR'],
+        'elapsed_s': elapsed, 'beams_per_s': len(todo) / elapsed if elapsed > 0 else 0.0,
+        'workers': workers,
+    }
+    if trace:
+        stats['trace'] = aggregate(traces)
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Design a whole beam schedule without the Streamlit UI.")
+    ap.add_argument('schedule', help="CSV or JSON beam schedule (same keys as the app inputs)")
+    ap.add_argument('-o', '--output', default='results.jsonl', help="JSON lines output file")
+    ap.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: all cores)")
+    ap.add_argument('--no-resume', action='store_true', help="overwrite the output instead of resuming")
+    ap.add_argument('--trace', action='store_true', help="record per-beam stage times and solver counters")
+    ap.add_argument('--report', help="also write the multi-beam calculation report: a .zip bundle or one .html file")
+    ap.add_argument('--table', help="also save the numeric results as a column table (.npz or .csv)")
+    args = ap.parse_args(argv)
+
+    beams = load_schedule(args.schedule)
+
+    def progress(i, n, elapsed):
+        if i == n or i % 100 == 0:
+            print(f"\r{i}/{n} beams  {i / elapsed:,.1f} beams/s", end='', file=sys.stderr, flush=True)
+
+    stats = run_schedule(beams, args.output, workers=args.workers, resume=not args.no_resume, progress=progress,
+                         trace=args.trace, table_path=args.table)
+    print(file=sys.stderr)
+    print(f"{stats['designed']} designed, {stats['skipped']} skipped (already done) | "
+          f"PASS {stats['pass']}  FAIL {stats['fail']}  ERROR {stats['error']} | "
+          f"{stats['elapsed_s']:.2f} s, {stats['beams_per_s']:,.1f} beams/s on {stats['workers']} workers",
+          file=sys.stderr)
+    if args.trace:
+        agg = stats['trace']
+        for name, st in agg['stages'].items():
+            print(f"  {name:<12} {st['wall_s']:8.3f} s  {st['mean_ms']:8.3f} ms/beam", file=sys.stderr)
+        for name, n in sorted(agg['counters'].items()):
+            print(f"  {name:<20} {n:>12,}  ({n / max(agg['runs'], 1):,.1f}/beam)", file=sys.stderr)
+    if args.report:
+        t0 = time.perf_counter()
+        size = write_report(beams, args.report)
+        print(f"report: {args.report} ({size / 1e6:,.1f} MB, {time.perf_counter() - t0:.2f} s)", file=sys.stderr)
+    return 1 if stats['error'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
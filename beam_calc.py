@@ -0,0 +1,461 @@
+"""Calculation core for the RC beam design (ACI 318-19, SDM).
+
+Imports only the standard library so worker processes, test harnesses and
+serverless handlers can load it without Streamlit or matplotlib.  Rendering lives in
+``beam_report`` and is imported only when a report is drawn.
+
+Import budget (checked by ``python import_budget.py``): a cold
+``import beam_calc`` stays under 25 ms and a worker that has imported it and
+designed a beam stays under 20 MB peak RSS.
+"""
+import math
+import threading
+from collections import OrderedDict
+
+
+# ==========================================
+# 2. DATABASE & HELPER
+# ==========================================
+BAR_INFO = {
+    'RB6': {'A_cm2': 0.283, 'd_mm': 6},
+    'RB9': {'A_cm2': 0.636, 'd_mm': 9},
+    'DB10': {'A_cm2': 0.785, 'd_mm': 10},
+    'DB12': {'A_cm2': 1.131, 'd_mm': 12},
+    'DB16': {'A_cm2': 2.011, 'd_mm': 16},
+    'DB20': {'A_cm2': 3.142, 'd_mm': 20},
+    'DB25': {'A_cm2': 4.909, 'd_mm': 25},
+    'DB28': {'A_cm2': 6.158, 'd_mm': 28}
+}
+
+
+def fmt(n, digits=3):
+    try:
+        val = float(n)
+        if math.isnan(val): return "-"
+        return f"{val:,.{digits}f}"
+    except:
+        return "-"
+
+
+# ==========================================
+# 3. CALCULATION LOGIC (DETAILED)
+# ==========================================
+def beta1FromFc(fc_MPa):
+    if fc_MPa <= 28: return 0.85
+    b1 = 0.85 - 0.05 * ((fc_MPa - 28) / 7)
+    return max(0.65, b1)
+
+
+def phiFlexureFromStrain(eps_t):
+    if eps_t <= 0.002: return 0.65
+    if eps_t >= 0.005: return 0.90
+    return 0.65 + (eps_t - 0.002) * (0.25 / 0.003)
+
+
+def flexureSectionResponse(As_mm2, fc_MPa, fy_MPa, bw_mm, d_mm, Es=200000, eps_cu=0.003, counters=None):
+    beta1 = beta1FromFc(fc_MPa)
+    fs = fy_MPa
+    a = (As_mm2 * fs) / (0.85 * fc_MPa * bw_mm) if fc_MPa > 0 else 0
+    c = a / beta1 if beta1 > 0 else 0
+
+    for i in range(50):
+        if c <= 0.1: c = 0.1
+        eps_t = eps_cu * (d_mm - c) / c
+        fs_new = min(fy_MPa, Es * eps_t)
+        fs_new = max(fs_new, -fy_MPa)
+        a_new = (As_mm2 * fs_new) / (0.85 * fc_MPa * bw_mm)
+        if abs(fs_new - fs) < 0.1 and abs(a_new - a) < 0.1:
+            fs = fs_new;
+            a = a_new;
+            break
+        fs = fs_new;
+        a = a_new;
+        c = a / beta1
+
+    if counters is not None:
+        counters['flexure_calls'] = counters.get('flexure_calls', 0) + 1
+        counters['flexure_iterations'] = counters.get('flexure_iterations', 0) + i + 1
+
+    c = a / beta1
+    eps_t = eps_cu * (d_mm - c) / c if c > 0 else 0.005
+    phi = phiFlexureFromStrain(eps_t)
+
+    T = As_mm2 * fs
+    Mn = T * (d_mm - a / 2.0)
+    phiMn = phi * Mn
+
+    return {'phi': phi, 'phiMn': phiMn, 'eps_t': eps_t, 'Mn': Mn}
+
+
+def solve_required_as(Mu_Nmm, As_min, As_max, fc, fy, bw, d, counters=None):
+    As_lo = As_min
+    As_hi = As_lo
+    for i in range(30):
+        r = flexureSectionResponse(As_hi, fc, fy, bw, d, counters=counters)
+        if r['phiMn'] >= Mu_Nmm: break
+        As_hi *= 1.3
+        if As_hi > As_max: As_hi = As_max; break
+    for _ in range(50):
+        As_mid = 0.5 * (As_lo + As_hi)
+        r = flexureSectionResponse(As_mid, fc, fy, bw, d, counters=counters)
+        if r['phiMn'] >= Mu_Nmm:
+            As_hi = As_mid
+        else:
+            As_lo = As_mid
+    if counters is not None:
+        counters['solve_calls'] = counters.get('solve_calls', 0) + 1
+        counters['expansion_steps'] = counters.get('expansion_steps', 0) + i + 1
+        counters['bisection_steps'] = counters.get('bisection_steps', 0) + 50
+    return As_hi
+
+
+MU_CASES = [
+    ("L_TOP", "Left (Top) Mu(-)", 'mu_L_n'), ("L_BOT", "Left (Bot) Mu(+)", 'mu_L_p'),
+    ("M_TOP", "Mid (Top) Mu(-)", 'mu_M_n'), ("M_BOT", "Mid (Bot) Mu(+)", 'mu_M_p'),
+    ("R_TOP", "Right (Top) Mu(-)", 'mu_R_n'), ("R_BOT", "Right (Bot) Mu(+)", 'mu_R_p'),
+]
+VU_CASES = [("V_L", "Left", 'vu_L'), ("V_M", "Mid", 'vu_M'), ("V_R", "Right", 'vu_R')]
+PHI_V = 0.75
+
+
+class FlexureCheck:
+    """One moment case in calculation units (mm, mm², N·mm); the As fields are None when Mu ≤ 0.001 tf-m."""
+    __slots__ = ('key', 'title', 'Mu_tfm', 'As_req', 'bar_area', 'n', 'As_prov', 'eps_t', 'phi', 'phiMn',
+                 'clear_spacing', 'req_clear', 'strength_ok', 'spacing_ok')
+
+    def __init__(self, key, title, Mu_tfm):
+        self.key, self.title, self.Mu_tfm = key, title, Mu_tfm
+        self.As_req = self.bar_area = self.As_prov = self.eps_t = self.phi = self.phiMn = None
+        self.clear_spacing = self.req_clear = None
+        self.n = 2
+        self.strength_ok = self.spacing_ok = True
+
+    @property
+    def active(self):
+        return self.As_req is not None
+
+    @property
+    def Mu_Nmm(self):
+        return self.Mu_tfm * 9806650.0
+
+
+class ShearCheck:
+    """One shear location in calculation units (mm, N; Vu and φVn in tf)."""
+    __slots__ = ('key', 'loc', 'Vu_tf', 'need_vs', 'Vs_req_N', 'Vs_req_tf', 's_req', 's_geom_max', 's_limit',
+                 's_prov', 'phiVn_tf', 'ok')
+
+    def __init__(self, key, loc, Vu_tf):
+        self.key, self.loc, self.Vu_tf = key, loc, Vu_tf
+
+
+class BeamResult:
+    """Raw numbers of one process_calculation run; report rows are formatted on demand by ``rows()``."""
+    __slots__ = ('inputs', 'bw', 'h', 'cover', 'fc', 'fy', 'fyt', 'db_main', 'db_st', 'd', 'beta1',
+                 'rho_min_terms', 'As_min', 'As_max', 'flexure', 'Vc_N', 'Av', 'Av_per_s_min', 's_max_Av_min',
+                 'shear')
+
+    @property
+    def ok(self):
+        return all(c.strength_ok and c.spacing_ok for c in self.flexure) and all(c.ok for c in self.shear)
+
+    def bar_counts(self):
+        return {c.key: c.n for c in self.flexure}
+
+    def shear_res(self):
+        return {c.key: c.s_prov for c in self.shear}
+
+    def failed_checks(self):
+        """Item names of the FAIL rows, in report order."""
+        out = []
+        for c in self.flexure:
+            if not c.strength_ok:
+                out.append(f"{c.title}: Check Strength")
+            if not c.spacing_ok:
+                out.append(f"{c.title}: Clear Spacing")
+        return out + [f"{c.loc}: Check" for c in self.shear if not c.ok]
+
+    def rows(self):
+        rows = []
+
+        def sec(title):
+            rows.append(["SECTION", title, "", "", "", "", ""])
+
+        def row(item, formula, subs, result, unit, status=""):
+            rows.append([item, formula, subs, result, unit, status])
+
+        bw, h, cover, d = self.bw, self.h, self.cover, self.d
+        fc_MPa, fy_MPa, fyt_MPa = self.fc, self.fy, self.fyt
+        barKey = self.inputs['mainBar']
+        stirKey = self.inputs['stirrupBar']
+
+        # 1. MATERIALS
+        sec("1. MATERIAL & SECTION PARAMETERS")
+        row("Concrete & Steel", "fc', fy, fyt", f"fc'={fmt(fc_MPa, 2)} MPa, fy={fmt(fy_MPa, 0)} MPa", "-", "-")
+        row("Section (b x h)", "-", f"{fmt(bw, 0)} x {fmt(h, 0)}", "-", "mm")
+        row("Effective depth d", "d = h - cover - db(st) - db/2",
+            f"{fmt(h, 0)} - {fmt(cover, 0)} - {fmt(self.db_st, 0)} - {fmt(self.db_main / 2, 1)}", f"{fmt(d, 1)}",
+            "mm")
+        row("β1", "ACI 318-19", f"fc'={fmt(fc_MPa, 2)} MPa", f"{fmt(self.beta1, 2)}", "-")
+        term1, term2 = self.rho_min_terms
+        row("As,min", "max(0.25√fc'/fy, 1.4/fy) bw·d",
+            f"max({fmt(term1, 5)}, {fmt(term2, 5)})·{fmt(bw, 0)}·{fmt(d, 0)}", f"{fmt(self.As_min, 0)}", "mm²")
+
+        # 2. FLEXURE
+        sec("2. FLEXURE DESIGN")
+        for c in self.flexure:
+            title = c.title
+            row(f"{title}: Mu", "-", "-", f"{fmt(c.Mu_tfm, 3)}", "tf-m", "")
+            if not c.active:
+                continue
+            row(f"{title}: As,req", "Solve φMn(As) ≥ Mu", f"As_min={fmt(self.As_min, 0)}", f"{fmt(c.As_req, 0)}",
+                "mm²")
+            row(f"{title}: Provide", f"Use {barKey} (As={fmt(c.bar_area, 0)})", f"Req: {fmt(c.As_req, 0)}",
+                f"{c.n}-{barKey} ({fmt(c.As_prov, 0)})", "mm²", "OK")
+            row(f"{title}: φ (Strain)", "φ = f(εt)", f"εt = {fmt(c.eps_t, 4)}", f"{fmt(c.phi, 2)}", "-")
+            status_str = "PASS" if c.strength_ok else "FAIL"
+            row(f"{title}: Check Strength", "φMn ≥ Mu", f"{fmt(c.phiMn / 1e6, 2)} ≥ {fmt(c.Mu_Nmm / 1e6, 2)} kNm",
+                status_str, "-", status_str)
+            status_clr = "PASS" if c.spacing_ok else "FAIL"
+            row(f"{title}: Clear Spacing", "s_clr ≥ max(db, 25, 4/3 agg)",
+                f"{fmt(c.clear_spacing, 1)} ≥ {fmt(c.req_clear, 1)}", status_clr, "mm", status_clr)
+
+        # 3. SHEAR
+        sec("3. SHEAR DESIGN")
+        Vc_tf = self.Vc_N / 9806.65
+        row("Vc", "0.17√fc' bw·d", f"0.17·√{fmt(fc_MPa, 1)}·{fmt(bw, 0)}·{fmt(d, 0)}", f"{fmt(Vc_tf, 3)}", "tf")
+        row("φVc", "0.75 · Vc", f"0.75 · {fmt(Vc_tf, 3)}", f"{fmt(PHI_V * Vc_tf, 3)}", "tf")
+        row("Stirrup Av", f"2-leg {stirKey}", "-", f"{fmt(self.Av, 1)}", "mm²")
+        row("s(Av,min)", "Av / max(0.062√fc' bw/fyt, 0.35 bw/fyt)", f"{fmt(self.Av, 1)} / {fmt(self.Av_per_s_min, 2)}",
+            f"{fmt(self.s_max_Av_min, 0)}", "mm")
+
+        for c in self.shear:
+            loc = c.loc
+            row(f"{loc}: Vu", "-", "-", f"{fmt(c.Vu_tf, 3)}", "tf", "")
+            if c.need_vs:
+                row(f"{loc}: Vs,req", "Vu/φ - Vc", f"{fmt(c.Vu_tf, 3)}/0.75 - {fmt(Vc_tf, 3)}",
+                    f"{fmt(c.Vs_req_tf, 3)}", "tf")
+            else:
+                row(f"{loc}: Vs,req", "Vu ≤ φVc", "-", "0", "tf")
+            if c.need_vs and c.Vs_req_tf > 0:
+                row(f"{loc}: s,req", "Av·fyt·d / Vs,req",
+                    f"{fmt(self.Av, 1)}·{fmt(fyt_MPa, 0)}·{fmt(d, 0)} / {fmt(c.Vs_req_N, 0)}", f"{fmt(c.s_req, 0)}",
+                    "mm")
+            row(f"{loc}: s limit", "min(s_req, s(Av,min), d/2)",
+                f"min({fmt(c.s_req, 0)}, {fmt(self.s_max_Av_min, 0)}, {fmt(c.s_geom_max, 0)})", f"{fmt(c.s_limit, 0)}",
+                "mm")
+            row(f"{loc}: Provide", f"Use {stirKey}", "-", f"{stirKey} @ {fmt(c.s_prov / 10, 0)} cm", "-", "OK")
+            status_shear = "PASS" if c.ok else "FAIL"
+            row(f"{loc}: Check", "φ(Vc+Vs) ≥ Vu", f"{fmt(c.phiVn_tf, 2)} ≥ {fmt(c.Vu_tf, 2)}", status_shear, "tf",
+                status_shear)
+
+        sec("4. FINAL STATUS")
+        row("Overall", "-", "-", "DESIGN COMPLETE", "-", "OK")
+        return rows
+
+
+class _Memo:
+    """Thread-safe LRU of computed values, keyed by the inputs they depend on."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            val = self._data.get(key)
+            if val is not None:
+                self._data.move_to_end(key)
+            return val
+
+    def put(self, key, val):
+        with self._lock:
+            self._data[key] = val
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+SECTION_KEYS = ('b', 'h', 'cover', 'agg', 'fc', 'fy', 'fyt', 'mainBar', 'stirrupBar')
+# every input the design depends on (the rest is report metadata)
+ENGINEERING_KEYS = SECTION_KEYS + tuple(k for _, _, k in MU_CASES) + tuple(k for _, _, k in VU_CASES)
+_SECTION_MEMO = _Memo(256)
+_FLEXURE_MEMO = _Memo(4096)
+_SHEAR_MEMO = _Memo(4096)
+
+
+def clear_memo():
+    """Drop the memoized section quantities and load-case results."""
+    for m in (_SECTION_MEMO, _FLEXURE_MEMO, _SHEAR_MEMO):
+        m.clear()
+
+
+def _count(counters, name):
+    if counters is not None:
+        counters[name] = counters.get(name, 0) + 1
+
+
+class SectionProps:
+    """Load-independent quantities of one geometry / material / bar set (mm, mm², MPa, N)."""
+    __slots__ = ('bw', 'h', 'cover', 'fc', 'fy', 'fyt', 'db_main', 'db_st', 'd', 'beta1', 'rho_min_terms',
+                 'As_min', 'As_max', 'bar_area', 'usable_width', 'req_clear', 'Vc_N', 'Av', 'Av_per_s_min',
+                 's_max_Av_min')
+
+
+def section_props(inputs):
+    """SectionProps for the geometry, materials and bars of ``inputs`` (not memoized)."""
+    p = SectionProps()
+    bw = inputs['b'] * 10
+    h = inputs['h'] * 10
+    cover = inputs['cover'] * 10
+    agg_mm = inputs['agg']
+
+    ksc_to_MPa = 0.0980665
+    fc_MPa = inputs['fc'] * ksc_to_MPa
+    fy_MPa = inputs['fy'] * ksc_to_MPa
+    fyt_MPa = inputs['fyt'] * ksc_to_MPa
+
+    barKey = inputs['mainBar']
+    stirKey = inputs['stirrupBar']
+    db_main = BAR_INFO[barKey]['d_mm']
+    db_st = BAR_INFO[stirKey]['d_mm']
+
+    d = h - cover - db_st - (db_main / 2.0)
+    p.bw, p.h, p.cover, p.fc, p.fy, p.fyt, p.db_main, p.db_st, p.d = bw, h, cover, fc_MPa, fy_MPa, fyt_MPa, \
+        db_main, db_st, d
+
+    # 1. MATERIALS
+    beta1 = beta1FromFc(fc_MPa)
+    term1 = 0.25 * math.sqrt(fc_MPa) / fy_MPa
+    term2 = 1.4 / fy_MPa
+    rho_min = max(term1, term2)
+    As_min = rho_min * bw * d
+
+    Es = 200000;
+    eps_cu = 0.003;
+    eps_y = fy_MPa / Es
+    rho_bal = 0.85 * beta1 * (fc_MPa / fy_MPa) * (eps_cu / (eps_cu + eps_y))
+    As_max = 0.75 * rho_bal * bw * d
+    p.beta1, p.rho_min_terms, p.As_min, p.As_max = beta1, (term1, term2), As_min, As_max
+
+    # 2. FLEXURE (bar layout)
+    p.bar_area = BAR_INFO[barKey]['A_cm2'] * 100
+    p.usable_width = bw - 2 * (cover + db_st)
+    p.req_clear = max(db_main, 25.0, 4 / 3 * agg_mm)
+
+    # 3. SHEAR (concrete and minimum stirrups)
+    p.Vc_N = 0.17 * math.sqrt(fc_MPa) * bw * d
+    p.Av = 2 * BAR_INFO[stirKey]['A_cm2'] * 100
+    term1_v = 0.062 * math.sqrt(fc_MPa) * bw / fyt_MPa
+    term2_v = 0.35 * bw / fyt_MPa
+    p.Av_per_s_min = max(term1_v, term2_v)
+    p.s_max_Av_min = p.Av / p.Av_per_s_min
+    return p
+
+
+def _flexure_values(p, Mu_tfm, counters):
+    Mu_Nmm = Mu_tfm * 9806650.0
+    As_req = solve_required_as(Mu_Nmm, p.As_min, p.As_max, p.fc, p.fy, p.bw, p.d, counters)
+    n = math.ceil(As_req / p.bar_area)
+    if n < 2: n = 2
+    As_prov = n * p.bar_area
+
+    res = flexureSectionResponse(As_prov, p.fc, p.fy, p.bw, p.d, counters=counters)
+    clear_spacing = (p.usable_width - n * p.db_main) / (n - 1) if n > 1 else p.usable_width - p.db_main
+    return (As_req, p.bar_area, n, As_prov, res['eps_t'], res['phi'], res['phiMn'], res['phiMn'] >= Mu_Nmm,
+            clear_spacing, p.req_clear, clear_spacing >= p.req_clear - 1)
+
+
+def _shear_values(p, Vu_tf):
+    Vc_N, Av, fyt_MPa, d = p.Vc_N, p.Av, p.fyt, p.d
+    phiVc_tf = PHI_V * (Vc_N / 9806.65)
+    Vu_N = Vu_tf * 9806.65
+    phiVc_N = phiVc_tf * 9806.65
+    needVs = Vu_N > phiVc_N
+
+    Vs_req_tf = 0
+    Vs_req_N = None
+    if needVs:
+        Vs_req_N = (Vu_N / PHI_V) - Vc_N
+        Vs_req_tf = Vs_req_N / 9806.65
+
+    s_req = 9999
+    if needVs and Vs_req_tf > 0:
+        s_req = (Av * fyt_MPa * d) / (Vs_req_N)
+
+    limit_high_shear = (Vs_req_tf * 9806.65) > (2 * Vc_N)
+    s_geom_max = min(d / 4, 300) if limit_high_shear else min(d / 2, 600)
+    s_limit = min(p.s_max_Av_min, s_geom_max)
+    if needVs: s_limit = min(s_limit, s_req)
+
+    s_prov = math.floor(s_limit / 10.0) * 10.0
+    if s_prov < 50: s_prov = 50
+
+    Vs_prov_N = (Av * fyt_MPa * d) / s_prov
+    phiVn_N = PHI_V * (Vc_N + Vs_prov_N)
+    phiVn_tf = phiVn_N / 9806.65
+    return needVs, Vs_req_N, Vs_req_tf, s_req, s_geom_max, s_limit, s_prov, phiVn_tf, phiVn_tf >= Vu_tf - 0.05
+
+
+def beam_result(inputs, counters=None, memo=True):
+    """Design one beam and return the numbers as a BeamResult (no report strings).
+
+    With ``memo`` the section quantities are reused per geometry / material /
+    bar set and every moment and shear case per (section, load), so changing
+    one load recomputes only that case.  ``counters`` then also gets
+    section_memo_hits, flexure_memo_hits and shear_memo_hits.
+    """
+    skey = tuple(inputs[k] for k in SECTION_KEYS)
+    p = _SECTION_MEMO.get(skey) if memo else None
+    if p is None:
+        p = section_props(inputs)
+        if memo:
+            _SECTION_MEMO.put(skey, p)
+    elif counters is not None:
+        _count(counters, 'section_memo_hits')
+
+    r = BeamResult()
+    r.inputs = inputs
+    r.bw, r.h, r.cover, r.fc, r.fy, r.fyt, r.db_main, r.db_st, r.d = p.bw, p.h, p.cover, p.fc, p.fy, p.fyt, \
+        p.db_main, p.db_st, p.d
+    r.beta1, r.rho_min_terms, r.As_min, r.As_max = p.beta1, p.rho_min_terms, p.As_min, p.As_max
+    r.Vc_N, r.Av, r.Av_per_s_min, r.s_max_Av_min = p.Vc_N, p.Av, p.Av_per_s_min, p.s_max_Av_min
+
+    r.flexure = []
+    for key, title, mu_key in MU_CASES:
+        c = FlexureCheck(key, title, inputs[mu_key])
+        r.flexure.append(c)
+        if c.Mu_tfm <= 0.001:
+            continue
+        v = _FLEXURE_MEMO.get((skey, c.Mu_tfm)) if memo else None
+        if v is None:
+            v = _flexure_values(p, c.Mu_tfm, counters)
+            if memo:
+                _FLEXURE_MEMO.put((skey, c.Mu_tfm), v)
+        else:
+            _count(counters, 'flexure_memo_hits')
+        (c.As_req, c.bar_area, c.n, c.As_prov, c.eps_t, c.phi, c.phiMn, c.strength_ok,
+         c.clear_spacing, c.req_clear, c.spacing_ok) = v
+
+    r.shear = []
+    for key, loc, vu_key in VU_CASES:
+        c = ShearCheck(key, loc, inputs[vu_key])
+        r.shear.append(c)
+        v = _SHEAR_MEMO.get((skey, c.Vu_tf)) if memo else None
+        if v is None:
+            v = _shear_values(p, c.Vu_tf)
+            if memo:
+                _SHEAR_MEMO.put((skey, c.Vu_tf), v)
+        else:
+            _count(counters, 'shear_memo_hits')
+        c.need_vs, c.Vs_req_N, c.Vs_req_tf, c.s_req, c.s_geom_max, c.s_limit, c.s_prov, c.phiVn_tf, c.ok = v
+    return r
+
+
+def process_calculation(inputs, counters=None, memo=True):
+    """``(rows, bar_counts, shear_res)`` for the report; see beam_result for the numbers alone."""
+    r = beam_result(inputs, counters, memo)
+    return r.rows(), r.bar_counts(), r.shear_res()
@@ -0,0 +1,615 @@
+"""Section drawings and the HTML calculation report.
+
+matplotlib is imported on the first drawing, not at module import.
+"""
+import base64
+import contextlib
+import functools
+import html as html_lib
+import io
+import sys
+import threading
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from beam_calc import BAR_INFO
+
+# 'svg' draws the sections directly; 'png' rasterizes them through matplotlib.
+DEFAULT_RENDERER = 'svg'
+
+
+# ==========================================
+# 4. PLOTTING & REPORT GEN
+# ==========================================
+def fig_to_base64(fig):
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight')
+    buf.seek(0)
+    return f"data:image/png;base64,{base64.b64encode(buf.read()).decode()}"
+
+
+def create_beam_section(b, h, cover, top_n, bot_n, stir_txt, m_db, s_db, title, bar_name,
+                        top_layers=None, bot_layers=None):
+    import matplotlib.patches as patches
+    import numpy as np
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    # a bare Figure, not pyplot: no global figure registry, so threads can draw side by side
+    fig = Figure(figsize=(3, 4))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    rect = patches.Rectangle((0, 0), b, h, linewidth=2, edgecolor='#333', facecolor='#FFF')
+    ax.add_patch(rect)
+    margin = cover + s_db / 20
+    rect_s = patches.Rectangle((margin, margin), b - 2 * margin, h - 2 * margin, linewidth=2, edgecolor='#2E7D32',
+                               facecolor='none', linestyle='-')
+    ax.add_patch(rect_s)
+
+    def draw_row(n, y, color):
+        n = int(n);
+        dia = m_db / 10
+        if n == 1:
+            xs = [b / 2]
+        else:
+            xs = np.linspace(margin + dia / 2, b - margin - dia / 2, n)
+        for x in xs:
+            ax.add_patch(patches.Circle((x, y), radius=dia / 2, edgecolor='black', facecolor=color))
+
+    def draw_layers(layers, face_y, direction, color):
+        for x, y, dia in layer_bars(layers, b, margin, face_y, direction):
+            ax.add_patch(patches.Circle((x, y), radius=dia / 2, edgecolor='black', facecolor=color))
+
+    if top_layers:
+        draw_layers(top_layers, h - margin, -1, '#1976D2')
+    else:
+        draw_row(int(top_n or 2), h - margin - m_db / 20, '#1976D2')
+    if bot_layers:
+        draw_layers(bot_layers, margin, 1, '#D32F2F')
+    else:
+        draw_row(int(bot_n or 2), margin + m_db / 20, '#D32F2F')
+    top_txt = layers_label(top_layers) if top_layers else f"{top_n}-{bar_name}"
+    bot_txt = layers_label(bot_layers) if bot_layers else f"{bot_n}-{bar_name}"
+
+    ax.set_xlim(-5, b + 5);
+    ax.set_ylim(-h * 0.2, h * 1.2);
+    ax.axis('off');
+    ax.set_aspect('equal')
+    ax.set_title(title, fontsize=10, fontweight='bold')
+    ax.text(b / 2, h * 1.05, top_txt, ha='center', color='#1976D2', fontsize=9)
+    ax.text(b / 2, -h * 0.05, bot_txt, ha='center', color='#D32F2F', fontsize=9)
+    ax.text(b / 2, -h * 0.15, f"Stir: {stir_txt}", ha='center', color='#2E7D32', fontsize=9)
+    return fig
+
+
+def bar_xs(n, b, margin, dia):
+    """x (cm) of ``n`` equal bars in a row; same spacing as draw_row in create_beam_section (np.linspace)."""
+    if n == 1:
+        return [b / 2]
+    lo, hi = margin + dia / 2, b - margin - dia / 2
+    return [lo + (hi - lo) * i / (n - 1) for i in range(n)]
+
+
+def layer_bars(layers, b, margin, face_y, direction, layer_gap=25.0):
+    """(x, y, dia) in cm for bar layers (outer layer first, bar keys left to right).
+
+    Bars sit on the stirrup at face_y; each further layer is layer_gap (mm)
+    clear of the previous one, towards the inside (direction +1 up, -1 down).
+    Bars in a layer are spread with equal clear gaps, like draw_row.
+    """
+    out = []
+    offset = 0.0
+    for i, layer in enumerate(layers):
+        dias = [BAR_INFO[k]['d_mm'] / 10 for k in layer]
+        if i:
+            offset += layer_gap / 10
+        y = face_y + direction * (offset + max(dias) / 2)
+        if len(dias) == 1:
+            xs = [b / 2]
+        else:
+            gap = (b - 2 * margin - sum(dias)) / (len(dias) - 1)
+            xs, x = [], margin
+            for dia in dias:
+                xs.append(x + dia / 2)
+                x += dia + gap
+        out += [(x, y, dia) for x, dia in zip(xs, dias)]
+        offset += max(dias)
+    return out
+
+
+def layers_label(layers):
+    """'3-DB25+1-DB20 / 2-DB16' style label for bar layers."""
+    parts = []
+    for layer in layers:
+        counts = {}
+        for k in layer:
+            counts[k] = counts.get(k, 0) + 1
+        parts.append("+".join(f"{n}-{k}" for k, n in counts.items()))
+    return " / ".join(parts)
+
+
+def _num(v):
+    return f"{v:.2f}".rstrip('0').rstrip('.')
+
+
+def create_beam_section_svg(b, h, cover, top_n, bot_n, stir_txt, m_db, s_db, title, bar_name,
+                            top_layers=None, bot_layers=None):
+    """SVG of the same drawing as create_beam_section (cm drawing units, y up flipped to SVG y down)."""
+    # matplotlib 3x4 in figure at 100 dpi; default axes box is 0.775 x 0.77 of it
+    scale = min(232.5 / (b + 10), 308.0 / (h * 1.4))  # px per cm
+    pt = 100.0 / 72.0 / scale  # one typographic point in drawing units
+    title_h = 16 * pt
+    y_top = h * 1.2 + title_h
+    W, H = b + 10, h * 1.4 + title_h
+
+    def Y(y):
+        return _num(y_top - y)
+
+    margin = cover + s_db / 20
+    dia = m_db / 10
+    lw = _num(2 * pt)
+    out = [f"<svg xmlns='http://www.w3.org/2000/svg' width='{_num(W * scale)}' height='{_num(H * scale)}' "
+           f"viewBox='-5 0 {_num(W)} {_num(H)}' font-family='DejaVu Sans, sans-serif' text-anchor='middle'>",
+           f"<rect x='0' y='{Y(h)}' width='{_num(b)}' height='{_num(h)}' fill='#FFF' stroke='#333' "
+           f"stroke-width='{lw}'/>",
+           f"<rect x='{_num(margin)}' y='{Y(h - margin)}' width='{_num(b - 2 * margin)}' "
+           f"height='{_num(h - 2 * margin)}' fill='none' stroke='#2E7D32' stroke-width='{lw}'/>"]
+
+    def draw_row(n, y, color):
+        out.append(f"<g fill='{color}' stroke='black' stroke-width='{_num(pt)}'>")
+        for x in bar_xs(int(n), b, margin, dia):
+            out.append(f"<circle cx='{_num(x)}' cy='{Y(y)}' r='{_num(dia / 2)}'/>")
+        out.append("</g>")
+
+    def draw_layers(layers, face_y, direction, color):
+        out.append(f"<g fill='{color}' stroke='black' stroke-width='{_num(pt)}'>")
+        for x, y, d in layer_bars(layers, b, margin, face_y, direction):
+            out.append(f"<circle cx='{_num(x)}' cy='{Y(y)}' r='{_num(d / 2)}'/>")
+        out.append("</g>")
+
+    if top_layers:
+        draw_layers(top_layers, h - margin, -1, '#1976D2')
+    else:
+        draw_row(int(top_n or 2), h - margin - m_db / 20, '#1976D2')
+    if bot_layers:
+        draw_layers(bot_layers, margin, 1, '#D32F2F')
+    else:
+        draw_row(int(bot_n or 2), margin + m_db / 20, '#D32F2F')
+
+    def text(y, txt, color, size, bold=False):
+        weight = " font-weight='bold'" if bold else ""
+        out.append(f"<text x='{_num(b / 2)}' y='{Y(y)}' fill='{color}' font-size='{_num(size * pt)}'{weight}>"
+                   f"{html_lib.escape(str(txt), quote=False)}</text>")
+
+    text(h * 1.2 + 6 * pt, title, '#000', 10, bold=True)
+    text(h * 1.05, layers_label(top_layers) if top_layers else f"{top_n}-{bar_name}", '#1976D2', 9)
+    text(-h * 0.05, layers_label(bot_layers) if bot_layers else f"{bot_n}-{bar_name}", '#D32F2F', 9)
+    text(-h * 0.15, f"Stir: {stir_txt}", '#2E7D32', 9)
+    out.append("</svg>")
+    return "".join(out)
+
+
+def svg_to_data_uri(svg):
+    return "data:image/svg+xml;charset=utf-8," + urllib.parse.quote(svg, safe=" '=:/.,;()-_@")
+
+
+# stands in for a section image that is still being drawn
+PENDING_SECTION = svg_to_data_uri(
+    "<svg xmlns='http://www.w3.org/2000/svg' width='232' height='330' font-family='DejaVu Sans, sans-serif'>"
+    "<rect x='1' y='1' width='230' height='328' fill='#FAFAFA' stroke='#CCC' stroke-dasharray='6 4'/>"
+    "<text x='116' y='170' text-anchor='middle' fill='#999' font-size='13'>Rendering...</text></svg>")
+
+
+class SectionImageCache:
+    """Bounded LRU of rendered section images (data URIs), keyed on the drawing inputs."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(b, h, cover, top_n, bot_n, stir_txt, m_db, s_db, title, bar_name, renderer=DEFAULT_RENDERER,
+            top_layers=None, bot_layers=None):
+        def frozen(layers):
+            return tuple(tuple(layer) for layer in layers) if layers else None
+
+        return (float(b), float(h), float(cover), top_n, bot_n, str(stir_txt),
+                float(m_db), float(s_db), str(title), str(bar_name), renderer,
+                frozen(top_layers), frozen(bot_layers))
+
+    def get(self, key):
+        with self._lock:
+            img = self._data.get(key)
+            if img is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return img
+
+    def put(self, key, img):
+        with self._lock:
+            self._data[key] = img
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        with self._lock:
+            nbytes = sum(sys.getsizeof(k) + sum(sys.getsizeof(x) for x in k if x is not None) + sys.getsizeof(v)
+                         for k, v in self._data.items())
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data),
+                    'maxsize': self.maxsize, 'bytes': nbytes}
+
+
+SECTION_CACHE = SectionImageCache()
+
+
+def render_beam_section(b, h, cover, top_n, bot_n, stir_txt, m_db, s_db, title, bar_name, renderer=None,
+                        top_layers=None, bot_layers=None, trace=None):
+    """Section image as a data URI, through SECTION_CACHE.
+
+    renderer is 'svg' (default) or 'png' (matplotlib; every call draws its own Figure).
+    top_layers / bot_layers draw a mixed or multi-layer arrangement instead of n bars.
+    An instrument.Trace passed as ``trace`` gets draw / encode times, cache hits and image bytes.
+    """
+    renderer = renderer or DEFAULT_RENDERER
+    args = (b, h, cover, top_n, bot_n, stir_txt, m_db, s_db, title, bar_name)
+    layers = {'top_layers': top_layers, 'bot_layers': bot_layers}
+    key = SectionImageCache.key(*args, renderer=renderer, **layers)
+    img = SECTION_CACHE.get(key)
+    if trace is not None:
+        trace.count('section_cache_hits' if img is not None else 'section_cache_misses')
+    if img is None:
+        img = _draw_section(*args, renderer=renderer, trace=trace, **layers)
+        SECTION_CACHE.put(key, img)
+    if trace is not None:
+        trace.payload('section_images', img)
+    return img
+
+
+def _draw_section(*args, renderer, top_layers=None, bot_layers=None, trace=None):
+    """Draw and encode one section image, without SECTION_CACHE."""
+    stage = trace.stage if trace is not None else _no_stage
+    layers = {'top_layers': top_layers, 'bot_layers': bot_layers}
+    if renderer == 'svg':
+        with stage('draw'):
+            svg = create_beam_section_svg(*args, **layers)
+        with stage('encode'):
+            return svg_to_data_uri(svg)
+    if renderer == 'png':
+        with stage('draw'):
+            fig = create_beam_section(*args, **layers)
+        with stage('encode'):
+            return fig_to_base64(fig)
+    raise ValueError(f"unknown renderer '{renderer}'")
+
+
+@contextlib.contextmanager
+def _no_stage(name):
+    yield
+
+
+def _section_specs(inputs, bar_counts, shear_res, layouts):
+    """(args, layers) for render_beam_section of the left, mid and right summary images."""
+    layouts = layouts or {}
+    m_db = BAR_INFO[inputs['mainBar']]['d_mm']
+    s_db = BAR_INFO[inputs['stirrupBar']]['d_mm']
+    for loc, v_key, title in (("L", "V_L", "Left Support"), ("M", "V_M", "Mid Span"), ("R", "V_R", "Right Support")):
+        args = (inputs['b'], inputs['h'], inputs['cover'], bar_counts.get(f"{loc}_TOP", 2),
+                bar_counts.get(f"{loc}_BOT", 2), f"@{shear_res[v_key] / 10:.0f}cm", m_db, s_db, title,
+                inputs['mainBar'])
+        yield args, {'top_layers': layouts.get(f"{loc}_TOP"), 'bot_layers': layouts.get(f"{loc}_BOT")}
+
+
+def render_report_sections(inputs, bar_counts, shear_res, renderer=None, layouts=None, trace=None, reuse=None):
+    """The three summary images (left, mid, right) of a designed beam.
+
+    layouts optionally maps bar_counts keys (e.g. 'L_TOP') to bar layers.
+    reuse is an optional dict kept by the caller between reruns (e.g. in the
+    Streamlit session): a section whose bars and stirrup spacing are unchanged
+    is taken from it without touching SECTION_CACHE, and the dict is left
+    holding only the current three images.
+    """
+    renderer = renderer or DEFAULT_RENDERER
+    images = []
+    current = {}
+    for args, layers in _section_specs(inputs, bar_counts, shear_res, layouts):
+        img = None
+        if reuse is not None:
+            key = SectionImageCache.key(*args, renderer=renderer, **layers)
+            img = reuse.get(key)
+            if trace is not None and img is not None:
+                trace.count('section_reused')
+        if img is None:
+            img = render_beam_section(*args, renderer=renderer, trace=trace, **layers)
+        if reuse is not None:
+            current[key] = img
+        images.append(img)
+    if reuse is not None:
+        reuse.clear()
+        reuse.update(current)
+    return images
+
+
+RENDER_WORKERS = 3
+_RENDER_POOL = None
+_RENDER_POOL_LOCK = threading.Lock()
+
+
+def render_pool():
+    """Process-wide thread pool for section drawing, shared by every Streamlit session."""
+    global _RENDER_POOL
+    with _RENDER_POOL_LOCK:
+        if _RENDER_POOL is None:
+            _RENDER_POOL = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix='section-render')
+        return _RENDER_POOL
+
+
+def submit_report_sections(inputs, bar_counts, shear_res, renderer=None, layouts=None, reuse=None, executor=None,
+                           trace=None):
+    """Start drawing the three summary images; returns their jobs, ``(key, future)`` for left, mid, right.
+
+    Images found in ``reuse`` (see render_report_sections) or SECTION_CACHE come
+    back as finished futures; the rest are drawn on ``executor`` (default
+    render_pool(); a ProcessPoolExecutor works too).  Every task draws its own
+    figure and only returns the data URI, so no matplotlib or Streamlit object
+    crosses threads.  ``reuse`` is only read here; harvest_report_sections
+    updates it on the calling thread.  ``trace`` only gets counters, on the
+    calling thread.
+    """
+    renderer = renderer or DEFAULT_RENDERER
+    executor = executor or render_pool()
+    jobs = []
+    for args, layers in _section_specs(inputs, bar_counts, shear_res, layouts):
+        key = SectionImageCache.key(*args, renderer=renderer, **layers)
+        img = reuse.get(key) if reuse is not None else None
+        if img is not None:
+            _count(trace, 'section_reused')
+        else:
+            img = SECTION_CACHE.get(key)
+            _count(trace, 'section_cache_hits' if img is not None else 'section_cache_misses')
+        if img is not None:
+            fut = Future()
+            fut.set_result(img)
+        else:
+            fut = executor.submit(_draw_section, *args, renderer=renderer, **layers)
+            # content-addressed, so a drawing that finishes after its rerun is still valid here
+            fut.add_done_callback(functools.partial(_cache_section, key))
+        jobs.append((key, fut))
+    return jobs
+
+
+def _cache_section(key, fut):
+    if not fut.cancelled() and fut.exception() is None:
+        SECTION_CACHE.put(key, fut.result())
+
+
+def harvest_report_sections(jobs, reuse=None):
+    """Images of ``jobs`` from submit_report_sections, PENDING_SECTION for those still drawing.
+
+    Once all three are done, ``reuse`` is left holding exactly them.
+    """
+    images = [fut.result() if fut.done() else PENDING_SECTION for _, fut in jobs]
+    if reuse is not None and PENDING_SECTION not in images:
+        reuse.clear()
+        reuse.update((key, img) for (key, _), img in zip(jobs, images))
+    return images
+
+
+def _count(trace, name):
+    if trace is not None:
+        trace.count(name)
+
+
+def section_cache_info():
+    return SECTION_CACHE.info()
+
+
+def _table_rows(rows):
+    # one line per row: the markup is sent to the browser for every report, indentation included
+    for r in rows:
+        if r[0] == "SECTION":
+            yield f"<tr class='sec-row'><td colspan='6'>{r[1]}</td></tr>\n"
+        else:
+            status_cls = "pass-ok" if "OK" in r[5] or "PASS" in r[5] else "pass-no"
+            val_cls = "load-value" if r[1] == "-" and (r[4] == "tf-m" or r[4] == "tf") else ""
+            yield (f"<tr><td>{r[0]}</td><td>{r[1]}</td><td>{r[2]}</td><td class='{val_cls}'>{r[3]}</td>"
+                   f"<td>{r[4]}</td><td class='{status_cls}'>{r[5]}</td></tr>\n")
+
+
+_REPORT_HEAD = """
+    <!DOCTYPE html>
+    <html lang="th">
+    <head>
+        <meta charset="UTF-8">
+        <title>Engineering Design Report</title>
+        <link href="https://fonts.googleapis.com/css2?family=Sarabun:wght@400;700&display=swap" rel="stylesheet">
+        <style>
+            body { font-family: 'Sarabun', sans-serif; padding: 20px; -webkit-print-color-adjust: exact; color: black; background: white; }
+            h1, h3 { text-align: center; margin: 5px; }
+            .header { position: relative; margin-bottom: 20px; border-bottom: 2px solid #333; padding-bottom: 10px; }
+
+            .beam-box {
+                position: absolute;
+                top: 0;
+                right: 0;
+                border: 2px solid #333;
+                padding: 8px 20px;
+                font-size: 20px;
+                font-weight: bold;
+                background: #fff;
+            }
+
+            .info-container { display: flex; justify-content: space-between; margin-bottom: 20px; }
+            .info-box { width: 48%; border: 1px solid #ddd; padding: 10px; border-radius: 5px; background: #f9f9f9; }
+            .images { display: flex; justify-content: space-around; margin: 20px 0; }
+            .images img { width: 30%; border: 1px solid #ddd; padding: 5px; }
+
+            table { width: 100%; border-collapse: collapse; margin-top: 20px; font-size: 12px; }
+            th, td { border: 1px solid #444; padding: 6px; }
+            th { background-color: #eee; }
+            .sec-row { background-color: #ddd; font-weight: bold; }
+            .pass-ok { color: green; font-weight: bold; text-align: center; }
+            .pass-no { color: red; font-weight: bold; text-align: center; }
+            .load-value { color: #D32F2F !important; font-weight: bold; }
+
+            .footer-section {
+                margin-top: 50px;
+                page-break-inside: avoid;
+            }
+            .signature-block {
+                width: 300px;
+                text-align: center;
+            }
+            .sign-line {
+                border-bottom: 1px solid #000;
+                margin: 40px 0 10px 0;
+                width: 100%;
+            }
+
+            @media print {
+                .no-print { display: none !important; }
+                body { padding: 0; margin: 0; }
+                .info-box { border: 1px solid #333; }
+                .load-value { color: #D32F2F !important; -webkit-print-color-adjust: exact; }
+            }
+
+            .print-btn-internal {
+                background-color: #4CAF50; color: white; padding: 12px 24px;
+                border: none; border-radius: 5px; cursor: pointer; font-size: 16px;
+                margin-bottom: 20px; font-weight: bold; font-family: 'Sarabun', sans-serif;
+                box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+            }
+            .print-btn-internal:hover { background-color: #45a049; }
+        </style>
+    </head>
+    <body>
+        <div class="no-print" style="text-align: center;">
+            <button onclick="window.print()" class="print-btn-internal">🖨️ Print This Page / พิมพ์หน้านี้</button>
+        </div>
+
+"""
+
+_REPORT_TAIL = """    </body>
+    </html>
+    """
+
+_PAGE_BREAK = """
+        <div style="page-break-after: always;"></div>
+
+"""
+
+
+def _beam_chunks(inputs, rows, img_b64_list):
+    """One beam's header, summary images, calculation table and signature block, piece by piece."""
+    yield f"""        <div class="header">
+            <div class="beam-box">{inputs['beam_id']}</div>
+            <h1>ENGINEERING DESIGN REPORT</h1>
+            <h3>RC Beam Design SDM</h3>
+        </div>
+
+        <div class="info-container">
+            <div class="info-box">
+                <strong>Project:</strong> {inputs['project']}<br>
+                <strong>Engineer:</strong> {inputs['engineer']}<br>
+                <strong>Date:</strong> 15/12/2568
+            </div>
+            <div class="info-box">
+                <strong>Materials:</strong> fc'={inputs['fc']} ksc, fy={inputs['fy']} ksc<br>
+                <strong>Section:</strong> {inputs['b']} x {inputs['h']} cm, Cover={inputs['cover']} cm
+            </div>
+        </div>
+
+        <h3>Design Summary</h3>
+        <div class="images">
+            <img src="{img_b64_list[0]}" />
+            <img src="{img_b64_list[1]}" />
+            <img src="{img_b64_list[2]}" />
+        </div>
+
+        <br><br><br><br><br><br><br><br><br><br><br><br><br><br><br>
+
+        <h3>Calculation Details</h3>
+        <table>
+            <thead>
+                <tr>
+                    <th width="20%">Item</th>
+                    <th width="30%">Formula</th>
+                    <th width="25%">Substitution</th>
+                    <th>Result</th>
+                    <th>Unit</th>
+                    <th>Status</th>
+                </tr>
+            </thead>
+            <tbody>
+                """
+    yield from _table_rows(rows)
+    yield f"""
+            </tbody>
+        </table>
+
+        <div class="footer-section">
+            <div class="signature-block">
+                <div style="text-align: left; font-weight: bold;">Designed by:</div>
+                <div class="sign-line"></div>
+                <div>({inputs['engineer']})</div>
+                <div>วิศวกรโครงสร้าง</div>
+            </div>
+        </div>
+"""
+
+
+def generate_full_html_report(inputs, rows, img_b64_list=None, bar_counts=None, shear_res=None, renderer=None,
+                              layouts=None):
+    if img_b64_list is None:
+        img_b64_list = render_report_sections(inputs, bar_counts, shear_res, renderer, layouts)
+    return _REPORT_HEAD + "".join(_beam_chunks(inputs, rows, img_b64_list)) + _REPORT_TAIL
+
+
+def iter_multi_beam_report(beams, renderer=None, image_src=None):
+    """HTML of a multi-beam report as a stream of string chunks.
+
+    The head (styles, print button) is emitted once, then every beam exactly as
+    in generate_full_html_report, separated by page breaks, then the closing
+    tags.  ``beams`` yields ``(inputs, rows, bar_counts, shear_res)`` or
+    ``(inputs, rows, bar_counts, shear_res, layouts)`` and is consumed one beam
+    at a time, so a generator that designs beams on demand keeps memory flat.
+    ``image_src`` maps each section image (a data URI) to the ``src`` written
+    in the HTML, e.g. report_bundle.AssetStore.src for hashed asset paths.
+    """
+    yield _REPORT_HEAD
+    for i, (inputs, rows, bar_counts, shear_res, *layouts) in enumerate(beams):
+        images = render_report_sections(inputs, bar_counts, shear_res, renderer, layouts[0] if layouts else None)
+        if image_src is not None:
+            images = [image_src(img) for img in images]
+        if i:
+            yield _PAGE_BREAK
+        yield from _beam_chunks(inputs, rows, images)
+    yield _REPORT_TAIL
+
+
+def write_multi_beam_report(sink, beams, renderer=None, buffer_size=1 << 16, image_src=None):
+    """Stream iter_multi_beam_report into a text file-like ``sink``; returns the characters written.
+
+    Chunks are joined up to ``buffer_size`` characters before each write.
+    """
+    buf, size, total = [], 0, 0
+    for chunk in iter_multi_beam_report(beams, renderer, image_src):
+        buf.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            sink.write("".join(buf))
+            total += size
+            buf, size = [], 0
+    sink.write("".join(buf))
+    return total + size
@@ -0,0 +1,222 @@
+"""Benchmark suite for the design pipeline with regression thresholds.
+
+Times each stage (flexure response, As solve, vectorized flexure, a
+10^5-point parametric sweep, a Monte Carlo reliability chunk, full
+process_calculation, numbers-only beam_result, memoized recompute after one
+load change, section drawing + encoding, HTML report) on deterministic
+single-beam and 1k / 10k-beam schedule workloads, writes the results as JSON
+and compares them with a stored baseline.  A stage slower than the baseline
+by more than ``--threshold`` percent fails the run (exit status 1).
+
+    python bench.py --save                 # record bench_baseline.json on this machine
+    python bench.py                        # compare against it
+    python bench.py --quick --threshold 25 --only process
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+import beam_calc
+import beam_report
+
+BASELINE = 'bench_baseline.json'
+DEFAULT_THRESHOLD = 15.0
+
+MU_KEYS = ['mu_L_n', 'mu_L_p', 'mu_M_n', 'mu_M_p', 'mu_R_n', 'mu_R_p']
+VU_KEYS = ['vu_L', 'vu_M', 'vu_R']
+
+
+def make_schedule(n, seed=2568):
+    """A deterministic beam schedule with the spread of sizes and loads of a typical building."""
+    rng = random.Random(seed)
+    beams = []
+    for i in range(n):
+        b = rng.choice([20, 25, 25, 30, 30, 40])
+        h = rng.choice([40, 50, 50, 60, 70, 80])
+        scale = b * h * h / (25 * 50 * 50)
+        beam = {
+            'project': "Benchmark", 'beam_id': f"B-{i + 1:05d}", 'engineer': "-",
+            'b': b, 'h': h, 'cover': 3.0, 'agg': 20,
+            'fc': rng.choice([240, 280, 320]), 'fy': 4000, 'fyt': 2400,
+            'mainBar': rng.choice(['DB16', 'DB20', 'DB25']), 'stirrupBar': rng.choice(['RB6', 'RB9']),
+        }
+        for k in MU_KEYS:
+            beam[k] = 0.0 if rng.random() < 0.15 else round(rng.uniform(1.0, 12.0) * scale, 2)
+        for k in VU_KEYS:
+            beam[k] = round(rng.uniform(2.0, 18.0) * scale ** 0.5, 2)
+        beams.append(beam)
+    return beams
+
+
+def _section_args(beams):
+    """(As, fc, fy, bw, d, Mu, As_min, As_max) in calc units for every non-zero moment case."""
+    out = []
+    for inp in beams:
+        p = beam_calc.section_props(inp)
+        for k in MU_KEYS:
+            if inp[k] > 0.001:
+                out.append((0.5 * (p.As_min + p.As_max), p.fc, p.fy, p.bw, p.d, inp[k] * 9806650.0, p.As_min,
+                            p.As_max))
+    return out
+
+
+def _stages(quick):
+    single = make_schedule(1)
+    s1k = make_schedule(1000)
+    cases = _section_args(s1k)[:1000]
+    rows, bars, shears = beam_calc.process_calculation(single[0])
+    images = beam_report.render_report_sections(single[0], bars, shears, renderer='png')
+    batch_args = [[c[i] for c in cases] for i in range(6)]
+
+    def flexure():
+        for As, fc, fy, bw, d, *_ in cases:
+            beam_calc.flexureSectionResponse(As, fc, fy, bw, d)
+
+    def solve():
+        for _, fc, fy, bw, d, Mu, As_min, As_max in cases:
+            beam_calc.solve_required_as(Mu, As_min, As_max, fc, fy, bw, d)
+
+    def flexure_vectorized():
+        import flexure_batch
+        flexure_batch.flexure_batch(*batch_args)
+
+    def sweep_grid():
+        import sweep
+        sweep.sweep(single[0], {'h': [30 + 0.1 * i for i in range(501)], 'fc': list(range(150, 351))})
+
+    def reliability_chunk():
+        import numpy as np
+        import reliability
+        reliability.margins(reliability.limit_states(single[0]), reliability.merge_spec(), 1 << 18,
+                            np.random.default_rng(0))
+
+    def process_single():
+        beam_calc.process_calculation(single[0], memo=False)
+
+    def numbers_single():
+        beam_calc.beam_result(single[0], memo=False)
+
+    tweaked = dict(single[0])
+
+    def load_tweak():
+        # one load changes per call; the section and the other cases come from the memo
+        tweaked['vu_M'] += 0.001
+        beam_calc.beam_result(tweaked)
+
+    def process_schedule(beams):
+        def run():
+            for inp in beams:
+                beam_calc.process_calculation(inp, memo=False)
+        return run
+
+    def section_png():
+        fig = beam_report.create_beam_section(25, 50, 3.0, 3, 2, "@15cm", 16, 6, "Left Support", 'DB16')
+        beam_report.fig_to_base64(fig)
+
+    def section_svg():
+        beam_report.svg_to_data_uri(
+            beam_report.create_beam_section_svg(25, 50, 3.0, 3, 2, "@15cm", 16, 6, "Left Support", 'DB16'))
+
+    def html_report():
+        beam_report.generate_full_html_report(single[0], rows, images)
+
+    stages = [
+        # name, function, items per call, repeats
+        ('flexureSectionResponse', flexure, len(cases), 5),
+        ('solve_required_as', solve, len(cases), 3),
+        ('flexure_batch', flexure_vectorized, len(cases), 20),
+        ('sweep_100k', sweep_grid, 501 * 201, 3),
+        ('reliability_chunk', reliability_chunk, 1 << 18, 5),
+        ('process_calculation', process_single, 1, 200),
+        ('beam_result', numbers_single, 1, 200),
+        ('beam_result_load_tweak', load_tweak, 1, 200),
+        ('process_schedule_1k', process_schedule(s1k), len(s1k), 3),
+        ('section_png', section_png, 1, 10),
+        ('section_svg', section_svg, 1, 200),
+        ('html_report', html_report, 1, 50),
+    ]
+    if not quick:
+        s10k = make_schedule(10000)
+        stages.insert(4, ('process_schedule_10k', process_schedule(s10k), len(s10k), 1))
+    return stages
+
+
+def run(only=None, quick=False):
+    results = {}
+    for name, fn, items, repeats in _stages(quick):
+        if only and not any(o in name for o in only):
+            continue
+        fn()  # warm-up (imports, caches)
+        times = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        best = min(times)
+        results[name] = {'seconds': best, 'median_s': statistics.median(times), 'items': items,
+                         'per_item_us': best / items * 1e6, 'items_per_s': items / best, 'repeats': repeats}
+    return {
+        'meta': {'python': platform.python_version(), 'platform': platform.platform(),
+                 'machine': platform.machine(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S')},
+        'stages': results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """List of (stage, baseline_s, current_s, change_%, regressed) for stages present in both."""
+    out = []
+    for name, cur in current['stages'].items():
+        base = baseline.get('stages', {}).get(name)
+        if not base:
+            continue
+        change = (cur['seconds'] - base['seconds']) / base['seconds'] * 100.0
+        out.append((name, base['seconds'], cur['seconds'], change, change > threshold))
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the design pipeline and check for regressions.")
+    ap.add_argument('--baseline', default=BASELINE, help="baseline JSON to compare with / save to")
+    ap.add_argument('--save', action='store_true', help="write this run as the new baseline")
+    ap.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                    help="allowed slowdown per stage in percent (default %(default)s)")
+    ap.add_argument('--only', nargs='*', help="run only stages whose name contains one of these")
+    ap.add_argument('--quick', action='store_true', help="skip the 10k-beam schedule")
+    ap.add_argument('-o', '--output', help="also write this run's results to a JSON file")
+    args = ap.parse_args(argv)
+
+    current = run(args.only, args.quick)
+    for name, r in current['stages'].items():
+        print(f"{name:<26} {r['seconds'] * 1e3:>10.2f} ms  {r['per_item_us']:>10.1f} µs/item  "
+              f"{r['items_per_s']:>12,.0f} items/s")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+    if args.save:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"no baseline at {args.baseline}; run with --save to record one")
+        return 0
+
+    failed = False
+    print(f"\nvs {args.baseline} (threshold +{args.threshold:.0f}%)")
+    for name, base_s, cur_s, change, regressed in compare(current, baseline, args.threshold):
+        failed |= regressed
+        print(f"{name:<26} {base_s * 1e3:>10.2f} -> {cur_s * 1e3:>10.2f} ms  {change:>+7.1f}%"
+              f"{'  REGRESSION' if regressed else ''}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
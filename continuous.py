@@ -0,0 +1,235 @@
+"""Continuous-beam analysis feeding the design.
+
+Slope-deflection stiffness method for a multi-span beam on knife-edge
+supports: one rotation per support, so the stiffness matrix is tridiagonal.
+It is factorized once per geometry (banded Cholesky) and every load case is
+then a forward / back substitution over all cases at once.  Uniform span
+loads (tf/m) are the load cases; combinations are factor matrices applied by
+superposition to the case diagrams, so hundreds of combinations cost one
+matrix product.
+
+``span_inputs`` reduces the combination diagrams of each span to the nine
+design forces of the app (Mu-/Mu+ and Vu over the left quarter, the middle
+half and the right quarter) and returns one ``inputs`` dict per span for
+process_calculation or batch_run.
+
+    python continuous.py 6 6 5 --dead 2.5 --live 1.2 --inputs beam.json
+    python continuous.py 6 6 5 --dead 2.5 --live 1.2 --inputs beam.json -o schedule.csv
+"""
+import argparse
+import csv
+import json
+import sys
+
+import numpy as np
+
+from beam_calc import process_calculation
+
+SUPPORTS = ('pin', 'fixed')
+
+
+def parse_spans(text):
+    """Span lengths (m) from text like '6, 6, 5' (commas or semicolons); ValueError if any is not a positive number."""
+    parts = [v.strip() for v in text.replace(';', ',').split(',')]
+    if not any(parts):
+        raise ValueError("enter at least one span length")
+    try:
+        spans = [float(v) for v in parts if v]
+    except ValueError:
+        raise ValueError(f"span lengths must be numbers: '{text}'") from None
+    if any(not s > 0 for s in spans):
+        raise ValueError(f"span lengths must be positive: '{text}'")
+    return spans
+
+
+class ContinuousBeam:
+    """Spans (m) with flexural rigidity ``EI`` (scalar or per span, any consistent unit).
+
+    ``left`` / ``right`` end supports are 'pin' or 'fixed'; interior supports are pins.
+    """
+
+    def __init__(self, spans, EI=1.0, left='pin', right='pin'):
+        if left not in SUPPORTS or right not in SUPPORTS:
+            raise ValueError(f"end supports must be one of {SUPPORTS}")
+        self.spans = np.asarray(spans, dtype=float)
+        if self.spans.ndim != 1 or not len(self.spans) or (self.spans <= 0).any():
+            raise ValueError("spans must be a non-empty list of positive lengths")
+        self.EI = np.broadcast_to(np.asarray(EI, dtype=float), self.spans.shape)
+        self.nodes = np.r_[0.0, np.cumsum(self.spans)]
+        self.k = 2 * self.EI / self.spans  # 2EI/L of each span
+
+        n = len(self.spans) + 1
+        diag = np.zeros(n)
+        diag[:-1] += 2 * self.k
+        diag[1:] += 2 * self.k
+        free = np.ones(n, dtype=bool)
+        free[0] = left == 'pin'
+        free[-1] = right == 'pin'
+        self.free = np.flatnonzero(free)
+        # off-diagonal K[i, i-1] among the free rotations (0 between non-adjacent ones)
+        off = np.where(np.diff(self.free) == 1, self.k[self.free[:-1]], 0.0)
+        self._factor(diag[self.free], off)
+
+    def _factor(self, a, b):
+        """Cholesky of the tridiagonal K: diagonal l and sub-diagonal m of L (K = L Lᵀ)."""
+        l = np.empty_like(a)
+        m = np.zeros_like(a)
+        for i in range(len(a)):
+            if i:
+                m[i] = b[i - 1] / l[i - 1]
+            piv = a[i] - m[i] ** 2
+            if piv <= 0:
+                raise ValueError("stiffness matrix is not positive definite (unstable beam)")
+            l[i] = np.sqrt(piv)
+        self._l, self._m = l, m
+
+    def _solve(self, r):
+        """K θ = r for the free rotations; r is (n_free, n_cases)."""
+        l, m = self._l, self._m
+        y = np.empty_like(r)
+        for i in range(len(l)):
+            y[i] = (r[i] - m[i] * y[i - 1]) / l[i] if i else r[i] / l[i]
+        for i in range(len(l) - 1, -1, -1):
+            y[i] = (y[i] - m[i + 1] * y[i + 1]) / l[i] if i + 1 < len(l) else y[i] / l[i]
+        return y
+
+    def end_moments(self, w):
+        """Member end moments (clockwise positive) for span loads ``w`` (n_cases, n_spans) in tf/m.
+
+        Returns (M_ab, M_ba), each (n_cases, n_spans), in tf-m.
+        """
+        w = np.atleast_2d(np.asarray(w, dtype=float))
+        fem = w * self.spans ** 2 / 12.0
+        node_fem = np.zeros((w.shape[0], len(self.nodes)))
+        node_fem[:, :-1] -= fem
+        node_fem[:, 1:] += fem
+        theta = np.zeros_like(node_fem)
+        if len(self.free):
+            theta[:, self.free] = self._solve(-node_fem[:, self.free].T).T
+        M_ab = -fem + self.k * (2 * theta[:, :-1] + theta[:, 1:])
+        M_ba = fem + self.k * (2 * theta[:, 1:] + theta[:, :-1])
+        return M_ab, M_ba
+
+    def stations(self, per_span=11):
+        """Station x (m) and span index; every span gets ``per_span`` stations including both ends."""
+        t = np.linspace(0.0, 1.0, per_span)
+        x = (self.nodes[:-1, None] + self.spans[:, None] * t).ravel()
+        return x, np.repeat(np.arange(len(self.spans)), per_span)
+
+    def diagrams(self, w, per_span=11):
+        """Sagging-positive moment (tf-m) and shear (tf) at the stations for every load case.
+
+        Returns x, span index, M and V, the last two shaped (n_cases, n_stations).
+        """
+        w = np.atleast_2d(np.asarray(w, dtype=float))
+        M_ab, M_ba = self.end_moments(w)
+        x, span = self.stations(per_span)
+        L = self.spans[span]
+        xl = x - self.nodes[span]
+        wl = w[:, span]
+        M = M_ab[:, span] * (1 - xl / L) - M_ba[:, span] * (xl / L) + wl * xl * (L - xl) / 2
+        V = -(M_ab[:, span] + M_ba[:, span]) / L + wl * (L / 2 - xl)
+        return x, span, M, V
+
+
+def live_load_patterns(n_spans):
+    """ACI pattern live load as 0/1 rows: all spans, alternate spans, and for each interior support.
+
+    The support rows load the two spans next to the support and every second
+    span outward from them on both sides (s-1, s-3, ... and s, s+2, ...),
+    which gives the largest hogging moment there.
+    """
+    i = np.arange(n_spans)
+    rows = [np.ones(n_spans), i % 2 == 0, i % 2 == 1]
+    for s in range(1, n_spans):  # support between spans s-1 and s
+        rows.append(((i < s) & ((s - 1 - i) % 2 == 0)) | ((i >= s) & ((i - s) % 2 == 0)))
+    pats = np.unique(np.array(rows, dtype=float), axis=0)
+    return pats[pats.any(axis=1)]
+
+
+def analyze(beam, dead, live, per_span=11, patterns=True):
+    """Factored diagrams for 1.4D and 1.2D + 1.6L (every live pattern).
+
+    ``dead`` / ``live`` are span loads in tf/m (scalar or per span).  Returns
+    x, span index, Mu, Vu (n_combos, n_stations) and the combination names.
+    """
+    n = len(beam.spans)
+    dead = np.broadcast_to(np.asarray(dead, dtype=float), (n,))
+    live = np.broadcast_to(np.asarray(live, dtype=float), (n,))
+    pats = live_load_patterns(n) if patterns else np.ones((1, n))
+    cases = np.vstack([dead, pats * live])  # case 0 dead, then one case per live pattern
+    x, span, M, V = beam.diagrams(cases, per_span)
+
+    factors = np.zeros((1 + len(pats), len(cases)))
+    factors[0, 0] = 1.4
+    factors[1:, 0] = 1.2
+    factors[1:, 1:] = 1.6 * np.eye(len(pats))
+    names = ["1.4D"] + [f"1.2D+1.6L[{''.join('x' if p else '-' for p in pat)}]" for pat in pats]
+    return x, span, factors @ M, factors @ V, names
+
+
+def span_inputs(base, beam, x, span, Mu, Vu):
+    """One app ``inputs`` dict per span, with the nine design forces taken from the diagrams.
+
+    Each span is split into its left quarter, middle half and right quarter;
+    a zone's Mu- / Mu+ are the largest hogging / sagging moments and its Vu the
+    largest |Vu| over its stations and all combinations.
+    """
+    out = []
+    for s in range(len(beam.spans)):
+        on = span == s
+        t = (x[on] - beam.nodes[s]) / beam.spans[s]
+        zones = {'L': t <= 0.25, 'M': (t >= 0.25) & (t <= 0.75), 'R': t >= 0.75}
+        inputs = dict(base, beam_id=f"{base.get('beam_id', 'B')}-S{s + 1}")
+        for z, sel in zones.items():
+            m = Mu[:, on][:, sel]
+            inputs[f'mu_{z}_n'] = round(float(max(-m.min(), 0.0)), 3)
+            inputs[f'mu_{z}_p'] = round(float(max(m.max(), 0.0)), 3)
+            inputs[f'vu_{z}'] = round(float(np.abs(Vu[:, on][:, sel]).max()), 3)
+        out.append(inputs)
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Analyse a continuous beam and design every span.")
+    ap.add_argument('spans', type=float, nargs='+', help="span lengths (m)")
+    ap.add_argument('--dead', type=float, nargs='+', required=True, help="dead load (tf/m), one value or one per span")
+    ap.add_argument('--live', type=float, nargs='+', default=[0.0], help="live load (tf/m), one value or one per span")
+    ap.add_argument('--inputs', required=True, help="JSON with the app inputs (section, materials, bars)")
+    ap.add_argument('--left', choices=SUPPORTS, default='pin')
+    ap.add_argument('--right', choices=SUPPORTS, default='pin')
+    ap.add_argument('--stations', type=int, default=21, help="stations per span")
+    ap.add_argument('-o', '--output', help="write the span design inputs as a batch_run schedule (.csv or .json)")
+    args = ap.parse_args(argv)
+
+    with open(args.inputs, encoding='utf-8') as f:
+        base = json.load(f)
+    beam = ContinuousBeam(args.spans, left=args.left, right=args.right)
+    x, span, Mu, Vu, names = analyze(beam, args.dead if len(args.dead) > 1 else args.dead[0],
+                                     args.live if len(args.live) > 1 else args.live[0], args.stations)
+    beams = span_inputs(base, beam, x, span, Mu, Vu)
+
+    if args.output:
+        if args.output.lower().endswith('.json'):
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(beams, f, ensure_ascii=False, indent=1)
+        else:
+            with open(args.output, 'w', newline='', encoding='utf-8') as f:
+                w = csv.DictWriter(f, fieldnames=list(beams[0]))
+                w.writeheader()
+                w.writerows(beams)
+
+    print(f"{len(args.spans)} spans, {len(names)} combinations")
+    failed = 0
+    for inputs in beams:
+        rows, _, _ = process_calculation(inputs)
+        ok = not any(r[5] == "FAIL" for r in rows if r[0] != "SECTION")
+        failed += not ok
+        print(f"  {inputs['beam_id']:<10} Mu- {inputs['mu_L_n']:>7.2f} {inputs['mu_R_n']:>7.2f}  "
+              f"Mu+ {inputs['mu_M_p']:>7.2f}  Vu {inputs['vu_L']:>6.2f} {inputs['vu_R']:>6.2f}  "
+              f"{'PASS' if ok else 'FAIL'}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
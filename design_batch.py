@@ -0,0 +1,111 @@
+"""Vectorized beam design: process_calculation's flexure and shear steps on arrays.
+
+Inputs are in the units of the app's ``inputs`` dict (cm, ksc, mm bar
+diameters, tf-m, tf) and broadcast against each other.  The arithmetic
+follows process_calculation step by step, so bar counts, stirrup spacings and
+PASS/FAIL flags come out the same as the scalar design.
+"""
+import numpy as np
+
+from beam_calc import BAR_INFO
+from flexure_batch import beta1_from_fc, flexure_limits, flexure_response, solve_required_as
+
+KSC_TO_MPA = 0.0980665
+TFM_TO_NMM = 9806650.0
+TF_TO_N = 9806.65
+PHI_V = 0.75
+
+
+def bar_props(keys):
+    """Diameter (mm) and area (mm²) arrays for a sequence of BAR_INFO keys."""
+    keys = np.asarray(keys)
+    db = np.vectorize(lambda k: float(BAR_INFO[k]['d_mm']), otypes=[float])(keys)
+    area = np.vectorize(lambda k: BAR_INFO[k]['A_cm2'] * 100, otypes=[float])(keys)
+    return db, area
+
+
+def section_batch(b_cm, h_cm, cover_cm, fc_ksc, fy_ksc, fyt_ksc, db_main, db_st, stir_area_mm2):
+    """Section-level quantities that do not depend on the loads."""
+    b_cm, h_cm, cover_cm, fc_ksc, fy_ksc, fyt_ksc, db_main, db_st, stir_area_mm2 = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, dtype=float))
+          for x in (b_cm, h_cm, cover_cm, fc_ksc, fy_ksc, fyt_ksc, db_main, db_st, stir_area_mm2)))
+    bw = b_cm * 10
+    h = h_cm * 10
+    cover = cover_cm * 10
+    fc = fc_ksc * KSC_TO_MPA
+    fy = fy_ksc * KSC_TO_MPA
+    fyt = fyt_ksc * KSC_TO_MPA
+    d = h - cover - db_st - (db_main / 2.0)
+    As_min, As_max = flexure_limits(fc, fy, bw, d)
+
+    Vc_N = 0.17 * np.sqrt(fc) * bw * d
+    Av = 2 * stir_area_mm2
+    Av_per_s_min = np.maximum(0.062 * np.sqrt(fc) * bw / fyt, 0.35 * bw / fyt)
+    return {
+        'bw': bw, 'h': h, 'cover': cover, 'fc': fc, 'fy': fy, 'fyt': fyt,
+        'db_main': db_main, 'db_st': db_st, 'd': d, 'beta1': beta1_from_fc(fc),
+        'As_min': As_min, 'As_max': As_max,
+        'Vc_N': Vc_N, 'Av': Av, 's_max_Av_min': Av / Av_per_s_min,
+    }
+
+
+def flexure_design_batch(sec, Mu_tfm, bar_area_mm2, agg_mm):
+    """Bars for Mu (tf-m): As_req, n, As_prov, φMn and the strength / clear spacing checks.
+
+    Moments of 0.001 tf-m or less get 2 bars and no checks, as in process_calculation.
+    """
+    Mu_tfm = np.asarray(Mu_tfm, dtype=float)
+    shape = np.broadcast_shapes(Mu_tfm.shape, sec['d'].shape, np.shape(bar_area_mm2), np.shape(agg_mm))
+    Mu_tfm = np.broadcast_to(Mu_tfm, shape)
+    s = {k: np.broadcast_to(v, shape) for k, v in sec.items()}
+    bar_area = np.broadcast_to(np.asarray(bar_area_mm2, dtype=float), shape)
+    agg = np.broadcast_to(np.asarray(agg_mm, dtype=float), shape)
+
+    Mu_Nmm = Mu_tfm * TFM_TO_NMM
+    active = Mu_tfm > 0.001
+    As_req = solve_required_as(Mu_Nmm, s['As_min'], s['As_max'], s['fc'], s['fy'], s['bw'], s['d'])
+    n = np.maximum(np.ceil(As_req / bar_area), 2)
+    n = np.where(active, n, 2).astype(int)
+    As_prov = n * bar_area
+    res = flexure_response(As_prov, s['fc'], s['fy'], s['bw'], s['d'])
+
+    usable_width = s['bw'] - 2 * (s['cover'] + s['db_st'])
+    clear_spacing = (usable_width - n * s['db_main']) / (n - 1)
+    req_clr = np.maximum(np.maximum(s['db_main'], 25.0), 4 / 3 * agg)
+    strength_ok = ~active | (res['phiMn'] >= Mu_Nmm)
+    spacing_ok = ~active | (clear_spacing >= req_clr - 1)
+    return {
+        'As_req': np.where(active, As_req, np.nan), 'n': n, 'As_prov': As_prov,
+        'phi': res['phi'], 'phiMn': res['phiMn'], 'eps_t': res['eps_t'],
+        'clear_spacing': clear_spacing, 'req_clear': req_clr,
+        'strength_ok': strength_ok, 'spacing_ok': spacing_ok, 'ok': strength_ok & spacing_ok,
+    }
+
+
+def shear_design_batch(sec, Vu_tf):
+    """Stirrup spacing for Vu (tf): s_req, s_limit, s_prov (mm), φVn (tf) and the check."""
+    Vu_tf = np.asarray(Vu_tf, dtype=float)
+    shape = np.broadcast_shapes(Vu_tf.shape, sec['d'].shape)
+    Vu_tf = np.broadcast_to(Vu_tf, shape)
+    s = {k: np.broadcast_to(v, shape) for k, v in sec.items()}
+    Vc_N, d, Av, fyt = s['Vc_N'], s['d'], s['Av'], s['fyt']
+
+    phiVc_N = (PHI_V * (Vc_N / TF_TO_N)) * TF_TO_N
+    Vu_N = Vu_tf * TF_TO_N
+    needVs = Vu_N > phiVc_N
+    Vs_req_N = np.where(needVs, (Vu_N / PHI_V) - Vc_N, 0.0)
+    Vs_req_tf = Vs_req_N / TF_TO_N
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s_req = np.where(needVs & (Vs_req_tf > 0), (Av * fyt * d) / Vs_req_N, 9999.0)
+
+    limit_high_shear = (Vs_req_tf * TF_TO_N) > (2 * Vc_N)
+    s_geom_max = np.where(limit_high_shear, np.minimum(d / 4, 300), np.minimum(d / 2, 600))
+    s_limit = np.minimum(s['s_max_Av_min'], s_geom_max)
+    s_limit = np.where(needVs, np.minimum(s_limit, s_req), s_limit)
+    s_prov = np.maximum(np.floor(s_limit / 10.0) * 10.0, 50.0)
+
+    phiVn_tf = (PHI_V * (Vc_N + (Av * fyt * d) / s_prov)) / TF_TO_N
+    return {
+        'Vs_req_tf': Vs_req_tf, 's_req': s_req, 's_limit': s_limit, 's_prov': s_prov,
+        'phiVn_tf': phiVn_tf, 'ok': phiVn_tf >= Vu_tf - 0.05,
+    }
@@ -0,0 +1,227 @@
+"""Local HTTP design API over a bounded worker pool.
+
+Standard library only (http.server, concurrent.futures).  Connections are
+HTTP/1.1 keep-alive, so a client sends many requests over one socket.
+Designs run on a fixed pool of ``workers`` threads or processes; at most
+``queue_size`` beams may be admitted (running or waiting) at any time, and a
+request that would exceed that is refused at once with 503 and
+``Retry-After`` instead of piling up, so a client that backs off keeps the
+latency of admitted requests bounded.  Batches are split into chunks of
+``chunk`` beams, one pool task each, to amortize the per-task overhead.
+
+    POST /design           one ``inputs`` object (batch_run schema)
+    POST /batch            a list of them, or {"beams": [...]}
+    GET  /health           pool size, admitted beams, request counters
+
+``?report=html`` adds the full calculation report ('html') to every result;
+``?report=svg`` adds the three section drawings ('sections', SVG data URIs).
+A result is {project, beam_id, status, failed_checks, bar_counts, shear_res,
+rows}; a beam that cannot be designed has status 'ERROR' and 'error'.
+
+    python design_server.py --port 8765 --workers 4 --queue 256
+    python design_server.py --processes -j 4
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from batch_run import normalize_beam
+from beam_calc import beam_result
+
+REPORTS = ('html', 'svg')
+MAX_BODY = 32 << 20
+
+
+class Overloaded(Exception):
+    """The pool has no room for the request; the client should retry later."""
+
+
+def design_record(inputs, report=None):
+    """Structured result of one normalized beam, with an optional report."""
+    rec = {'project': inputs['project'], 'beam_id': inputs['beam_id']}
+    try:
+        res = beam_result(inputs)
+        rows = res.rows()
+    except Exception as e:
+        return dict(rec, status='ERROR', error=f"{type(e).__name__}: {e}")
+    failed = res.failed_checks()
+    rec.update(status="FAIL" if failed else "PASS", failed_checks=failed, bar_counts=res.bar_counts(),
+               shear_res=res.shear_res(), rows=rows)
+    if report == 'html':
+        from beam_report import generate_full_html_report
+        rec['html'] = generate_full_html_report(inputs, rows, bar_counts=rec['bar_counts'],
+                                                shear_res=rec['shear_res'], renderer='svg')
+    elif report == 'svg':
+        from beam_report import render_report_sections
+        rec['sections'] = render_report_sections(inputs, rec['bar_counts'], rec['shear_res'], renderer='svg')
+    return rec
+
+
+def design_chunk(beams, report=None):
+    """design_record of every beam of a chunk (one pool task)."""
+    return [design_record(b, report) for b in beams]
+
+
+class DesignPool:
+    """Fixed worker pool with admission control counted in beams."""
+
+    def __init__(self, workers=None, queue_size=256, chunk=32, processes=False):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.chunk = chunk
+        self.processes = processes
+        pool = concurrent.futures.ProcessPoolExecutor if processes else concurrent.futures.ThreadPoolExecutor
+        self._executor = pool(self.workers)
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.counters = {'requests': 0, 'beams': 0, 'rejected': 0}
+
+    def _admit(self, n):
+        with self._lock:
+            if self.admitted + n > self.queue_size:
+                self.counters['rejected'] += 1
+                raise Overloaded(f"{self.admitted} beams in progress, capacity {self.queue_size}")
+            self.admitted += n
+            self.counters['requests'] += 1
+            self.counters['beams'] += n
+
+    def _release(self, n):
+        with self._lock:
+            self.admitted -= n
+
+    def design(self, beams, report=None):
+        """Records of ``beams`` in order; raises Overloaded when they do not fit in the queue."""
+        self._admit(len(beams))
+        try:
+            futures = [self._executor.submit(design_chunk, beams[i:i + self.chunk], report)
+                       for i in range(0, len(beams), self.chunk)]
+            return [rec for f in futures for rec in f.result()]
+        finally:
+            self._release(len(beams))
+
+    def info(self):
+        with self._lock:
+            return {'workers': self.workers, 'processes': self.processes, 'queue_size': self.queue_size,
+                    'chunk': self.chunk, 'admitted': self.admitted, **self.counters}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+class DesignHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive: every response carries Content-Length
+    server_version = 'BeamDesign/1.0'
+    disable_nagle_algorithm = True  # headers and body are two writes; don't wait for the client's delayed ACK
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, content_type='application/json', headers=()):
+        data = body if isinstance(body, bytes) else json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type + '; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for k, v in headers:
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, message, headers=()):
+        self._send(status, {'error': message}, headers=headers)
+
+    def do_GET(self):
+        if urllib.parse.urlsplit(self.path).path == '/health':
+            self._send(200, self.server.pool.info())
+        else:
+            self._error(404, f"no such endpoint: {self.path}")
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            # the body cannot be skipped without its length, so the connection goes too
+            self.close_connection = True
+            return self._error(400, f"invalid Content-Length: {self.headers.get('Content-Length')!r}")
+        if length > MAX_BODY:
+            self.close_connection = True
+            return self._error(413, f"body larger than {MAX_BODY} bytes")
+        body = self.rfile.read(length)
+        if url.path not in ('/design', '/batch'):
+            return self._error(404, f"no such endpoint: {url.path}")
+        report = urllib.parse.parse_qs(url.query).get('report', [None])[0]
+        if report not in (None, *REPORTS):
+            return self._error(400, f"report must be one of {REPORTS}")
+        try:
+            data = json.loads(body)
+            if url.path == '/batch':
+                raw = data['beams'] if isinstance(data, dict) else data
+                if not isinstance(raw, list):
+                    raise ValueError("expected a list of beams or {\"beams\": [...]}")
+            else:
+                if not isinstance(data, dict):
+                    raise ValueError("expected one inputs object")
+                raw = [data]
+            beams = [normalize_beam(b) for b in raw]
+        except (ValueError, KeyError, TypeError) as e:
+            return self._error(400, f"{type(e).__name__}: {e}")
+        if len(beams) > self.server.pool.queue_size:
+            return self._error(413, f"batch of {len(beams)} beams exceeds the queue size "
+                                    f"{self.server.pool.queue_size}; split it")
+        try:
+            recs = self.server.pool.design(beams, report)
+        except Overloaded as e:
+            return self._error(503, str(e), headers=[('Retry-After', '1')])
+        except Exception as e:  # e.g. a broken process pool
+            return self._error(500, f"{type(e).__name__}: {e}")
+        self._send(200, recs[0] if url.path == '/design' else {'results': recs})
+
+
+class DesignServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, pool, verbose=False):
+        super().__init__(address, DesignHandler)
+        self.pool = pool
+        self.verbose = verbose
+
+
+def serve(host='127.0.0.1', port=8765, workers=None, queue_size=256, chunk=32, processes=False, verbose=False):
+    """Run the API until interrupted."""
+    pool = DesignPool(workers, queue_size, chunk, processes)
+    with DesignServer((host, port), pool, verbose) as srv:
+        print(f"design API on http://{host}:{srv.server_address[1]} ({pool.workers} "
+              f"{'processes' if processes else 'threads'}, queue {queue_size} beams)", flush=True)
+        try:
+            srv.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pool.shutdown()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve the beam design engine over HTTP.")
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    ap.add_argument('-j', '--workers', type=int, default=None, help="pool size (default: CPU count)")
+    ap.add_argument('--queue', type=int, default=256, help="beams admitted at once before answering 503")
+    ap.add_argument('--chunk', type=int, default=32, help="beams per pool task in batches")
+    ap.add_argument('--processes', action='store_true', help="process pool instead of threads")
+    ap.add_argument('-v', '--verbose', action='store_true', help="log every request")
+    args = ap.parse_args(argv)
+    serve(args.host, args.port, args.workers, args.queue, args.chunk, args.processes, args.verbose)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""Moment / shear envelope design at many stations along the span.
+
+Takes Mu and Vu diagrams (tf-m, tf; sagging moment positive) as arrays of
+shape (combinations, stations), reduces them to envelopes with vectorized
+max/min, and designs top bars (hogging envelope), bottom bars (sagging
+envelope) and stirrup spacing at every station in one call to the batch
+design kernels.  From the station results it derives bar cutoff points and
+stirrup zones.
+
+Cutoffs are conservative: a bar is needed from the last station that does
+not need it to the first one after, extended by max(d, 12 db) (ACI 318-19
+9.7.3.3) and clipped to the span.  Stirrup zones group stations whose
+spacing, rounded down to ``zone_step``, is the same; the denser zone always
+reaches the neighbouring station.
+
+Diagrams come as CSV with columns ``combo, x, Mu, Vu`` (x in m) or JSON
+``{"x": [...], "combinations": {"name": {"Mu": [...], "Vu": [...]}}}``.
+
+    python envelope.py beam.json diagrams.csv
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+
+import numpy as np
+
+from beam_calc import fmt
+from design_batch import bar_props, flexure_design_batch, section_batch, shear_design_batch
+
+
+def load_diagrams(src):
+    """(x, Mu, Vu, combo names) with Mu / Vu shaped (combinations, stations).
+
+    ``src`` is a path or a file object with a ``name`` (e.g. an upload); .json selects JSON.
+    A missing column or key, a non-numeric value or a missing station raises ValueError.
+    """
+    name = getattr(src, 'name', src)
+    if hasattr(src, 'read'):
+        if hasattr(src, 'seek'):
+            src.seek(0)  # an upload is read again on every run
+        text = src.read()
+        text = text.decode('utf-8-sig') if isinstance(text, bytes) else text
+    else:
+        with open(src, encoding='utf-8-sig') as f:
+            text = f.read()
+    if name.lower().endswith('.json'):
+        try:
+            data = json.loads(text)
+            names = list(data['combinations'])
+            x = np.asarray(data['x'], dtype=float)
+            Mu = np.array([data['combinations'][n]['Mu'] for n in names], dtype=float)
+            Vu = np.array([data['combinations'][n]['Vu'] for n in names], dtype=float)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"diagram JSON needs 'x' and 'combinations' with Mu and Vu lists ({e})") from None
+        if not names or x.ndim != 1 or Mu.shape != (len(names), len(x)) or Vu.shape != Mu.shape:
+            raise ValueError("every combination needs one Mu and one Vu per station")
+        return x, Mu, Vu, names
+
+    reader = csv.DictReader(io.StringIO(text))
+    missing = [c for c in ('combo', 'x', 'Mu', 'Vu') if c not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f"diagram CSV is missing column(s) {', '.join(missing)}")
+    recs = []
+    for line, r in enumerate(reader, 2):
+        try:
+            recs.append((r['combo'], float(r['x']), float(r['Mu']), float(r['Vu'])))
+        except (TypeError, ValueError):
+            raise ValueError(f"diagram CSV line {line}: x, Mu and Vu must be numbers") from None
+    if not recs:
+        raise ValueError("diagram CSV has no rows")
+    names = list(dict.fromkeys(r[0] for r in recs))
+    x = np.unique([r[1] for r in recs])
+    Mu = np.full((len(names), len(x)), np.nan)
+    Vu = np.full_like(Mu, np.nan)
+    ci = {n: i for i, n in enumerate(names)}
+    for combo, xi, mu, vu in recs:
+        j = np.searchsorted(x, xi)
+        Mu[ci[combo], j] = mu
+        Vu[ci[combo], j] = vu
+    if np.isnan(Mu).any() or np.isnan(Vu).any():
+        raise ValueError("every combination needs Mu and Vu at every station")
+    return x, Mu, Vu, names
+
+
+def envelopes(Mu, Vu):
+    """Hogging and sagging moment demand (tf-m, both >= 0) and |Vu| (tf) per station."""
+    Mu = np.atleast_2d(np.asarray(Mu, dtype=float))
+    Vu = np.atleast_2d(np.asarray(Vu, dtype=float))
+    return {
+        'Mu_neg': np.maximum(-Mu.min(axis=0), 0.0), 'Mu_pos': np.maximum(Mu.max(axis=0), 0.0),
+        'Vu': np.abs(Vu).max(axis=0),
+        'Mu_neg_combo': Mu.argmin(axis=0), 'Mu_pos_combo': Mu.argmax(axis=0), 'Vu_combo': np.abs(Vu).argmax(axis=0),
+    }
+
+
+def bar_cutoffs(x, n, ext):
+    """Runs of stations needing more than the 2 continuous bars, one per bar count level.
+
+    Returns dicts with 'bars' (the count level) and the extended 'x_start' / 'x_end'.
+    """
+    out = []
+    for k in range(3, int(n.max(initial=2)) + 1):
+        edges = np.flatnonzero(np.diff(np.r_[0, (n >= k).astype(np.int8), 0]))
+        for s, e in zip(edges[::2], edges[1::2]):
+            x0 = x[s - 1] if s > 0 else x[0]
+            x1 = x[e] if e < len(x) else x[-1]
+            out.append({'bars': k, 'x_start': float(max(x[0], x0 - ext)), 'x_end': float(min(x[-1], x1 + ext))})
+    return out
+
+
+def stirrup_zones(x, s_prov, zone_step=50.0):
+    """Consecutive stations with the same spacing (mm, rounded down to zone_step) as zones."""
+    s = np.maximum(np.floor(s_prov / zone_step) * zone_step, 50.0)
+    change = np.flatnonzero(np.diff(s)) + 1
+    # the boundary goes to the station on the coarser side, so the denser zone covers both
+    bounds = np.where(s[change] < s[change - 1], x[change - 1], x[change])
+    starts = np.r_[x[0], bounds]
+    ends = np.r_[bounds, x[-1]]
+    first = np.r_[0, change]
+    return [{'s': float(s[i]), 'x_start': float(a), 'x_end': float(b)} for i, a, b in zip(first, starts, ends)]
+
+
+def design_envelope(inputs, x, Mu, Vu, zone_step=50.0):
+    """Design every station of the Mu / Vu diagrams with the section, materials and bars of ``inputs``.
+
+    Returns station arrays (envelopes, bars top / bottom, stirrup spacing, checks)
+    plus 'cutoffs' (per face) and 'zones'.
+    """
+    x = np.asarray(x, dtype=float)
+    env = envelopes(Mu, Vu)
+    db_main, area_main = bar_props([inputs['mainBar']])
+    db_st, area_st = bar_props([inputs['stirrupBar']])
+    sec = section_batch(inputs['b'], inputs['h'], inputs['cover'], inputs['fc'], inputs['fy'], inputs['fyt'],
+                        db_main, db_st, area_st)
+
+    flex = flexure_design_batch(sec, np.stack([env['Mu_neg'], env['Mu_pos']]), area_main, inputs['agg'])
+    shear = shear_design_batch(sec, env['Vu'])
+    ext_m = max(float(sec['d'][0]), 12 * float(db_main[0])) / 1000.0
+    return {
+        'x': x, **env,
+        'n_top': flex['n'][0], 'n_bot': flex['n'][1],
+        'As_req_top': flex['As_req'][0], 'As_req_bot': flex['As_req'][1],
+        'phiMn_top': flex['phiMn'][0], 'phiMn_bot': flex['phiMn'][1],
+        'flexure_ok': flex['ok'].all(axis=0),
+        's_prov': shear['s_prov'], 'phiVn': shear['phiVn_tf'], 'shear_ok': shear['ok'],
+        'ok': flex['ok'].all(axis=0) & shear['ok'],
+        'cutoffs': {'top': bar_cutoffs(x, flex['n'][0], ext_m), 'bot': bar_cutoffs(x, flex['n'][1], ext_m)},
+        'zones': stirrup_zones(x, shear['s_prov'], zone_step),
+        'extension_m': ext_m,
+    }
+
+
+def envelope_rows(inputs, res, n_combos):
+    """Report rows (a section to insert before the final status) summarising an envelope design."""
+    bar, stir = inputs['mainBar'], inputs['stirrupBar']
+    x = res['x']
+    rows = [["SECTION", f"2.2 ENVELOPE DESIGN ({len(x)} STATIONS, {n_combos} COMBINATIONS)", "", "", "", "", ""]]
+    for face, key in (("Top", 'Mu_neg'), ("Bot", 'Mu_pos')):
+        j = int(np.argmax(res[key]))
+        rows.append([f"Envelope Mu ({face})", "max over combinations", f"x = {fmt(x[j], 2)} m",
+                     f"{fmt(res[key][j], 3)}", "tf-m", ""])
+    j = int(np.argmax(res['Vu']))
+    rows.append(["Envelope Vu", "max |Vu| over combinations", f"x = {fmt(x[j], 2)} m", f"{fmt(res['Vu'][j], 3)}",
+                 "tf", ""])
+    for face in ("Top", "Bot"):
+        rows.append([f"{face} bars (continuous)", "min. 2 bars", "-", f"2-{bar}", "-", "OK"])
+        for c in res['cutoffs'][face.lower()]:
+            rows.append([f"{face} bar #{c['bars']}", f"cutoff + max(d, 12db) = {fmt(res['extension_m'], 2)} m",
+                         "-", f"{fmt(c['x_start'], 2)} – {fmt(c['x_end'], 2)}", "m", "OK"])
+    for z in res['zones']:
+        rows.append(["Stirrup zone", f"{stir} @ {fmt(z['s'] / 10, 0)} cm", "-",
+                     f"{fmt(z['x_start'], 2)} – {fmt(z['x_end'], 2)}", "m", "OK"])
+    fails = np.flatnonzero(~res['ok'])
+    status = "FAIL" if fails.size else "PASS"
+    where = ", ".join(fmt(v, 2) for v in x[fails[:5]]) + (" ..." if fails.size > 5 else "") if fails.size else "-"
+    rows.append(["Envelope Check", "all stations: φMn ≥ Mu, s_clr, φVn ≥ Vu", f"failing x: {where}", status, "-",
+                 status])
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Design a beam for Mu / Vu envelopes at many stations.")
+    ap.add_argument('inputs', help="JSON with the app inputs (section, materials, bars)")
+    ap.add_argument('diagrams', help="CSV (combo, x, Mu, Vu) or JSON diagrams")
+    ap.add_argument('--zone-step', type=float, default=50.0, help="stirrup zone spacing step in mm")
+    args = ap.parse_args(argv)
+
+    with open(args.inputs, encoding='utf-8') as f:
+        inputs = json.load(f)
+    x, Mu, Vu, names = load_diagrams(args.diagrams)
+    res = design_envelope(inputs, x, Mu, Vu, args.zone_step)
+    for r in envelope_rows(inputs, res, len(names)):
+        print(r[1] if r[0] == "SECTION" else f"  {r[0]:<24} {r[1]:<36} {r[3]:>18} {r[4]:<5} {r[5]}")
+    return 0 if res['ok'].all() else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
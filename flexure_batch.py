@@ -0,0 +1,168 @@
+"""Vectorized flexure engine (NumPy) for batches of sections and moments.
+
+Same units and conventions as the scalar functions in the calculation core:
+MPa, mm, mm², N·mm.  All arguments broadcast against each other, so one
+section with 100k moments and 100k sections with one moment each go through
+the same code.
+
+Tolerance: for every input where the scalar ``flexureSectionResponse`` /
+``solve_required_as`` are evaluated by ``process_calculation``, the results
+here agree to a relative tolerance of ``RTOL`` (floating point rounding of the
+closed-form roots versus 50 bisection steps).
+"""
+import numpy as np
+
+RTOL = 1e-9
+
+ES = 200000.0
+EPS_CU = 0.003
+
+
+def _arrays(*xs):
+    return np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float)) for x in xs))
+
+
+def beta1_from_fc(fc_MPa):
+    fc_MPa = np.asarray(fc_MPa, dtype=float)
+    return np.maximum(0.65, np.where(fc_MPa <= 28, 0.85, 0.85 - 0.05 * ((fc_MPa - 28) / 7)))
+
+
+def phi_from_strain(eps_t):
+    eps_t = np.asarray(eps_t, dtype=float)
+    return np.clip(0.65 + (eps_t - 0.002) * (0.25 / 0.003), 0.65, 0.90)
+
+
+def flexure_limits(fc_MPa, fy_MPa, bw_mm, d_mm, Es=ES, eps_cu=EPS_CU):
+    """As_min and As_max exactly as process_calculation derives them."""
+    fc_MPa, fy_MPa, bw_mm, d_mm = _arrays(fc_MPa, fy_MPa, bw_mm, d_mm)
+    beta1 = beta1_from_fc(fc_MPa)
+    rho_min = np.maximum(0.25 * np.sqrt(fc_MPa) / fy_MPa, 1.4 / fy_MPa)
+    eps_y = fy_MPa / Es
+    rho_bal = 0.85 * beta1 * (fc_MPa / fy_MPa) * (eps_cu / (eps_cu + eps_y))
+    return rho_min * bw_mm * d_mm, 0.75 * rho_bal * bw_mm * d_mm
+
+
+def flexure_response(As_mm2, fc_MPa, fy_MPa, bw_mm, d_mm, Es=ES, eps_cu=EPS_CU):
+    """Batched flexureSectionResponse.
+
+    The starting guess fs = fy is the closed-form solution whenever the steel
+    yields, so those elements converge on the first pass.  Only elements that
+    do not yield (over-reinforced) run further iterations, with the same
+    update and stopping rule as the scalar loop so the results are identical.
+    """
+    As, fc, fy, bw, d = _arrays(As_mm2, fc_MPa, fy_MPa, bw_mm, d_mm)
+    beta1 = beta1_from_fc(fc)
+    k = 0.85 * fc * bw
+    fs = fy.copy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = np.where(fc > 0, As * fs / k, 0.0)
+        c = np.where(beta1 > 0, a / beta1, 0.0)
+
+    active = np.ones(As.shape, dtype=bool)
+    for _ in range(50):
+        idx = np.nonzero(active)
+        if not idx[0].size:
+            break
+        c_i = np.maximum(c[idx], 0.1)
+        eps_i = eps_cu * (d[idx] - c_i) / c_i
+        fs_new = np.clip(Es * eps_i, -fy[idx], fy[idx])
+        a_new = As[idx] * fs_new / k[idx]
+        done = (np.abs(fs_new - fs[idx]) < 0.1) & (np.abs(a_new - a[idx]) < 0.1)
+        fs[idx] = fs_new
+        a[idx] = a_new
+        c[idx] = np.where(done, c_i, a_new / beta1[idx])
+        active[idx] = ~done
+
+    c = a / beta1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        eps_t = np.where(c > 0, eps_cu * (d - c) / c, 0.005)
+    phi = phi_from_strain(eps_t)
+    Mn = As * fs * (d - a / 2.0)
+    return {'phi': phi, 'phiMn': phi * Mn, 'eps_t': eps_t, 'Mn': Mn}
+
+
+def _phiMn(As, fc, fy, bw, d, Es, eps_cu):
+    return flexure_response(As, fc, fy, bw, d, Es, eps_cu)['phiMn']
+
+
+def solve_required_as(Mu_Nmm, As_min, As_max, fc_MPa, fy_MPa, bw_mm, d_mm, Es=ES, eps_cu=EPS_CU):
+    """Batched solve_required_as: smallest As in [As_min, As_max] with φMn(As) ≥ Mu.
+
+    With yielding steel φMn(As) is piecewise quadratic in As: one piece for
+    the tension-controlled zone (φ = 0.90) and one for the transition zone,
+    where φ is linear in d/c and c is linear in As.  Both roots are solved in
+    closed form; any element whose root does not verify (non-yielding steel,
+    degenerate input) falls back to a vectorized copy of the scalar
+    expansion + bisection.
+    """
+    Mu, As_min, As_max, fc, fy, bw, d = _arrays(Mu_Nmm, As_min, As_max, fc_MPa, fy_MPa, bw_mm, d_mm)
+    beta1 = beta1_from_fc(fc)
+    kc = fy / (0.85 * fc * bw * beta1)  # c = kc * As while the steel yields
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # tension-controlled: 0.9 fy (d As - β1 kc As² / 2) = Mu
+        b1 = 0.9 * fy * d
+        disc1 = b1 * b1 - 2.0 * 0.9 * fy * beta1 * kc * Mu
+        root1 = 2.0 * Mu / (b1 + np.sqrt(disc1))
+        As_tc = eps_cu * d / (eps_cu + 0.005) / kc
+
+        # transition: φ = p0 + p1 d / c
+        p1 = eps_cu * (0.25 / 0.003)
+        p0 = 0.65 - (eps_cu + 0.002) * (0.25 / 0.003)
+        qa = -0.5 * p0 * beta1 * kc * fy
+        qb = fy * d * (p0 - 0.5 * p1 * beta1)
+        qc = fy * p1 * d * d / kc - Mu
+        disc2 = qb * qb - 4.0 * qa * qc
+        root2 = 2.0 * qc / (-qb - np.sqrt(disc2))
+
+    root = np.where((disc1 >= 0) & (root1 <= As_tc), root1, root2)
+    As_req = np.clip(root, As_min, None)
+
+    phiMn_min = _phiMn(As_min, fc, fy, bw, d, Es, eps_cu)
+    phiMn_max = _phiMn(As_max, fc, fy, bw, d, Es, eps_cu)
+    As_req = np.where(phiMn_min >= Mu, As_min, As_req)
+    As_req = np.where((phiMn_min < Mu) & (phiMn_max < Mu), As_max, As_req)
+
+    eps_y = fy / Es
+    with np.errstate(divide='ignore', invalid='ignore'):
+        yields = eps_cu * (d - kc * As_req) / (kc * As_req) >= eps_y
+    bad = ~np.isfinite(As_req) | ~yields | (As_req > np.maximum(As_min, As_max))
+    bad &= (phiMn_min < Mu)
+    if bad.any():
+        idx = np.nonzero(bad)
+        As_req[idx] = _bisect(Mu[idx], As_min[idx], As_max[idx], fc[idx], fy[idx], bw[idx], d[idx], Es, eps_cu)
+    return As_req
+
+
+def _bisect(Mu, As_min, As_max, fc, fy, bw, d, Es, eps_cu):
+    As_lo = As_min.copy()
+    As_hi = As_lo.copy()
+    growing = np.ones(Mu.shape, dtype=bool)
+    for _ in range(30):
+        ok = _phiMn(As_hi, fc, fy, bw, d, Es, eps_cu) >= Mu
+        growing &= ~ok
+        As_hi = np.where(growing, As_hi * 1.3, As_hi)
+        capped = growing & (As_hi > As_max)
+        As_hi = np.where(capped, As_max, As_hi)
+        growing &= ~capped
+    for _ in range(50):
+        As_mid = 0.5 * (As_lo + As_hi)
+        ok = _phiMn(As_mid, fc, fy, bw, d, Es, eps_cu) >= Mu
+        As_hi = np.where(ok, As_mid, As_hi)
+        As_lo = np.where(ok, As_lo, As_mid)
+    return As_hi
+
+
+def flexure_batch(As_mm2, fc_MPa, fy_MPa, bw_mm, d_mm, Mu_Nmm, Es=ES, eps_cu=EPS_CU):
+    """Capacity of the provided As and the required As for Mu, as arrays.
+
+    Returns phi, phiMn, eps_t and Mn for ``As_mm2`` together with As_req,
+    As_min and As_max for ``Mu_Nmm`` (limits derived as in process_calculation).
+    """
+    As, fc, fy, bw, d, Mu = _arrays(As_mm2, fc_MPa, fy_MPa, bw_mm, d_mm, Mu_Nmm)
+    As_min, As_max = flexure_limits(fc, fy, bw, d, Es, eps_cu)
+    res = flexure_response(As, fc, fy, bw, d, Es, eps_cu)
+    res['As_req'] = solve_required_as(Mu, As_min, As_max, fc, fy, bw, d, Es, eps_cu)
+    res['As_min'] = As_min
+    res['As_max'] = As_max
+    return res
@@ -0,0 +1,61 @@
+"""Measure the cold import cost of the calculation core against its budget.
+
+Each measurement runs in a fresh interpreter so nothing is already cached in
+``sys.modules``.  Exit status is non-zero when a budget is exceeded.
+
+    python import_budget.py
+"""
+import json
+import subprocess
+import sys
+
+# Budgets documented in beam_calc's module docstring.
+IMPORT_MS_BUDGET = 25.0
+WORKER_RSS_MB_BUDGET = 20.0
+FORBIDDEN = ('streamlit', 'matplotlib')
+
+_PROBE = r'''
+import json, resource, sys, time
+rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t0 = time.perf_counter()
+import beam_calc
+t1 = time.perf_counter()
+beam_calc.process_calculation({
+    'project': '', 'beam_id': 'B-01', 'engineer': '',
+    'b': 25, 'h': 50, 'cover': 3.0, 'agg': 20, 'fc': 240, 'fy': 4000, 'fyt': 2400,
+    'mainBar': 'DB16', 'stirrupBar': 'RB6',
+    'mu_L_n': 8.0, 'mu_L_p': 4.0, 'mu_M_n': 0.0, 'mu_M_p': 8.0, 'mu_R_n': 8.0, 'mu_R_p': 4.0,
+    'vu_L': 12.0, 'vu_M': 8.0, 'vu_R': 12.0})
+rss1 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+scale = 1024.0 * 1024.0 if sys.platform == 'darwin' else 1024.0
+print(json.dumps({'import_ms': (t1 - t0) * 1000.0, 'rss_mb': rss1 / scale,
+                  'rss_delta_mb': (rss1 - rss0) / scale,
+                  'modules': sorted(m.split('.')[0] for m in sys.modules)}))
+'''
+
+
+def measure(repeat=5):
+    runs = [json.loads(subprocess.check_output([sys.executable, '-c', _PROBE])) for _ in range(repeat)]
+    best = min(runs, key=lambda r: r['import_ms'])
+    return {
+        'import_ms': best['import_ms'],
+        'rss_mb': max(r['rss_mb'] for r in runs),
+        'rss_delta_mb': max(r['rss_delta_mb'] for r in runs),
+        'forbidden': sorted({m for r in runs for m in r['modules'] if m in FORBIDDEN}),
+    }
+
+
+def main():
+    m = measure()
+    print(f"import beam_calc: {m['import_ms']:.2f} ms (budget {IMPORT_MS_BUDGET:.0f} ms)")
+    print(f"worker peak RSS:  {m['rss_mb']:.1f} MB (budget {WORKER_RSS_MB_BUDGET:.0f} MB), "
+          f"+{m['rss_delta_mb']:.2f} MB over a bare interpreter")
+    ok = m['import_ms'] <= IMPORT_MS_BUDGET and m['rss_mb'] <= WORKER_RSS_MB_BUDGET and not m['forbidden']
+    if m['forbidden']:
+        print(f"pulled in: {', '.join(m['forbidden'])}")
+    print("OK" if ok else "OVER BUDGET")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
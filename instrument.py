@@ -0,0 +1,97 @@
+"""Per-stage timing, call counters, payload sizes and an opt-in cProfile hook.
+
+A ``Trace`` collects, for one run:
+
+* wall time per stage (solve, arrangement, drawing, encoding, HTML assembly, ...),
+* call counters passed down to the calculation core (flexureSectionResponse
+  calls and fixed-point iterations, solve_required_as calls, expansion and
+  bisection steps, section cache hits),
+* payload sizes in bytes (section images, the HTML sent to ``components.html``).
+
+``Trace.to_dict()`` is plain JSON; batch runs write one per beam and combine
+them with ``aggregate``.  ``Trace.log()`` emits it as one structured log line
+on the ``beam_design.trace`` logger.
+"""
+import contextlib
+import json
+import logging
+import time
+
+logger = logging.getLogger('beam_design.trace')
+
+
+class Trace:
+    def __init__(self, name='run', **meta):
+        self.name = name
+        self.meta = meta
+        self.stages = []
+        self.counters = {}
+        self.payloads = {}
+        self._t0 = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add_time(name, time.perf_counter() - t0)
+
+    def add_time(self, name, seconds):
+        for st in self.stages:
+            if st['stage'] == name:
+                st['wall_s'] += seconds
+                st['calls'] += 1
+                return
+        self.stages.append({'stage': name, 'wall_s': seconds, 'calls': 1})
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def payload(self, name, data):
+        size = len(data.encode('utf-8')) if isinstance(data, str) else len(data)
+        self.payloads[name] = self.payloads.get(name, 0) + size
+
+    def to_dict(self):
+        return {
+            'name': self.name, 'meta': self.meta,
+            'total_s': time.perf_counter() - self._t0,
+            'stages': self.stages, 'counters': self.counters, 'payload_bytes': self.payloads,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def log(self, level=logging.INFO):
+        logger.log(level, self.to_json())
+
+
+def aggregate(traces):
+    """Sum stage times, counters and payloads over many ``Trace.to_dict()`` records."""
+    out = {'runs': 0, 'stages': {}, 'counters': {}, 'payload_bytes': {}}
+    for t in traces:
+        out['runs'] += 1
+        for st in t['stages']:
+            agg = out['stages'].setdefault(st['stage'], {'wall_s': 0.0, 'calls': 0})
+            agg['wall_s'] += st['wall_s']
+            agg['calls'] += st['calls']
+        for k, v in t['counters'].items():
+            out['counters'][k] = out['counters'].get(k, 0) + v
+        for k, v in t['payload_bytes'].items():
+            out['payload_bytes'][k] = out['payload_bytes'].get(k, 0) + v
+    for agg in out['stages'].values():
+        agg['mean_ms'] = agg['wall_s'] / max(out['runs'], 1) * 1e3
+    return out
+
+
+def profile_call(fn, *args, limit=30, sort='cumulative', **kwargs):
+    """Run ``fn`` under cProfile; returns (result, stats text of the top ``limit`` entries)."""
+    import cProfile
+    import io
+    import pstats
+
+    prof = cProfile.Profile()
+    result = prof.runcall(fn, *args, **kwargs)
+    buf = io.StringIO()
+    pstats.Stats(prof, stream=buf).strip_dirs().sort_stats(sort).print_stats(limit)
+    return result, buf.getvalue()
@@ -0,0 +1,176 @@
+"""Load test for design_server: latency percentiles and throughput on one machine.
+
+Opens ``--concurrency`` keep-alive connections, each sending its share of
+``--requests`` back to back, and reports p50 / p90 / p99 latency, requests
+per second and beams per second.  503 answers (backpressure) are counted and
+retried after a short pause; their latency is not part of the percentiles.
+Beams come from a schedule (batch_run format) or are generated with varied
+loads.
+
+    python load_test.py --spawn -n 2000 -c 8                 # starts a server for the run
+    python load_test.py --url http://127.0.0.1:8765 --batch 50 -n 200
+    python load_test.py --spawn --schedule schedule.csv --report svg
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+import numpy as np
+
+BASE_BEAM = {
+    'project': 'LOAD', 'engineer': '', 'b': 30, 'h': 60, 'cover': 4, 'agg': 20,
+    'fc': 240, 'fy': 4000, 'fyt': 2400, 'mainBar': 'DB20', 'stirrupBar': 'RB9',
+    'mu_L_n': 15.0, 'mu_L_p': 0.0, 'mu_M_n': 0.0, 'mu_M_p': 10.0, 'mu_R_n': 15.0, 'mu_R_p': 0.0,
+    'vu_L': 12.0, 'vu_M': 6.0, 'vu_R': 12.0,
+}
+
+
+def generated_beams(n, seed=0):
+    """``n`` beams with loads scattered around BASE_BEAM."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        b = dict(BASE_BEAM, beam_id=f"B{i + 1}")
+        for k in ('mu_L_n', 'mu_M_p', 'mu_R_n', 'vu_L', 'vu_M', 'vu_R'):
+            b[k] = round(BASE_BEAM[k] * rng.uniform(0.3, 2.0), 2)
+        out.append(b)
+    return out
+
+
+def _client(url, bodies, path, latencies, stats, lock):
+    u = urllib.parse.urlsplit(url)
+    conn = http.client.HTTPConnection(u.hostname, u.port, timeout=120)
+    headers = {'Content-Type': 'application/json'}
+    mine, busy = [], 0
+    for body in bodies:
+        while True:
+            t0 = time.perf_counter()
+            conn.request('POST', path, body, headers)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 503:
+                break
+            busy += 1
+            time.sleep(0.01)
+        mine.append(time.perf_counter() - t0)
+        if resp.status != 200:
+            with lock:
+                stats['errors'] += 1
+    conn.close()
+    with lock:
+        latencies.extend(mine)
+        stats['rejected'] += busy
+
+
+def spawn_server(port, extra_args=()):
+    """Start design_server.py on ``port``; returns the process once it is listening.
+
+    Raises RuntimeError if the server exits first (e.g. the port is taken).
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'design_server.py')
+    server = subprocess.Popen([sys.executable, script, '--port', str(port), *extra_args], stdout=subprocess.PIPE,
+                              text=True)
+    if not server.stdout.readline():  # the server prints one line once its socket is bound
+        server.wait()
+        raise RuntimeError(f"design_server.py exited with code {server.returncode} (is port {port} in use?)")
+    return server
+
+
+def wait_ready(url, timeout=10.0):
+    u = urllib.parse.urlsplit(url)
+    t_end = time.monotonic() + timeout
+    while True:
+        try:
+            conn = http.client.HTTPConnection(u.hostname, u.port, timeout=1)
+            conn.request('GET', '/health')
+            return json.loads(conn.getresponse().read())
+        except OSError:
+            if time.monotonic() > t_end:
+                raise
+            time.sleep(0.05)
+
+
+def run(url, beams, requests, concurrency, batch=1, report=None):
+    """Send ``requests`` requests of ``batch`` beams; returns the measured statistics."""
+    path = ('/design' if batch == 1 else '/batch') + (f"?report={report}" if report else "")
+    bodies = []
+    for i in range(requests):
+        chunk = [beams[(i * batch + k) % len(beams)] for k in range(batch)]
+        bodies.append(json.dumps(chunk[0] if batch == 1 else chunk).encode('utf-8'))
+    latencies, stats, lock = [], {'errors': 0, 'rejected': 0}, threading.Lock()
+    threads = [threading.Thread(target=_client, args=(url, bodies[c::concurrency], path, latencies, stats, lock))
+               for c in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    lat = np.array(latencies) * 1e3
+    return {
+        'requests': len(lat), 'beams': len(lat) * batch, 'concurrency': concurrency, 'wall_s': wall,
+        'p50_ms': float(np.percentile(lat, 50)), 'p90_ms': float(np.percentile(lat, 90)),
+        'p99_ms': float(np.percentile(lat, 99)), 'max_ms': float(lat.max()),
+        'req_per_s': len(lat) / wall, 'beams_per_s': len(lat) * batch / wall, **stats,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load-test the design API.")
+    ap.add_argument('--url', default='http://127.0.0.1:8765')
+    ap.add_argument('--spawn', action='store_true', help="start design_server.py for the run (on --url's port)")
+    ap.add_argument('--server-args', default='', help="extra design_server.py arguments with --spawn")
+    ap.add_argument('-n', '--requests', type=int, default=1000)
+    ap.add_argument('-c', '--concurrency', type=int, default=8, help="keep-alive connections")
+    ap.add_argument('--batch', type=int, default=1, help="beams per request (1 uses /design, more /batch)")
+    ap.add_argument('--report', choices=['html', 'svg'])
+    ap.add_argument('--schedule', help="CSV or JSON schedule to draw beams from (default: generated)")
+    ap.add_argument('--warmup', type=int, default=50, help="requests sent before measuring")
+    ap.add_argument('--json', action='store_true', help="print the statistics as JSON")
+    args = ap.parse_args(argv)
+
+    if args.schedule:
+        from batch_run import load_schedule
+        beams = load_schedule(args.schedule)
+    else:
+        beams = generated_beams(max(args.requests * args.batch, 1))
+    server = None
+    if args.spawn:
+        try:
+            server = spawn_server(urllib.parse.urlsplit(args.url).port, args.server_args.split())
+        except RuntimeError as e:
+            print(e, file=sys.stderr)
+            return 2
+    try:
+        info = wait_ready(args.url)
+        if args.warmup:
+            run(args.url, beams, args.warmup, min(args.concurrency, args.warmup), args.batch, args.report)
+        stats = run(args.url, beams, args.requests, args.concurrency, args.batch, args.report)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        print(json.dumps(stats))
+    else:
+        print(f"server: {info['workers']} {'processes' if info['processes'] else 'threads'}, "
+              f"queue {info['queue_size']} beams")
+        print(f"{stats['requests']} requests x {args.batch} beams, {args.concurrency} connections, "
+              f"{stats['wall_s']:.2f} s")
+        print(f"latency  p50 {stats['p50_ms']:.2f} ms  p90 {stats['p90_ms']:.2f} ms  p99 {stats['p99_ms']:.2f} ms  "
+              f"max {stats['max_ms']:.2f} ms")
+        print(f"throughput  {stats['req_per_s']:,.0f} req/s  {stats['beams_per_s']:,.0f} beams/s  "
+              f"(503 retried: {stats['rejected']}, errors: {stats['errors']})")
+    return 1 if stats['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
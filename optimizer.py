@@ -0,0 +1,139 @@
+"""Optimal section and reinforcement search.
+
+For the six Mu and three Vu of a beam, searches widths, depths, main bar and
+stirrup sizes and returns the cheapest designs that pass every check of
+process_calculation (strength, clear spacing, shear).  Cost is per metre of
+beam: concrete volume times ``concrete_per_m3`` plus longitudinal and stirrup
+steel weight times ``steel_per_kg``.
+
+Every depth of a (b, bar, stirrup) combination is checked in one vectorized
+call: pass/fail is not monotonic in h (As_min grows with d, so a deeper
+narrow section can need more bars than fit), so no depth is skipped.
+Combinations are spread over a process pool.
+
+    python optimizer.py loads.json [-k 5] [-j 8]
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+
+from beam_calc import process_calculation
+from design_batch import bar_props, flexure_design_batch, section_batch, shear_design_batch
+
+MU_KEYS = ['mu_L_n', 'mu_L_p', 'mu_M_n', 'mu_M_p', 'mu_R_n', 'mu_R_p']
+BAR_KEYS = ['L_TOP', 'L_BOT', 'M_TOP', 'M_BOT', 'R_TOP', 'R_BOT']
+VU_KEYS = ['vu_L', 'vu_M', 'vu_R']
+SHEAR_KEYS = ['V_L', 'V_M', 'V_R']
+
+DEFAULT_WIDTHS = (20, 25, 30, 35, 40)
+DEFAULT_DEPTHS = tuple(range(30, 105, 5))
+DEFAULT_MAIN_BARS = ('DB12', 'DB16', 'DB20', 'DB25', 'DB28')
+DEFAULT_STIRRUPS = ('RB6', 'RB9', 'DB10')
+DEFAULT_COST = {'concrete_per_m3': 2500.0, 'steel_per_kg': 30.0}
+STEEL_DENSITY = 7850.0  # kg/m³
+
+
+def _evaluate(base, b, depths, mainBar, stirBar, cost):
+    """Checks and cost per metre for one (b, bar, stirrup) over an array of depths (cm)."""
+    h = np.asarray(depths, dtype=float)
+    db_main, area_main = bar_props([mainBar])
+    db_st, area_st = bar_props([stirBar])
+    sec = section_batch(b, h, base['cover'], base['fc'], base['fy'], base['fyt'], db_main, db_st, area_st)
+    sec2 = {k: v[:, None] for k, v in sec.items()}
+
+    flex = flexure_design_batch(sec2, np.array([base[k] for k in MU_KEYS])[None, :], area_main, base['agg'])
+    shear = shear_design_batch(sec2, np.array([base[k] for k in VU_KEYS])[None, :])
+    ok = flex['ok'].all(axis=1) & shear['ok'].all(axis=1)
+
+    # longitudinal steel: mean of (top + bottom) over the three locations
+    As_long = flex['As_prov'].reshape(len(h), 3, 2).sum(axis=2).mean(axis=1)
+    b_m, h_m, c_m = b / 100.0, h / 100.0, base['cover'] / 100.0
+    perimeter = (2 * (b_m - 2 * c_m) + 2 * (h_m - 2 * c_m))[:, None]
+    stir_per_m = (perimeter * area_st[0] * 1e-6 * STEEL_DENSITY * (1000.0 / shear['s_prov'])).mean(axis=1)
+    steel_kg = As_long * 1e-6 * STEEL_DENSITY + stir_per_m
+    concrete_m3 = b_m * h_m
+    total = concrete_m3 * cost['concrete_per_m3'] + steel_kg * cost['steel_per_kg']
+    return {'ok': ok, 'cost': total, 'concrete_m3': concrete_m3, 'steel_kg': steel_kg,
+            'n': flex['n'], 's_prov': shear['s_prov']}
+
+
+def _search_combo(task):
+    """Every passing depth of one (b, bar, stirrup) combination with its cost."""
+    base, b, depths, mainBar, stirBar, cost = task
+    depths = sorted(depths)
+    ev = _evaluate(base, b, depths, mainBar, stirBar, cost)
+    out = []
+    for i in np.nonzero(ev['ok'])[0]:
+        out.append({
+            'b': b, 'h': depths[i], 'mainBar': mainBar, 'stirrupBar': stirBar,
+            'cost': float(ev['cost'][i]), 'concrete_m3': float(ev['concrete_m3'][i]),
+            'steel_kg': float(ev['steel_kg'][i]),
+            'bar_counts': dict(zip(BAR_KEYS, (int(n) for n in ev['n'][i]))),
+            'shear_res': dict(zip(SHEAR_KEYS, (float(s) for s in ev['s_prov'][i]))),
+        })
+    return out
+
+
+def optimize_section(base_inputs, widths=DEFAULT_WIDTHS, depths=DEFAULT_DEPTHS, main_bars=DEFAULT_MAIN_BARS,
+                     stirrup_bars=DEFAULT_STIRRUPS, cost=None, top_k=5, workers=None, verify=True):
+    """Cheapest passing designs for the loads in ``base_inputs``, sorted by cost.
+
+    ``base_inputs`` uses the app's inputs keys; b, h, mainBar and stirrupBar
+    are ignored.  With ``verify`` the returned designs are re-checked with
+    process_calculation.
+    """
+    cost = dict(DEFAULT_COST, **(cost or {}))
+    base = {k: base_inputs[k] for k in ['cover', 'agg', 'fc', 'fy', 'fyt'] + MU_KEYS + VU_KEYS}
+    tasks = [(base, b, tuple(depths), m, s, cost)
+             for b, m, s in itertools.product(widths, main_bars, stirrup_bars)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            found = list(itertools.chain.from_iterable(
+                pool.imap_unordered(_search_combo, tasks, max(1, len(tasks) // (workers * 4)))))
+    else:
+        found = list(itertools.chain.from_iterable(map(_search_combo, tasks)))
+
+    found.sort(key=lambda r: (r['cost'], r['b'], r['h'], r['mainBar'], r['stirrupBar']))
+    best = []
+    for cand in found:
+        if verify:
+            inputs = dict(base_inputs, b=cand['b'], h=cand['h'], mainBar=cand['mainBar'],
+                          stirrupBar=cand['stirrupBar'])
+            rows, bar_counts, shear_res = process_calculation(inputs)
+            if any(r[0] != "SECTION" and r[5] == "FAIL" for r in rows):
+                continue
+            cand['bar_counts'], cand['shear_res'] = bar_counts, shear_res
+        best.append(cand)
+        if len(best) >= top_k:
+            break
+    return best
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Search the cheapest passing beam section and reinforcement.")
+    ap.add_argument('inputs', help="JSON file with the app inputs (loads, cover, agg, fc, fy, fyt)")
+    ap.add_argument('-k', '--top', type=int, default=5)
+    ap.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: all cores)")
+    ap.add_argument('--concrete-cost', type=float, default=DEFAULT_COST['concrete_per_m3'], help="per m³")
+    ap.add_argument('--steel-cost', type=float, default=DEFAULT_COST['steel_per_kg'], help="per kg")
+    args = ap.parse_args(argv)
+
+    with open(args.inputs, encoding='utf-8') as f:
+        base_inputs = json.load(f)
+    best = optimize_section(base_inputs, top_k=args.top, workers=args.workers,
+                            cost={'concrete_per_m3': args.concrete_cost, 'steel_per_kg': args.steel_cost})
+    for r in best:
+        print(f"{r['b']:>4} x {r['h']:<4} {r['mainBar']:<5} {r['stirrupBar']:<5} cost/m {r['cost']:>9,.1f}  "
+              f"concrete {r['concrete_m3']:.3f} m³  steel {r['steel_kg']:.1f} kg  bars {r['bar_counts']}")
+    return 0 if best else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
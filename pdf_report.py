@@ -0,0 +1,443 @@
+"""Direct PDF export of calculation reports (fpdf 1.7.2, no browser).
+
+Each beam gets the same content as the HTML report: header, project and
+material boxes, the three section images and the ``rows`` table, followed by
+the signature block.  A schedule is split into chunks of beams; worker
+processes design each beam, draw its section images and lay out its pages,
+and return the raw page content streams.  The parent process splices those
+streams into one document, embedding every distinct section drawing once (a
+vector form XObject keyed by the SHA-1 of its drawing operators) and adding
+page numbers.
+
+fpdf's core fonts are Latin-1 only, so a Unicode TrueType font is used for
+φ, ≥ and Thai project names: ``BEAM_PDF_FONT`` / ``BEAM_PDF_FONT_BOLD`` if
+set, otherwise the first of Sarabun, Garuda, Loma, Noto Sans Thai or
+matplotlib's DejaVu Sans that is found.
+
+    python pdf_report.py schedule.csv -o schedule.pdf [-j 8]
+"""
+import argparse
+import hashlib
+import multiprocessing
+import os
+import sys
+import time
+import zlib
+
+from fpdf import FPDF
+
+from beam_calc import BAR_INFO, process_calculation
+from beam_report import bar_xs, layer_bars, layers_label
+
+FONT_CANDIDATES = [
+    ('Sarabun-Regular.ttf', 'Sarabun-Bold.ttf'),
+    ('THSarabunNew.ttf', 'THSarabunNew Bold.ttf'),
+    ('Garuda.ttf', 'Garuda-Bold.ttf'),
+    ('Loma.ttf', 'Loma-Bold.ttf'),
+    ('NotoSansThai-Regular.ttf', 'NotoSansThai-Bold.ttf'),
+]
+FONT_DIRS = ['/usr/share/fonts', '/usr/local/share/fonts', os.path.expanduser('~/.fonts'),
+             'C:/Windows/Fonts', '/Library/Fonts']
+SECTION_BOX = (56.0, 72.0)  # mm, one section drawing
+COLS = [('Item', 0.20), ('Formula', 0.30), ('Substitution', 0.25), ('Result', 0.11), ('Unit', 0.06),
+        ('Status', 0.08)]
+LOCATIONS = (("L", "V_L", "Left Support"), ("M", "V_M", "Mid Span"), ("R", "V_R", "Right Support"))
+
+
+def _find_file(name):
+    for root_dir in FONT_DIRS:
+        for root, _, files in os.walk(root_dir):
+            if name in files:
+                return os.path.join(root, name)
+    return None
+
+
+def find_fonts():
+    """(regular, bold) TrueType font paths."""
+    env = os.environ.get('BEAM_PDF_FONT')
+    if env:
+        return env, os.environ.get('BEAM_PDF_FONT_BOLD') or env
+    for regular, bold in FONT_CANDIDATES:
+        path = _find_file(regular)
+        if path:
+            return path, _find_file(bold) or path
+    import matplotlib
+    fonts = os.path.join(matplotlib.get_data_path(), 'fonts', 'ttf')
+    return os.path.join(fonts, 'DejaVuSans.ttf'), os.path.join(fonts, 'DejaVuSans-Bold.ttf')
+
+
+class _Buffer:
+    """Stand-in for FPDF.buffer: fpdf 1.7.2 grows a str with ``+=``, which is quadratic in the document size."""
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def __iadd__(self, s):
+        self.parts.append(s)
+        self.size += len(s)
+        return self
+
+    def __len__(self):
+        return self.size
+
+    def encode(self, encoding):
+        return "".join(self.parts).encode(encoding)
+
+
+class ReportPDF(FPDF):
+    """A4 portrait report; page numbers are drawn only on the merged document."""
+
+    def __init__(self, fonts, page_numbers=False):
+        super().__init__('P', 'mm', 'A4')
+        self.buffer = _Buffer()
+        self.page_numbers = page_numbers
+        if page_numbers:
+            self.alias_nb_pages()
+        self.add_font('Report', '', fonts[0], uni=True)
+        self.add_font('Report', 'B', fonts[1], uni=True)
+        self.set_auto_page_break(False)
+        self.set_margins(12, 12, 12)
+        self.forms = {}
+
+    def _putimages(self):
+        super()._putimages()
+        bbox = f"[0 {(self.h - SECTION_BOX[1]) * self.k:.2f} {SECTION_BOX[0] * self.k:.2f} {self.h * self.k:.2f}]"
+        self._form_objs = {}
+        for name, ops in self.forms.items():
+            data = zlib.compress(ops.encode('latin-1')) if self.compress else ops.encode('latin-1')
+            self._newobj()
+            self._form_objs[name] = self.n
+            self._out(f"<</Type /XObject /Subtype /Form /BBox {bbox} /Resources 2 0 R"
+                      f"{' /Filter /FlateDecode' if self.compress else ''} /Length {len(data)}>>")
+            self._putstream(data)
+            self._out('endobj')
+
+    def _putxobjectdict(self):
+        super()._putxobjectdict()
+        for name, n in self._form_objs.items():
+            self._out(f"/{name} {n} 0 R")
+
+    def footer(self):
+        if not self.page_numbers:
+            return
+        self.set_y(-10)
+        self.set_font('Report', '', 8)
+        self.set_text_color(90, 90, 90)
+        self.cell(0, 5, f"Page {self.page_no()} / {{nb}}", 0, 0, 'R')
+
+
+# ==========================================
+# Worker side: design, images, page layout
+# ==========================================
+def _draw_section(pdf, w, h, b, h_cm, cover, top_n, bot_n, stir_txt, m_db, s_db, title, bar_name,
+                  top_layers=None, bot_layers=None):
+    """create_beam_section as fpdf vector operators in a w x h mm box at the page origin."""
+    band = 6.0  # title
+    s = min(w / (b + 10), (h - band) / (h_cm * 1.4))  # mm per cm
+    x0 = (w - b * s) / 2
+
+    def X(x):
+        return x0 + x * s
+
+    def Y(y):
+        return band + (h_cm * 1.2 - y) * s
+
+    margin = cover + s_db / 20
+    pdf.set_line_width(0.5)
+    pdf.set_draw_color(51, 51, 51)
+    pdf.set_fill_color(255, 255, 255)
+    pdf.rect(X(0), Y(h_cm), b * s, h_cm * s, 'DF')
+    pdf.set_draw_color(46, 125, 50)
+    pdf.rect(X(margin), Y(h_cm - margin), (b - 2 * margin) * s, (h_cm - 2 * margin) * s)
+
+    pdf.set_line_width(0.2)
+    pdf.set_draw_color(0, 0, 0)
+    for layers, n, face_y, direction, color in ((top_layers, top_n, h_cm - margin, -1, (25, 118, 210)),
+                                               (bot_layers, bot_n, margin, 1, (211, 47, 47))):
+        pdf.set_fill_color(*color)
+        if layers:
+            bars = layer_bars(layers, b, margin, face_y, direction)
+        else:
+            dia = m_db / 10
+            y = face_y + direction * dia / 2
+            bars = [(x, y, dia) for x in bar_xs(int(n or 2), b, margin, dia)]
+        for x, y, dia in bars:
+            pdf.ellipse(X(x - dia / 2), Y(y + dia / 2), dia * s, dia * s, 'DF')
+
+    def text(y, txt, color, size, style=''):
+        pdf.set_font('Report', style, size)
+        pdf.set_text_color(*color)
+        pdf.set_xy(0, y - 2)
+        pdf.cell(w, 4, txt, 0, 0, 'C')
+
+    text(band / 2, title, (0, 0, 0), 10, 'B')
+    text(Y(h_cm * 1.05) - 1.5, layers_label(top_layers) if top_layers else f"{top_n}-{bar_name}", (25, 118, 210), 8)
+    text(Y(-h_cm * 0.05) + 1.5, layers_label(bot_layers) if bot_layers else f"{bot_n}-{bar_name}",
+         (211, 47, 47), 8)
+    text(Y(-h_cm * 0.15) + 1.5, f"Stir: {stir_txt}", (46, 125, 50), 8)
+
+
+class _FormStore:
+    """Section drawings as PDF form XObjects named by the SHA-1 of their operators.
+
+    A drawing is captured once per worker by drawing it into an empty page
+    buffer; pages then only hold ``/S<hash> Do``.
+    """
+
+    STATE = ('draw_color', 'fill_color', 'text_color', 'color_flag', 'line_width', 'font_family', 'font_style',
+             'font_size_pt', 'font_size', 'current_font', 'unifontsubset', 'x', 'y')
+
+    def __init__(self, w, h):
+        self.w, self.h = w, h
+        self.by_args = {}
+        self.forms = {}
+
+    def get(self, pdf, args, layers):
+        key = (args, repr(layers))
+        name = self.by_args.get(key)
+        if name is None:
+            saved_page = pdf.pages[pdf.page]
+            saved = {k: getattr(pdf, k) for k in self.STATE}
+            pdf.pages[pdf.page] = ''
+            pdf.font_family = ''  # make set_font emit inside the form
+            _draw_section(pdf, self.w, self.h, *args, **layers)
+            ops = pdf.pages[pdf.page]
+            pdf.pages[pdf.page] = saved_page
+            for k, v in saved.items():
+                setattr(pdf, k, v)
+            name = 'S' + hashlib.sha1(ops.encode('latin-1')).hexdigest()[:16]
+            self.forms.setdefault(name, ops)
+            self.by_args[key] = name
+        return name
+
+    def place(self, pdf, name, x, y):
+        pdf._out(f"q 1 0 0 1 {x * pdf.k:.2f} {-y * pdf.k:.2f} cm /{name} Do Q")
+
+
+def _wrap(pdf, text, width):
+    """Lines of ``text`` that fit ``width`` mm in the current font."""
+    lines = []
+    for para in str(text).split('\n'):
+        line = ''
+        for word in para.split(' '):
+            cand = f"{line} {word}" if line else word
+            if pdf.get_string_width(cand) <= width:
+                line = cand
+                continue
+            if line:
+                lines.append(line)
+            line = ''
+            for ch in word:  # a word longer than the cell is broken anywhere
+                if line and pdf.get_string_width(line + ch) > width:
+                    lines.append(line)
+                    line = ''
+                line += ch
+        lines.append(line)
+    return lines
+
+
+def _table_header(pdf, widths):
+    pdf.set_font('Report', 'B', 8)
+    pdf.set_fill_color(238, 238, 238)
+    for (title, _), w in zip(COLS, widths):
+        pdf.cell(w, 6, title, 1, 0, 'C', True)
+    pdf.ln()
+
+
+def _table_row(pdf, r, widths, line_h=4.0):
+    bottom = pdf.h - 16
+    if r[0] == "SECTION":
+        if pdf.get_y() + 6 > bottom:
+            pdf.add_page()
+            _table_header(pdf, widths)
+        pdf.set_font('Report', 'B', 8.5)
+        pdf.set_fill_color(221, 221, 221)
+        pdf.cell(sum(widths), 6, r[1], 1, 1, 'L', True)
+        return
+
+    pdf.set_font('Report', '', 8)
+    lines = [_wrap(pdf, v, w - 2) for v, w in zip(r[:6], widths)]
+    h = max(len(ls) for ls in lines) * line_h + 2
+    if pdf.get_y() + h > bottom:
+        pdf.add_page()
+        _table_header(pdf, widths)
+    x0, y0 = pdf.get_x(), pdf.get_y()
+    ok = "OK" in r[5] or "PASS" in r[5]
+    load = r[1] == "-" and r[4] in ("tf-m", "tf")
+    x = x0
+    for i, (ls, w) in enumerate(zip(lines, widths)):
+        pdf.rect(x, y0, w, h)
+        if i == 5:
+            pdf.set_font('Report', 'B', 8)
+            pdf.set_text_color(*((0, 128, 0) if ok else (220, 0, 0)))
+        elif i == 3 and load:
+            pdf.set_font('Report', 'B', 8)
+            pdf.set_text_color(211, 47, 47)
+        for j, line in enumerate(ls):
+            pdf.set_xy(x + 1, y0 + 1 + j * line_h)
+            pdf.cell(w - 2, line_h, line, 0, 0, 'C' if i == 5 else 'L')
+        pdf.set_font('Report', '', 8)
+        pdf.set_text_color(0, 0, 0)
+        x += w
+    pdf.set_xy(x0, y0 + h)
+
+
+def _draw_beam(pdf, forms, inputs, rows, bar_counts, shear_res, layouts=None):
+    layouts = layouts or {}
+    pdf.add_page()
+    width = pdf.w - pdf.l_margin - pdf.r_margin
+
+    pdf.set_font('Report', 'B', 13)
+    pdf.set_xy(pdf.w - pdf.r_margin - 40, 12)
+    pdf.cell(40, 10, str(inputs['beam_id']), 1, 0, 'C')
+    pdf.set_xy(pdf.l_margin, 14)
+    pdf.set_font('Report', 'B', 16)
+    pdf.cell(width, 8, "ENGINEERING DESIGN REPORT", 0, 1, 'C')
+    pdf.set_font('Report', 'B', 11)
+    pdf.cell(width, 6, "RC Beam Design SDM", 0, 1, 'C')
+    pdf.set_line_width(0.5)
+    pdf.line(pdf.l_margin, pdf.get_y() + 2, pdf.w - pdf.r_margin, pdf.get_y() + 2)
+    pdf.set_line_width(0.2)
+
+    y = pdf.get_y() + 6
+    box_w = width * 0.48
+    pdf.set_fill_color(249, 249, 249)
+    for x, lines in ((pdf.l_margin, [("Project:", inputs['project']), ("Engineer:", inputs['engineer']),
+                                     ("Date:", "15/12/2568")]),
+                     (pdf.w - pdf.r_margin - box_w,
+                      [("Materials:", f"fc'={inputs['fc']} ksc, fy={inputs['fy']} ksc"),
+                       ("Section:", f"{inputs['b']} x {inputs['h']} cm, Cover={inputs['cover']} cm")])):
+        pdf.rect(x, y, box_w, 20, 'DF')
+        for i, (label, value) in enumerate(lines):
+            pdf.set_xy(x + 2, y + 2 + i * 5.5)
+            pdf.set_font('Report', 'B', 9)
+            pdf.cell(20, 5, label)
+            pdf.set_font('Report', '', 9)
+            pdf.cell(box_w - 24, 5, str(value))
+
+    pdf.set_xy(pdf.l_margin, y + 24)
+    pdf.set_font('Report', 'B', 11)
+    pdf.cell(width, 6, "Design Summary", 0, 1, 'C')
+    gap = (width - 3 * forms.w) / 4
+    m_db = BAR_INFO[inputs['mainBar']]['d_mm']
+    s_db = BAR_INFO[inputs['stirrupBar']]['d_mm']
+    y_img = pdf.get_y() + 2
+    for k, (loc, v_key, title) in enumerate(LOCATIONS):
+        args = (inputs['b'], inputs['h'], inputs['cover'], bar_counts.get(f"{loc}_TOP", 2),
+                bar_counts.get(f"{loc}_BOT", 2), f"@{shear_res[v_key] / 10:.0f}cm", m_db, s_db, title,
+                inputs['mainBar'])
+        layers = {'top_layers': layouts.get(f"{loc}_TOP"), 'bot_layers': layouts.get(f"{loc}_BOT")}
+        forms.place(pdf, forms.get(pdf, args, layers), pdf.l_margin + gap + k * (forms.w + gap), y_img)
+
+    pdf.set_xy(pdf.l_margin, y_img + forms.h + 6)
+    pdf.set_font('Report', 'B', 11)
+    pdf.cell(width, 6, "Calculation Details", 0, 1, 'C')
+    widths = [width * f for _, f in COLS]
+    _table_header(pdf, widths)
+    for r in rows:
+        _table_row(pdf, r, widths)
+
+    if pdf.get_y() + 40 > pdf.h - 16:
+        pdf.add_page()
+    y = pdf.get_y() + 12
+    pdf.set_xy(pdf.l_margin, y)
+    pdf.set_font('Report', 'B', 10)
+    pdf.cell(70, 5, "Designed by:")
+    pdf.line(pdf.l_margin, y + 20, pdf.l_margin + 70, y + 20)
+    pdf.set_font('Report', '', 10)
+    pdf.set_xy(pdf.l_margin, y + 22)
+    pdf.cell(70, 5, f"({inputs['engineer']})", 0, 2, 'C')
+    pdf.cell(70, 5, "วิศวกรโครงสร้าง", 0, 0, 'C')
+
+
+def _build_chunk(task):
+    """Pages for a chunk of beams: content streams, section forms by name and the characters used per font."""
+    beams, fonts = task
+    pdf = ReportPDF(fonts)
+    forms = _FormStore(*SECTION_BOX)
+    for beam in beams:
+        if isinstance(beam, dict):
+            beam = (beam, *process_calculation(beam))
+        _draw_beam(pdf, forms, *beam)
+    return {
+        'pages': [pdf.pages[n] for n in range(1, pdf.page + 1)],
+        'forms': forms.forms,
+        'subsets': {key: font['subset'] for key, font in pdf.fonts.items()},
+    }
+
+
+# ==========================================
+# Parent side: merge chunks into one document
+# ==========================================
+def _merge(chunks, fonts):
+    pdf = ReportPDF(fonts, page_numbers=True)
+    pdf.set_font('Report', '', 8)  # registers the font before any page is added
+    seen = {key: set(font['subset']) for key, font in pdf.fonts.items()}
+    for chunk in chunks:
+        for name, ops in chunk['forms'].items():
+            pdf.forms.setdefault(name, ops)
+        for key, subset in chunk['subsets'].items():
+            new = set(subset) - seen[key]
+            pdf.fonts[key]['subset'].extend(sorted(new))
+            seen[key] |= new
+        for content in chunk['pages']:
+            pdf.add_page()
+            # q/Q keeps the chunk's font and colours from leaking into the footer
+            pdf._out("q\n" + content + "\nQ")
+    return pdf
+
+
+def build_pdf(beams, workers=None, chunk_beams=8):
+    """The merged ReportPDF for ``beams``.
+
+    Items of ``beams`` are app ``inputs`` dicts (designed in the workers) or
+    already designed ``(inputs, rows, bar_counts, shear_res[, layouts])``
+    tuples.  Chunks of ``chunk_beams`` beams are laid out in parallel.
+    """
+    fonts = find_fonts()
+    beams = list(beams)
+    tasks = [(beams[i:i + chunk_beams], fonts) for i in range(0, len(beams), chunk_beams)]
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            chunks = pool.map(_build_chunk, tasks)
+    else:
+        chunks = list(map(_build_chunk, tasks))
+    pdf = _merge(chunks, fonts)
+    pdf.close()
+    return pdf
+
+
+def export_pdf(beams, path, workers=None, chunk_beams=8):
+    """Write the PDF report for ``beams`` to ``path``; returns the number of pages."""
+    pdf = build_pdf(beams, workers, chunk_beams)
+    pdf.output(path, 'F')
+    return pdf.page
+
+
+def pdf_bytes(beams, workers=1):
+    """The PDF report for ``beams`` as bytes (e.g. for a download button)."""
+    return build_pdf(beams, workers).buffer.encode('latin-1')
+
+
+def main(argv=None):
+    from batch_run import load_schedule
+
+    ap = argparse.ArgumentParser(description="Write the calculation report of a beam schedule as one PDF.")
+    ap.add_argument('schedule', help="CSV or JSON beam schedule (same keys as the app inputs)")
+    ap.add_argument('-o', '--output', default='report.pdf')
+    ap.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: all cores)")
+    ap.add_argument('--chunk', type=int, default=8, help="beams per worker task (default %(default)s)")
+    args = ap.parse_args(argv)
+
+    beams = load_schedule(args.schedule)
+    t0 = time.perf_counter()
+    pages = export_pdf(beams, args.output, workers=args.workers, chunk_beams=args.chunk)
+    print(f"{args.output}: {len(beams)} beams, {pages} pages, {os.path.getsize(args.output) / 1e6:,.1f} MB "
+          f"in {time.perf_counter() - t0:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
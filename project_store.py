@@ -0,0 +1,250 @@
+"""SQLite project store: beams by (project, beam_id), results deduplicated by content hash.
+
+``beams`` holds every beam's inputs and the SHA-256 of its engineering inputs
+(result_cache.inputs_hash); ``results`` holds one designed result per hash
+(report rows, bar counts, stirrup spacings, failed checks and the
+result_table numbers) plus indexed PASS/FAIL flags.  Identical beams, in the
+same or another project, share one stored result, and reopening a project
+regenerates its report or table without recalculating anything.
+
+    store = ProjectStore('projects.db')
+    store.upsert_beams(beams)                        # one transaction, designs only unseen hashes
+    store.query(project='P1', fails='spacing')       # all clear spacing fails
+    store.write_report('P1', 'P1.zip')
+
+    python project_store.py projects.db import schedule.csv
+    python project_store.py projects.db query --project P1 --fails spacing
+    python project_store.py projects.db report P1 P1.zip
+"""
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+import time
+
+from beam_calc import beam_result
+from result_cache import inputs_hash
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    hash TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    strength_fail INTEGER NOT NULL,
+    spacing_fail INTEGER NOT NULL,
+    shear_fail INTEGER NOT NULL,
+    failed_checks TEXT NOT NULL,
+    bar_counts TEXT NOT NULL,
+    shear_res TEXT NOT NULL,
+    rows TEXT NOT NULL,
+    vals TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS beams (
+    project TEXT NOT NULL,
+    beam_id TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES results(hash),
+    inputs TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (project, beam_id)
+);
+CREATE INDEX IF NOT EXISTS beams_hash ON beams(hash);
+CREATE INDEX IF NOT EXISTS results_status ON results(status);
+CREATE INDEX IF NOT EXISTS results_strength_fail ON results(strength_fail) WHERE strength_fail = 1;
+CREATE INDEX IF NOT EXISTS results_spacing_fail ON results(spacing_fail) WHERE spacing_fail = 1;
+CREATE INDEX IF NOT EXISTS results_shear_fail ON results(shear_fail) WHERE shear_fail = 1;
+"""
+FAIL_FLAGS = {'strength': 'strength_fail', 'spacing': 'spacing_fail', 'shear': 'shear_fail'}
+
+
+def result_record(inputs):
+    """Column values of the results table for one beam (without the hash)."""
+    from result_table import record_values
+
+    r = beam_result(inputs)
+    failed = r.failed_checks()
+    return (
+        "FAIL" if failed else "PASS",
+        int(not all(c.strength_ok for c in r.flexure)),
+        int(not all(c.spacing_ok for c in r.flexure)),
+        int(not all(c.ok for c in r.shear)),
+        json.dumps(failed, ensure_ascii=False),
+        json.dumps(r.bar_counts()),
+        json.dumps(r.shear_res()),
+        json.dumps(r.rows(), ensure_ascii=False),
+        json.dumps(record_values(r)[2:]),  # project and beam_id come from the beams table
+    )
+
+
+class ProjectStore:
+    """A project database; safe to share between threads (one connection behind a lock)."""
+
+    def __init__(self, path='projects.db'):
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def upsert_beams(self, beams, chunk=500):
+        """Insert or replace beams in one transaction, designing only hashes not stored yet.
+
+        Returns {'beams', 'designed', 'reused'}.
+        """
+        keyed = [(inputs_hash(b), b) for b in beams]
+        unique = {h: b for h, b in keyed}
+        with self._lock:
+            known = self._known(list(unique), chunk)
+        # designed outside the lock; a result another thread stored meanwhile is simply ignored
+        new = [(h, *result_record(b)) for h, b in unique.items() if h not in known]
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR IGNORE INTO results VALUES (?,?,?,?,?,?,?,?,?,?)", new)
+            # a delete_beams between the two locks may have removed a result counted as known;
+            # design it again here so no beam row points at a missing hash
+            gone = [(h, *result_record(unique[h])) for h in known - self._known(list(known), chunk)]
+            self._db.executemany("INSERT INTO results VALUES (?,?,?,?,?,?,?,?,?,?)", gone)
+            new += gone
+            self._db.executemany(
+                "INSERT INTO beams VALUES (?,?,?,?,?) ON CONFLICT(project, beam_id) DO UPDATE SET "
+                "hash = excluded.hash, inputs = excluded.inputs, updated = excluded.updated",
+                [(b.get('project', ''), b['beam_id'], h, json.dumps(b, ensure_ascii=False), now)
+                 for h, b in keyed])
+        return {'beams': len(keyed), 'designed': len(new), 'reused': len(keyed) - len(new)}
+
+    def _known(self, hashes, chunk):
+        """The given hashes that have a stored result; call with the lock held."""
+        known = set()
+        for i in range(0, len(hashes), chunk):
+            part = hashes[i:i + chunk]
+            known.update(h for (h,) in self._db.execute(
+                f"SELECT hash FROM results WHERE hash IN ({','.join('?' * len(part))})", part))
+        return known
+
+    def delete_beams(self, project, beam_ids=None):
+        """Remove a whole project or some of its beams, and results no beam refers to any more."""
+        with self._lock, self._db:
+            if beam_ids is None:
+                self._db.execute("DELETE FROM beams WHERE project = ?", (project,))
+            else:
+                self._db.executemany("DELETE FROM beams WHERE project = ? AND beam_id = ?",
+                                     [(project, b) for b in beam_ids])
+            self._db.execute("DELETE FROM results WHERE hash NOT IN (SELECT hash FROM beams)")
+
+    def _select(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def projects(self):
+        """(project, beams, PASS, FAIL) per project."""
+        return self._select(
+            "SELECT b.project, COUNT(*), SUM(r.status = 'PASS'), SUM(r.status = 'FAIL') "
+            "FROM beams b JOIN results r ON r.hash = b.hash GROUP BY b.project ORDER BY b.project")
+
+    def beams(self, project):
+        """Inputs of every beam in a project, by beam_id."""
+        return [json.loads(s) for (s,) in self._select(
+            "SELECT inputs FROM beams WHERE project = ? ORDER BY beam_id", (project,))]
+
+    def summary(self, project):
+        """Stored design summary per beam: beam_id, status, failed checks, bar counts and spacings."""
+        return [{'beam_id': beam_id, 'status': status, 'failed_checks': json.loads(failed),
+                 'bar_counts': json.loads(bars), 'shear_res': json.loads(shears)}
+                for beam_id, status, failed, bars, shears in self._select(
+                    "SELECT b.beam_id, r.status, r.failed_checks, r.bar_counts, r.shear_res "
+                    "FROM beams b JOIN results r ON r.hash = b.hash WHERE b.project = ? ORDER BY b.beam_id",
+                    (project,))]
+
+    def query(self, project=None, status=None, fails=None):
+        """(project, beam_id, failed_checks) of the beams matching every given filter.
+
+        ``fails`` is 'strength', 'spacing' or 'shear'.
+        """
+        where, params = [], []
+        if project is not None:
+            where.append("b.project = ?")
+            params.append(project)
+        if status is not None:
+            where.append("r.status = ?")
+            params.append(status)
+        if fails is not None:
+            where.append(f"r.{FAIL_FLAGS[fails]} = 1")
+        sql = ("SELECT b.project, b.beam_id, r.failed_checks FROM beams b JOIN results r ON r.hash = b.hash"
+               + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY b.project, b.beam_id")
+        return [(p, b, json.loads(f)) for p, b, f in self._select(sql, params)]
+
+    def iter_designed(self, project):
+        """(inputs, rows, bar_counts, shear_res) per beam from the store, as batch_run.iter_designed."""
+        with self._lock:
+            cur = self._db.execute(
+                "SELECT b.inputs, r.rows, r.bar_counts, r.shear_res FROM beams b JOIN results r ON r.hash = b.hash "
+                "WHERE b.project = ? ORDER BY b.beam_id", (project,))
+            recs = cur.fetchall()
+        for inputs, rows, bars, shears in recs:
+            yield json.loads(inputs), json.loads(rows), json.loads(bars), json.loads(shears)
+
+    def table(self, project):
+        """result_table columns of a project from the stored numbers."""
+        from result_table import results_table
+
+        return results_table([[project, beam_id, *json.loads(vals)] for beam_id, vals in self._select(
+            "SELECT b.beam_id, r.vals FROM beams b JOIN results r ON r.hash = b.hash WHERE b.project = ? "
+            "ORDER BY b.beam_id", (project,))])
+
+    def write_report(self, project, path, renderer=None):
+        """Multi-beam report of a stored project, a bundle (.zip) or one HTML file; returns its size."""
+        from report_bundle import write_report_file
+
+        return write_report_file(path, self.iter_designed(project), renderer)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Store, query and report beam projects in SQLite.")
+    ap.add_argument('db', help="SQLite database file")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p = sub.add_parser('import', help="upsert a CSV or JSON schedule (batch_run format)")
+    p.add_argument('schedule')
+    sub.add_parser('projects', help="list projects with PASS / FAIL counts")
+    p = sub.add_parser('query', help="list beams by status or failing check")
+    p.add_argument('--project')
+    p.add_argument('--status', choices=['PASS', 'FAIL'])
+    p.add_argument('--fails', choices=sorted(FAIL_FLAGS))
+    p = sub.add_parser('report', help="write the report (.zip bundle or .html) of a project without recalculating")
+    p.add_argument('project')
+    p.add_argument('output')
+    args = ap.parse_args(argv)
+
+    with ProjectStore(args.db) as store:
+        t0 = time.perf_counter()
+        if args.cmd == 'import':
+            from batch_run import load_schedule
+            stats = store.upsert_beams(load_schedule(args.schedule))
+            print(f"{stats['beams']} beams: {stats['designed']} designed, {stats['reused']} reused "
+                  f"({time.perf_counter() - t0:.2f} s)")
+        elif args.cmd == 'projects':
+            for project, n, n_pass, n_fail in store.projects():
+                print(f"{project:<30} {n:>6} beams  PASS {n_pass:>6}  FAIL {n_fail:>6}")
+        elif args.cmd == 'query':
+            rows = store.query(args.project, args.status, args.fails)
+            for project, beam_id, failed in rows:
+                print(f"{project}\t{beam_id}\t{'; '.join(failed)}")
+            print(f"{len(rows)} beams ({(time.perf_counter() - t0) * 1e3:.1f} ms)", file=sys.stderr)
+        else:
+            size = store.write_report(args.project, args.output)
+            print(f"report: {args.output} ({size / 1e6:,.1f} MB, {time.perf_counter() - t0:.2f} s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""Monte Carlo reliability of a designed beam's flexure and shear capacity.
+
+The reinforcement is that of the deterministic design (bar counts per moment
+case, stirrup spacing per location, from beam_result on the nominal inputs);
+fc, fy, fyt, b, h, cover and a load multiplier applied to every Mu and Vu
+are random.  Each sample evaluates the limit states
+
+    g = φMn − Mu   for every active moment case,
+    g = φ(Vc + Vs) − Vu   for every shear location,
+
+with φ from the sampled steel strain, as process_calculation computes them.
+A sample fails a limit state when g < 0 and fails the beam when any g < 0.
+
+Samples are drawn and evaluated in vectorized chunks; only running
+statistics are kept (failure counts, and the mean / variance of every g
+merged chunk by chunk), so memory is bounded by the chunk size for any
+number of samples.  Chunks have independent seeds spawned from one
+SeedSequence and can run on a process pool; the result does not depend on
+the number of workers.  Reports give Pf, β = −Φ⁻¹(Pf), the c.o.v. and 95%
+interval of Pf, Cornell's mean-value β, and the Pf history per chunk;
+``target_cov`` stops early once the beam Pf is that precise.
+
+Distributions are 'normal', 'lognormal', 'uniform', 'gumbel' or 'fixed',
+with the mean as ``bias`` times the nominal value and the spread as ``cov``
+or ``std`` (input units: ksc, cm).
+
+    python reliability.py beam.json -n 10000000 -j 4
+    python reliability.py beam.json -n 1e8 --target-cov 0.02 --spec spec.json -o reliability.json
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from statistics import NormalDist
+
+import numpy as np
+
+from beam_calc import BAR_INFO, beam_result
+from design_batch import KSC_TO_MPA, PHI_V, TF_TO_N, TFM_TO_NMM
+from flexure_batch import flexure_response
+
+VARIABLES = ('fc', 'fy', 'fyt', 'b', 'h', 'cover', 'load')
+DEFAULT_SPEC = {
+    'fc': {'dist': 'lognormal', 'bias': 1.10, 'cov': 0.15},
+    'fy': {'dist': 'lognormal', 'bias': 1.125, 'cov': 0.10},
+    'fyt': {'dist': 'lognormal', 'bias': 1.125, 'cov': 0.10},
+    'b': {'dist': 'normal', 'bias': 1.0, 'std': 0.5},
+    'h': {'dist': 'normal', 'bias': 1.0, 'std': 0.5},
+    'cover': {'dist': 'normal', 'bias': 1.0, 'std': 0.5},
+    'load': {'dist': 'normal', 'bias': 1.0, 'cov': 0.10},  # multiplier on the inputs Mu and Vu
+}
+DISTRIBUTIONS = ('normal', 'lognormal', 'uniform', 'gumbel', 'fixed')
+CHUNK = 1 << 18
+_EULER = 0.5772156649015329
+
+
+def merge_spec(spec=None):
+    """DEFAULT_SPEC with the per-variable overrides of ``spec``."""
+    spec = spec or {}
+    for v in spec:
+        if v not in VARIABLES:
+            raise ValueError(f"unknown random variable '{v}'; choose from {', '.join(VARIABLES)}")
+    out = {v: {**DEFAULT_SPEC[v], **spec.get(v, {})} for v in VARIABLES}
+    for v, d in out.items():
+        if d['dist'] not in DISTRIBUTIONS:
+            raise ValueError(f"{v}: distribution must be one of {DISTRIBUTIONS}")
+    return out
+
+
+def sample(rng, nominal, dist, n):
+    """``n`` samples of one variable with nominal value ``nominal`` and distribution spec ``dist``."""
+    mean = dist.get('bias', 1.0) * nominal
+    std = dist['std'] if 'std' in dist else dist.get('cov', 0.0) * abs(mean)
+    kind = dist['dist']
+    if kind == 'fixed' or std == 0:
+        return np.full(n, float(mean))
+    if kind == 'normal':
+        return rng.normal(mean, std, n)
+    if kind == 'lognormal':
+        s2 = math.log1p((std / mean) ** 2)
+        return rng.lognormal(math.log(mean) - s2 / 2, math.sqrt(s2), n)
+    if kind == 'uniform':
+        half = math.sqrt(3.0) * std
+        return rng.uniform(mean - half, mean + half, n)
+    scale = std * math.sqrt(6.0) / math.pi  # gumbel (largest values)
+    return rng.gumbel(mean - _EULER * scale, scale, n)
+
+
+def limit_states(inputs):
+    """Deterministic part of the model: nominal inputs, provided bars and stirrups, demands."""
+    r = beam_result(inputs)
+    flex = [c for c in r.flexure if c.Mu_tfm > 0.001]
+    shear = [c for c in r.shear if c.Vu_tf > 0]
+    return {
+        'inputs': {k: inputs[k] for k in ('b', 'h', 'cover', 'fc', 'fy', 'fyt')},
+        'db_main': float(BAR_INFO[inputs['mainBar']]['d_mm']),
+        'bar_area': BAR_INFO[inputs['mainBar']]['A_cm2'] * 100,
+        'db_st': float(BAR_INFO[inputs['stirrupBar']]['d_mm']),
+        'Av': 2 * BAR_INFO[inputs['stirrupBar']]['A_cm2'] * 100,
+        'names': [f"{c.title}: φMn ≥ Mu" for c in flex] + [f"{c.loc}: φVn ≥ Vu" for c in shear],
+        'n': [c.n for c in flex], 'Mu': [c.Mu_tfm for c in flex],
+        's': [c.s_prov for c in shear], 'Vu': [c.Vu_tf for c in shear],
+    }
+
+
+def margins(model, spec, n, rng):
+    """Limit-state margins g (tf-m / tf) of ``n`` samples, shaped (limit states, n)."""
+    nom = model['inputs']
+    x = {v: sample(rng, 1.0 if v == 'load' else nom[v], spec[v], n) for v in VARIABLES}
+    bw = np.maximum(x['b'], 0.1) * 10
+    d = x['h'] * 10 - np.maximum(x['cover'], 0.0) * 10 - model['db_st'] - model['db_main'] / 2.0
+    d = np.maximum(d, 1.0)
+    fc = np.maximum(x['fc'], 1.0) * KSC_TO_MPA
+    fy = np.maximum(x['fy'], 1.0) * KSC_TO_MPA
+    fyt = np.maximum(x['fyt'], 1.0) * KSC_TO_MPA
+
+    g = np.empty((len(model['names']), n))
+    phiMn = {}  # cases with the same bar count share one capacity evaluation
+    for i, (bars, Mu) in enumerate(zip(model['n'], model['Mu'])):
+        if bars not in phiMn:
+            phiMn[bars] = flexure_response(bars * model['bar_area'], fc, fy, bw, d)['phiMn'] / TFM_TO_NMM
+        g[i] = phiMn[bars] - x['load'] * Mu
+    Vc = 0.17 * np.sqrt(fc) * bw * d
+    k = len(model['n'])
+    for j, (s, Vu) in enumerate(zip(model['s'], model['Vu'])):
+        g[k + j] = PHI_V * (Vc + model['Av'] * fyt * d / s) / TF_TO_N - x['load'] * Vu
+    return g
+
+
+class RunningStats:
+    """Failure counts and mean / variance of the margins, mergeable across chunks (Chan et al.)."""
+
+    def __init__(self, k):
+        self.n = 0
+        self.fails = np.zeros(k, dtype=np.int64)
+        self.system_fails = 0
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+
+    @classmethod
+    def of(cls, g):
+        st = cls(g.shape[0])
+        st.n = g.shape[1]
+        fail = g < 0
+        st.fails = fail.sum(axis=1)
+        st.system_fails = int(fail.any(axis=0).sum())
+        st.mean = g.mean(axis=1)
+        st.m2 = ((g - st.mean[:, None]) ** 2).sum(axis=1)
+        return st
+
+    def merge(self, other):
+        n = self.n + other.n
+        if not n:
+            return self
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.n / n)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.n * other.n / n)
+        self.fails = self.fails + other.fails
+        self.system_fails += other.system_fails
+        self.n = n
+        return self
+
+
+def _chunk(task):
+    model, spec, n, seed = task
+    return RunningStats.of(margins(model, spec, n, np.random.default_rng(seed)))
+
+
+def estimate(fails, n):
+    """Pf, β, c.o.v. of Pf and its 95% interval (Wilson) from ``fails`` out of ``n`` samples."""
+    pf = fails / n
+    z = 1.959963984540054
+    centre = (pf + z * z / (2 * n)) / (1 + z * z / n)
+    half = z * math.sqrt(pf * (1 - pf) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return {
+        'pf': pf, 'beta': reliability_index(pf), 'failures': int(fails),
+        'cov': math.sqrt((1 - pf) / (n * pf)) if fails else math.inf,
+        'pf_95': (max(centre - half, 0.0), min(centre + half, 1.0)),
+    }
+
+
+def reliability_index(pf):
+    if pf <= 0:
+        return math.inf
+    if pf >= 1:
+        return -math.inf
+    return -NormalDist().inv_cdf(pf)
+
+
+def run_reliability(inputs, samples=10_000_000, spec=None, chunk=CHUNK, workers=1, seed=0, target_cov=None,
+                    progress=None):
+    """Monte Carlo reliability of ``inputs`` as designed.
+
+    Returns 'system' and 'limit_states' (estimate dicts, the latter with the
+    mean-value β), 'samples', 'history' ([samples, Pf, c.o.v.] after every
+    chunk) and 'batch_ratio' (spread of the per-chunk Pf over its binomial
+    expectation; near 1 when the chunks are independent and well mixed).
+    """
+    samples, chunk = int(samples), int(chunk)
+    if samples < 1 or chunk < 1:
+        raise ValueError(f"samples and chunk must be at least 1 (got {samples}, {chunk})")
+    model = limit_states(inputs)
+    spec = merge_spec(spec)
+    sizes = [min(chunk, samples - i) for i in range(0, samples, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = ((model, spec, n, s) for n, s in zip(sizes, seeds))
+
+    total = RunningStats(len(model['names']))
+    history, chunk_pf = [], []
+    t0 = time.perf_counter()
+    pool = multiprocessing.Pool(workers) if workers > 1 else None
+    try:
+        for st in (pool.imap(_chunk, tasks) if pool else map(_chunk, tasks)):
+            total.merge(st)
+            chunk_pf.append(st.system_fails / st.n)
+            est = estimate(total.system_fails, total.n)
+            history.append([total.n, est['pf'], est['cov']])
+            if progress:
+                progress(total.n, samples, est)
+            if target_cov and est['cov'] <= target_cov:
+                break
+    finally:
+        if pool:
+            pool.terminate()
+            pool.join()
+    elapsed = time.perf_counter() - t0
+
+    pf = total.system_fails / total.n
+    expected = math.sqrt(pf * (1 - pf) / (total.n / len(chunk_pf)))
+    states = []
+    for i, name in enumerate(model['names']):
+        std = math.sqrt(total.m2[i] / max(total.n - 1, 1))
+        states.append({'name': name, **estimate(int(total.fails[i]), total.n), 'g_mean': float(total.mean[i]),
+                       'g_std': std, 'beta_mv': float(total.mean[i]) / std if std else math.inf})
+    return {
+        'beam_id': inputs.get('beam_id', ''), 'samples': total.n, 'seconds': elapsed,
+        'samples_per_s': total.n / elapsed, 'system': estimate(total.system_fails, total.n),
+        'limit_states': states, 'history': history,
+        'batch_ratio': float(np.std(chunk_pf) / expected) if len(chunk_pf) > 1 and expected else None,
+        'spec': spec,
+    }
+
+
+def json_safe(obj):
+    """``obj`` with infinite or NaN floats (β of Pf = 0, c.o.v. of no failures) as None, for strict JSON."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: json_safe(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [json_safe(v) for v in obj]
+    return obj
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Monte Carlo reliability of a beam's flexure and shear capacity.")
+    ap.add_argument('inputs', help="JSON with the app inputs")
+    ap.add_argument('-n', '--samples', type=float, default=1e7)
+    ap.add_argument('--chunk', type=int, default=CHUNK, help="samples per vectorized chunk")
+    ap.add_argument('-j', '--workers', type=int, default=1, help="processes (0: CPU count)")
+    ap.add_argument('--spec', help="JSON with distribution overrides, e.g. {\"fc\": {\"cov\": 0.2}}")
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--target-cov', type=float, help="stop once the beam Pf c.o.v. reaches this")
+    ap.add_argument('-o', '--output', help="write the full result as JSON")
+    args = ap.parse_args(argv)
+    if args.samples < 1 or args.chunk < 1:
+        ap.error("--samples and --chunk must be at least 1")
+
+    with open(args.inputs, encoding='utf-8') as f:
+        inputs = json.load(f)
+    spec = None
+    if args.spec:
+        with open(args.spec, encoding='utf-8') as f:
+            spec = json.load(f)
+    workers = args.workers or os.cpu_count() or 1
+
+    def progress(done, total, est):
+        print(f"\r{done:,}/{total:,} samples  Pf {est['pf']:.3e}  c.o.v. {est['cov']:.3f}", end='',
+              file=sys.stderr, flush=True)
+
+    res = run_reliability(inputs, args.samples, spec, args.chunk, workers, args.seed, args.target_cov, progress)
+    print(file=sys.stderr)
+    print(f"{res['samples']:,} samples in {res['seconds']:.1f} s ({res['samples_per_s']:,.0f}/s, {workers} workers)")
+    print(f"{'limit state':<34} {'Pf':>10} {'β':>6} {'c.o.v.':>7} {'fails':>9} {'β_MV':>6}")
+    for s in res['limit_states']:
+        print(f"{s['name']:<34} {s['pf']:>10.3e} {s['beta']:>6.2f} {s['cov']:>7.3f} {s['failures']:>9,} "
+              f"{s['beta_mv']:>6.2f}")
+    sysr = res['system']
+    print(f"{'beam (any limit state)':<34} {sysr['pf']:>10.3e} {sysr['beta']:>6.2f} {sysr['cov']:>7.3f} "
+          f"{sysr['failures']:>9,}")
+    lo, hi = sysr['pf_95']
+    print(f"Pf 95% interval {lo:.3e} – {hi:.3e} (β {reliability_index(hi):.2f} – {reliability_index(lo):.2f})")
+    if res['batch_ratio'] is not None:
+        print(f"chunk Pf spread / binomial expectation: {res['batch_ratio']:.2f}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(json_safe(res), f, ensure_ascii=False, indent=1, allow_nan=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
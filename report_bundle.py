@@ -0,0 +1,161 @@
+"""Report bundles: one compressed archive with content-addressed images.
+
+A bundle is a zip file holding ``report.html`` and ``assets/<sha256>.svg``
+(or ``.png``).  Every section image is stored once under the SHA-256 of its
+bytes, however many beams show it, and the HTML refers to it by that path,
+so a project where many beams share sections carries each drawing once and
+without base64.  The HTML and SVG entries are deflated; PNGs, already
+compressed, are stored as they are.  Unzipped, the folder opens in any
+browser.
+
+Images are inlined as data URIs only for single-file output, when it is
+asked for explicitly: an ``.html`` path to write_report_file, or
+``inline_bundle`` to turn an existing bundle into one HTML file.
+
+    python report_bundle.py build schedule.csv project.zip
+    python report_bundle.py inline project.zip project.html
+"""
+import argparse
+import base64
+import hashlib
+import io
+import os
+import re
+import sys
+import urllib.parse
+import zipfile
+
+from beam_report import svg_to_data_uri, write_multi_beam_report
+
+REPORT_NAME = 'report.html'
+ASSET_DIR = 'assets'
+MIME = {'svg': 'image/svg+xml', 'png': 'image/png'}
+_ASSET_SRC = re.compile(r'src="(assets/[0-9a-f]+\.(?:svg|png))"')
+
+
+def data_uri_bytes(uri):
+    """(bytes, extension) of an image data URI as produced by the section renderers."""
+    head, _, payload = uri.partition(',')
+    ext = 'svg' if head.startswith('data:image/svg+xml') else 'png'
+    if head.endswith(';base64'):
+        return base64.b64decode(payload), ext
+    return urllib.parse.unquote(payload).encode('utf-8'), ext
+
+
+def data_uri(data, ext):
+    """Data URI of image bytes, in the renderers' encoding (SVG percent-encoded, PNG base64)."""
+    if ext == 'svg':
+        return svg_to_data_uri(data.decode('utf-8'))
+    return f"data:{MIME[ext]};base64,{base64.b64encode(data).decode()}"
+
+
+class AssetStore:
+    """Content-addressed images: each distinct image kept once under assets/<sha256>.<ext>."""
+
+    def __init__(self):
+        self.assets = {}  # path -> bytes
+        self.refs = 0
+        self._paths = {}  # data URI -> path; SECTION_CACHE hands out the same strings again
+
+    def add(self, data, ext):
+        path = f"{ASSET_DIR}/{hashlib.sha256(data).hexdigest()}.{ext}"
+        self.assets.setdefault(path, data)
+        return path
+
+    def src(self, uri):
+        """Asset path for a data URI (the image_src hook of beam_report.iter_multi_beam_report)."""
+        self.refs += 1
+        path = self._paths.get(uri)
+        if path is None:
+            path = self._paths[uri] = self.add(*data_uri_bytes(uri))
+        return path
+
+    def info(self):
+        return {'references': self.refs, 'assets': len(self.assets),
+                'asset_bytes': sum(len(v) for v in self.assets.values())}
+
+
+def write_bundle(target, beams, renderer=None):
+    """Write the report of ``beams`` (as for write_multi_beam_report) as a bundle to a path or binary file.
+
+    Returns the AssetStore (with .info() for the reference / asset counts).
+    """
+    store = AssetStore()
+    with zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        with zf.open(REPORT_NAME, 'w', force_zip64=True) as raw:
+            text = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+            write_multi_beam_report(text, beams, renderer, image_src=store.src)
+            text.flush()
+            text.detach()
+        for path, data in store.assets.items():
+            # fixed timestamps, as for report.html: the same report gives the same archive bytes
+            info = zipfile.ZipInfo(path)
+            info.compress_type = zipfile.ZIP_STORED if path.endswith('.png') else zipfile.ZIP_DEFLATED
+            zf.writestr(info, data)
+    return store
+
+
+def bundle_bytes(beams, renderer=None):
+    """A bundle in memory (e.g. for a download button)."""
+    buf = io.BytesIO()
+    write_bundle(buf, beams, renderer)
+    return buf.getvalue()
+
+
+def inline_bundle(bundle, out_path):
+    """Single-file HTML from a bundle, every asset reference replaced by its data URI; returns the characters."""
+    with zipfile.ZipFile(bundle) as zf:
+        html = zf.read(REPORT_NAME).decode('utf-8')
+        uris = {}
+
+        def inline(m):
+            path = m.group(1)
+            if path not in uris:
+                uris[path] = data_uri(zf.read(path), path.rsplit('.', 1)[1])
+            return f'src="{uris[path]}"'
+
+        html = _ASSET_SRC.sub(inline, html)
+    with open(out_path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    return len(html)
+
+
+def write_report_file(path, beams, renderer=None):
+    """Multi-beam report to ``path``: a bundle for .zip, otherwise one HTML file with inlined images.
+
+    Returns the size written (bytes of the archive, or characters of the HTML).
+    """
+    if path.lower().endswith('.zip'):
+        write_bundle(path, beams, renderer)
+        return os.path.getsize(path)
+    with open(path, 'w', encoding='utf-8') as f:
+        return write_multi_beam_report(f, beams, renderer)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Write or inline report bundles (zip with hashed image assets).")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p = sub.add_parser('build', help="design a schedule and write its report bundle")
+    p.add_argument('schedule', help="CSV or JSON schedule (batch_run format)")
+    p.add_argument('output', help="bundle path (.zip)")
+    p.add_argument('--renderer', choices=['svg', 'png'])
+    p = sub.add_parser('inline', help="turn a bundle into one self-contained HTML file")
+    p.add_argument('bundle')
+    p.add_argument('output')
+    args = ap.parse_args(argv)
+
+    if args.cmd == 'build':
+        from batch_run import iter_designed, load_schedule
+
+        beams = load_schedule(args.schedule)
+        info = write_bundle(args.output, iter_designed(beams), args.renderer).info()
+        print(f"{args.output}: {len(beams)} beams, {info['references']} section images -> {info['assets']} assets "
+              f"({info['asset_bytes'] / 1e3:,.1f} kB), archive {os.path.getsize(args.output) / 1e6:,.2f} MB")
+    else:
+        size = inline_bundle(args.bundle, args.output)
+        print(f"{args.output}: {size / 1e6:,.1f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Content-hashed cache of process_calculation results.
+
+The key is a SHA-256 of the engineering inputs only (geometry, materials,
+bars and loads), so the same beam checked under another project, beam number
+or engineer reuses the stored result; those fields are applied again when the
+report is rendered.  An in-memory LRU tier is always on; an on-disk tier (one
+JSON file per key) is enabled by passing ``disk_dir`` or setting
+``BEAM_RESULT_CACHE_DIR`` and survives server restarts.
+
+The cache keeps its own copy of every result and hands out copies, so
+callers may change what they get (e.g. insert report rows).
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from beam_calc import ENGINEERING_KEYS, process_calculation
+
+TEXT_KEYS = ('mainBar', 'stirrupBar')
+
+
+def normalize_inputs(inputs):
+    """The engineering inputs in canonical form (numbers as float); metadata and any other field dropped."""
+    return {k: (str(inputs[k]) if k in TEXT_KEYS else float(inputs[k])) for k in sorted(ENGINEERING_KEYS)}
+
+
+def _copy(result):
+    rows, bar_counts, shear_res = result
+    return [list(r) for r in rows], dict(bar_counts), dict(shear_res)
+
+
+def inputs_hash(inputs):
+    blob = json.dumps(normalize_inputs(inputs), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, maxsize=1024, disk_dir=None, disk_maxsize=100000):
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.disk_maxsize = disk_maxsize
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._disk_writes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + '.json')
+
+    def get(self, key):
+        with self._lock:
+            res = self._data.get(key)
+            if res is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return _copy(res)
+        res = self._disk_get(key)
+        with self._lock:
+            if res is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._put_memory(key, res)
+        return _copy(res)
+
+    def put(self, key, result):
+        result = _copy(result)
+        with self._lock:
+            self._put_memory(key, result)
+        self._disk_put(key, result)
+
+    def _put_memory(self, key, result):
+        self._data[key] = result
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def _disk_get(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                rec = json.load(f)
+            os.utime(path)  # pruning drops the least recently used files
+        except (OSError, ValueError):
+            return None
+        return rec['rows'], rec['bar_counts'], rec['shear_res']
+
+    def _disk_put(self, key, result):
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        rows, bar_counts, shear_res = result
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'rows': rows, 'bar_counts': bar_counts, 'shear_res': shear_res}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        self._disk_writes += 1
+        if self._disk_writes % 256 == 0:
+            self._disk_prune()
+
+    def _disk_prune(self):
+        if not self.disk_maxsize:
+            return
+        files = [os.path.join(root, name) for root, _, names in os.walk(self.disk_dir)
+                 for name in names if name.endswith('.json')]
+        if len(files) <= self.disk_maxsize:
+            return
+        files.sort(key=lambda p: os.stat(p).st_mtime)
+        for p in files[:len(files) - self.disk_maxsize]:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                    'size': len(self._data), 'maxsize': self.maxsize, 'disk_dir': self.disk_dir}
+
+
+RESULT_CACHE = ResultCache(disk_dir=os.environ.get('BEAM_RESULT_CACHE_DIR') or None)
+
+
+def cached_process_calculation(inputs, cache=None, counters=None):
+    """process_calculation through the result cache.
+
+    Returns ``(rows, bar_counts, shear_res, from_cache)``.  ``counters`` is
+    passed to process_calculation on a miss and left untouched on a hit.
+    """
+    cache = RESULT_CACHE if cache is None else cache
+    key = inputs_hash(inputs)
+    res = cache.get(key)
+    if res is not None:
+        return (*res, True)
+    res = process_calculation(inputs, counters=counters)
+    cache.put(key, res)
+    return (*res, False)
@@ -0,0 +1,80 @@
+"""Columnar tables of BeamResult records for fast filtering of batch runs.
+
+``results_table`` turns a sequence of beam_calc.BeamResult into a dict of
+NumPy arrays, one per column: section quantities (d, As_min, As_max, Vc, ...),
+then for every moment case ``<case>_<field>`` (As_req, n, As_prov, phi,
+phiMn, strength_ok, spacing_ok) and for every shear location
+``<loc>_<field>`` (s_req, s_prov, phiVn, ok), and the overall ``ok``.
+Units are the calculation units: mm, mm², N·mm, N; Vu and φVn in tf.
+Inactive moment cases (Mu ≤ 0.001 tf-m) hold NaN and pass.
+
+    tab = results_table(results)
+    fails = select(tab, ~tab['ok'])            # all FAIL beams
+    save_table(tab, 'results.npz')             # or .csv
+"""
+import csv
+
+import numpy as np
+
+from beam_calc import MU_CASES, VU_CASES
+
+SECTION_FIELDS = ['bw', 'h', 'd', 'fc', 'fy', 'fyt', 'beta1', 'As_min', 'As_max', 'Vc_N', 'Av', 's_max_Av_min']
+FLEXURE_FIELDS = ['Mu_tfm', 'As_req', 'n', 'As_prov', 'phi', 'phiMn', 'eps_t', 'clear_spacing', 'strength_ok',
+                  'spacing_ok']
+SHEAR_FIELDS = ['Vu_tf', 's_req', 's_prov', 'phiVn_tf', 'ok']
+DTYPES = {'n': np.int32, 'strength_ok': bool, 'spacing_ok': bool, 'ok': bool}
+
+
+def columns():
+    """(name, dtype) of every column, in record_values order."""
+    cols = [('project', object), ('beam_id', object)] + [(f, float) for f in SECTION_FIELDS]
+    cols += [(f"{key}_{f}", DTYPES.get(f, float)) for key, _, _ in MU_CASES for f in FLEXURE_FIELDS]
+    cols += [(f"{key}_{f}", DTYPES.get(f, float)) for key, _, _ in VU_CASES for f in SHEAR_FIELDS]
+    return cols + [('ok', bool)]
+
+
+def record_values(r):
+    """One BeamResult flattened in ``columns()`` order (None for inactive cases)."""
+    out = [r.inputs.get('project', ''), r.inputs.get('beam_id', '')]
+    out += [getattr(r, f) for f in SECTION_FIELDS]
+    for c in r.flexure:
+        out += [getattr(c, f) for f in FLEXURE_FIELDS]
+    for c in r.shear:
+        out += [getattr(c, f) for f in SHEAR_FIELDS]
+    out.append(r.ok)
+    return out
+
+
+def results_table(results):
+    """Dict of column arrays for BeamResult records (or lists from record_values)."""
+    rows = [r if isinstance(r, (list, tuple)) else record_values(r) for r in results]
+    table = {}
+    for j, (col, dt) in enumerate(columns()):
+        vals = [row[j] for row in rows]
+        if dt is float:
+            table[col] = np.array([np.nan if v is None else v for v in vals], dtype=float)
+        else:
+            table[col] = np.array(vals, dtype=dt)
+    return table
+
+
+def select(table, mask):
+    """Rows of ``table`` where ``mask`` (a boolean array or index array) is set."""
+    return {k: v[mask] for k, v in table.items()}
+
+
+def save_table(table, path):
+    """Write a table as .npz (compressed arrays) or .csv, by extension."""
+    if path.lower().endswith('.csv'):
+        cols = list(table)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            w = csv.writer(f)
+            w.writerow(cols)
+            w.writerows(zip(*(table[c].tolist() for c in cols)))
+    else:
+        np.savez_compressed(path, **{k: (v.astype(str) if v.dtype == object else v) for k, v in table.items()})
+
+
+def load_table(path):
+    with np.load(path) as z:
+        return {k: z[k] for k in z.files}
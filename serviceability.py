@@ -0,0 +1,319 @@
+"""Serviceability: cracked-section deflection and crack control along the span.
+
+Takes service (unfactored) moment diagrams, dead ``M_D`` and live ``M_L`` in
+tf-m (sagging positive) at stations x (m) between the two supports of a span,
+and the provided bars of the flexure design (beam_result: d and the bar
+counts of the left quarter, middle half and right quarter, as in
+continuous.span_inputs).  At every station, with NumPy over (beams,
+stations):
+
+* cracked transformed section with the compression bars (n = Es / Ec,
+  Ec = 4700 √fc'), Icr and the neutral axis c, for the face in tension,
+* Mcr = fr Ig / yt with fr = 0.62 √fc', and Ie of ACI 318-19 Eq. 24.2.3.5b
+  for the moment at that station and load level,
+* curvature κ = M / (Ec Ie), integrated twice (trapezoids) with zero
+  deflection at both supports.
+
+Deflections are immediate under D and D + L (live = difference), and long
+term λΔ = ξ / (1 + 50 ρ') times the sustained-load deflection (D plus
+``psi`` times L), with ρ' at the station of largest deflection.  Limits are
+span / ``live_limit`` for the immediate live deflection and span /
+``total_limit`` for long-term plus live (ACI 318-19 Table 24.2.2).  Crack
+control checks the bar spacing of the tension face against ACI 318-19
+24.3.2 with the cracked-section steel stress fs, and reports the
+Gergely-Lutz crack width against ``w_max``.
+
+    python serviceability.py schedule.csv diagrams.csv [--psi 0.25] [--report service.zip]
+
+``diagrams.csv`` has columns ``beam_id, x, M_D, M_L``; every beam is
+resampled to ``--stations`` points.
+"""
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+from beam_calc import BAR_INFO, beam_result, fmt
+
+ES = 200000.0
+XI = 2.0  # ACI 318-19 Table 24.2.4.1.3, sustained load of 5 years or more
+LIVE_LIMIT = 360.0
+TOTAL_LIMIT = 240.0
+W_MAX = 0.4  # mm, interior exposure
+TFM_TO_NMM = 9806650.0
+
+
+def zone_masks(t):
+    """Left quarter, middle half and right quarter of the span for normalized stations t."""
+    return {'L': t <= 0.25, 'M': (t > 0.25) & (t < 0.75), 'R': t >= 0.75}
+
+
+def cracked_section(bw, d, d2, As, As2, n):
+    """Neutral axis depth c and Icr (mm⁴) of the cracked transformed section with compression steel As2."""
+    a = bw / 2.0
+    b = n * As + (n - 1) * As2
+    cc = n * As * d + (n - 1) * As2 * d2
+    c = (-b + np.sqrt(b * b + 4 * a * cc)) / (2 * a)
+    Icr = bw * c ** 3 / 3 + n * As * (d - c) ** 2 + (n - 1) * As2 * (c - d2) ** 2
+    return c, Icr
+
+
+def effective_inertia(Ma, Mcr, Ig, Icr):
+    """ACI 318-19 Eq. 24.2.3.5b (Ig when Ma ≤ 2/3 Mcr)."""
+    Ma = np.abs(Ma)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Ie = Icr / (1 - ((2 / 3) * Mcr / Ma) ** 2 * (1 - Icr / Ig))
+    return np.where(Ma <= (2 / 3) * Mcr, Ig, Ie)
+
+
+def deflection(x_mm, kappa):
+    """Downward deflection from curvature along the last axis, zero at both ends."""
+    dx = np.diff(x_mm, axis=-1)
+    slope = np.concatenate([np.zeros(kappa.shape[:-1] + (1,)),
+                            np.cumsum(0.5 * (kappa[..., 1:] + kappa[..., :-1]) * dx, axis=-1)], axis=-1)
+    y = np.concatenate([np.zeros(kappa.shape[:-1] + (1,)),
+                        np.cumsum(0.5 * (slope[..., 1:] + slope[..., :-1]) * dx, axis=-1)], axis=-1)
+    t = (x_mm - x_mm[..., :1]) / (x_mm[..., -1:] - x_mm[..., :1])
+    return -(y - y[..., -1:] * t)
+
+
+def beam_params(beams):
+    """Per-beam section arrays (mm, mm², MPa) and provided As per zone and face from the flexure design.
+
+    ``beams`` are ``inputs`` dicts, ``(inputs, bar_counts)`` pairs or
+    ``(inputs, bar_counts, layouts)`` with the layouts of
+    bar_arrangement.arrange_failing_cases, which replace the single-size bars
+    of their keys.  Bar counts default to those of beam_result.  'N_*' is the
+    number of bars in the outer layer of each face, for crack control.
+    """
+    cols = {k: [] for k in ('bw', 'h', 'd', 'd2', 'fc', 'fy', 'db', 'db_st', 'cover', 'bar_area')}
+    keys = [f"{z}_{f}" for z in 'LMR' for f in ('TOP', 'BOT')]
+    As = {k: [] for k in keys}
+    N = {k: [] for k in keys}
+    for item in beams:
+        item = item if isinstance(item, tuple) else (item,)
+        inputs, bars, layouts = item + (None,) * (3 - len(item))
+        r = beam_result(inputs)
+        bars = bars or r.bar_counts()
+        layouts = layouts or {}
+        area = BAR_INFO[inputs['mainBar']]['A_cm2'] * 100
+        for k, v in (('bw', r.bw), ('h', r.h), ('d', r.d), ('d2', r.h - r.d), ('fc', r.fc), ('fy', r.fy),
+                     ('db', r.db_main), ('db_st', r.db_st), ('cover', r.cover), ('bar_area', area)):
+            cols[k].append(v)
+        for k in keys:
+            if layouts.get(k):
+                As[k].append(sum(BAR_INFO[b]['A_cm2'] * 100 for layer in layouts[k] for b in layer))
+                N[k].append(len(layouts[k][0]))
+            else:
+                As[k].append(bars[k] * area)
+                N[k].append(bars[k])
+    out = {k: np.array(v, dtype=float)[:, None] for k, v in cols.items()}
+    out.update({f"As_{k}": np.array(v, dtype=float)[:, None] for k, v in As.items()})
+    out.update({f"N_{k}": np.array(v, dtype=float)[:, None] for k, v in N.items()})
+    return out
+
+
+def service_batch(beams, x, M_D, M_L, psi=0.0, xi=XI, live_limit=LIVE_LIMIT, total_limit=TOTAL_LIMIT,
+                  w_max=W_MAX):
+    """Serviceability of every beam at every station.
+
+    ``x`` (m), ``M_D`` and ``M_L`` (tf-m) are (beams, stations) or (stations,)
+    arrays.  Returns station arrays (Icr, Ie, curvature and deflections in
+    mm for D, D + L, live and long term), per-beam maxima, limits, crack
+    control quantities and the checks.
+    """
+    p = beam_params(beams)
+    shape = np.broadcast_shapes(np.shape(x), np.shape(M_D), np.shape(M_L), (len(p['bw']), 1))
+    x, M_D, M_L = (np.broadcast_to(np.asarray(a, dtype=float), shape) for a in (x, M_D, M_L))
+    x_mm = x * 1000.0
+    span = x_mm[:, -1] - x_mm[:, 0]
+    t = (x_mm - x_mm[:, :1]) / span[:, None]
+
+    bw, h, d, d2, fc = p['bw'], p['h'], p['d'], p['d2'], p['fc']
+    Ec = 4700 * np.sqrt(fc)
+    n = ES / Ec
+    Ig = bw * h ** 3 / 12
+    Mcr = 0.62 * np.sqrt(fc) * Ig / (h / 2)
+
+    # provided bars at each station, by zone; the tension face follows the sign of the moment
+    As_top = np.zeros(shape)
+    As_bot = np.zeros(shape)
+    N_top = np.zeros(shape)
+    N_bot = np.zeros(shape)
+    for z, mask in zone_masks(t).items():
+        As_top = np.where(mask, p[f"As_{z}_TOP"], As_top)
+        As_bot = np.where(mask, p[f"As_{z}_BOT"], As_bot)
+        N_top = np.where(mask, p[f"N_{z}_TOP"], N_top)
+        N_bot = np.where(mask, p[f"N_{z}_BOT"], N_bot)
+    M_DL = M_D + M_L
+    sag = M_DL >= 0
+    As_t = np.where(sag, As_bot, As_top)
+    As_c = np.where(sag, As_top, As_bot)
+    c, Icr = cracked_section(bw, d, d2, As_t, As_c, n)
+
+    def curvature(M_tfm):
+        M = M_tfm * TFM_TO_NMM
+        Ie = effective_inertia(M, Mcr, Ig, Icr)
+        return M / (Ec * Ie), Ie
+
+    k_D, _ = curvature(M_D)
+    k_DL, Ie_DL = curvature(M_DL)
+    k_sus, _ = curvature(M_D + psi * M_L)
+    dl_D = deflection(x_mm, k_D)
+    dl_DL = deflection(x_mm, k_DL)
+    dl_sus = deflection(x_mm, k_sus)
+    dl_L = dl_DL - dl_D
+
+    j = np.argmax(dl_DL, axis=1)
+    rows = np.arange(shape[0])
+    rho_c = As_c[rows, j] / (bw[:, 0] * d[:, 0])
+    lam = xi / (1 + 50 * rho_c)
+    dl_LT = lam[:, None] * dl_sus
+
+    # crack control (ACI 318-19 24.3.2) with the cracked-section service stress
+    fs = np.minimum(n * np.abs(M_DL) * TFM_TO_NMM * (d - c) / Icr, p['fy'])
+    n_bars = np.maximum(np.where(sag, N_bot, N_top), 2)
+    cc = p['cover'] + p['db_st']
+    s_bars = (bw - 2 * cc - p['db']) / (n_bars - 1)
+    with np.errstate(divide='ignore'):
+        s_max = np.minimum(380 * (280 / fs) - 2.5 * cc, 300 * (280 / fs))
+    dc = cc + p['db'] / 2
+    beta = (h - c) / (d - c)
+    w = 11e-6 * beta * fs * np.cbrt(dc * 2 * dc * bw / n_bars)
+    cracked = np.abs(M_DL) * TFM_TO_NMM > Mcr
+    crack_ok = ~cracked | ((s_bars <= s_max) & (w <= w_max))
+
+    live_max = dl_L.max(axis=1)
+    total_max = (dl_LT + dl_L).max(axis=1)
+    return {
+        'x': x, 't': t, 'span_mm': span, 'M_D': M_D, 'M_DL': M_DL,
+        'Ec': Ec[:, 0], 'Ig': Ig[:, 0], 'Mcr_tfm': Mcr[:, 0] / TFM_TO_NMM,
+        'c': c, 'Icr': Icr, 'Ie': Ie_DL, 'curvature': k_DL,
+        'defl_D': dl_D, 'defl_DL': dl_DL, 'defl_L': dl_L, 'defl_LT': dl_LT,
+        'max_station': j, 'rho_comp': rho_c, 'lambda': lam,
+        'defl_L_max': live_max, 'defl_total_max': total_max,
+        'live_allow': span / live_limit, 'total_allow': span / total_limit,
+        'live_ok': live_max <= span / live_limit, 'total_ok': total_max <= span / total_limit,
+        'fs': fs, 's_bars': s_bars, 's_max': s_max, 'crack_width': w, 'w_max': w_max, 'cracked': cracked,
+        'crack_ok': crack_ok.all(axis=1),
+        'ok': (live_max <= span / live_limit) & (total_max <= span / total_limit) & crack_ok.all(axis=1),
+        'limits': (live_limit, total_limit),
+    }
+
+
+def service_rows(res, i=0):
+    """Report rows (a section to insert before the final status) for beam ``i`` of a service_batch result."""
+    live_limit, total_limit = res['limits']
+    j = int(res['max_station'][i])
+    span = res['span_mm'][i]
+
+    def ok(flag):
+        return "OK" if flag else "FAIL"
+
+    rows = [["SECTION", "2.3 SERVICEABILITY (ACI 318-19 24.2, 24.3)", "", "", "", "", ""],
+            ["Ec, Ig", "4700√fc', bh³/12", f"Ec = {fmt(res['Ec'][i], 0)} MPa",
+             f"{fmt(res['Ig'][i] / 1e6, 0)}×10⁶", "mm⁴", ""],
+            ["Mcr", "0.62√fc' · Ig / yt", "-", f"{fmt(res['Mcr_tfm'][i], 3)}", "tf-m", ""],
+            ["Icr / Ie at max. deflection", "cracked section, ACI 24.2.3.5b",
+             f"x = {fmt(res['x'][i, j], 2)} m, Ma = {fmt(res['M_DL'][i, j], 3)} tf-m",
+             f"{fmt(res['Icr'][i, j] / 1e6, 0)} / {fmt(res['Ie'][i, j] / 1e6, 0)}×10⁶", "mm⁴", ""],
+            ["Immediate deflection (D)", "∬ M / (Ec·Ie) dx", "-", f"{fmt(res['defl_D'][i].max(), 2)}", "mm", ""]]
+    rows.append(["Immediate deflection (L)", f"≤ L/{fmt(live_limit, 0)} = {fmt(span / live_limit, 1)} mm", "-",
+                 f"{fmt(res['defl_L_max'][i], 2)}", "mm", ok(res['live_ok'][i])])
+    rows.append(["Long-term factor λΔ", "ξ / (1 + 50ρ')", f"ρ' = {fmt(res['rho_comp'][i], 4)}",
+                 f"{fmt(res['lambda'][i], 2)}", "-", ""])
+    rows.append(["Long-term + live deflection", f"≤ L/{fmt(total_limit, 0)} = {fmt(span / total_limit, 1)} mm",
+                 "-", f"{fmt(res['defl_total_max'][i], 2)}", "mm", ok(res['total_ok'][i])])
+    cracked = res['cracked'][i]
+    if cracked.any():
+        ratio = np.where(cracked, res['s_bars'][i] / res['s_max'][i], 0.0)
+        k = int(np.argmax(ratio))
+        rows.append(["Crack control (bar spacing)", "s ≤ 380(280/fs) − 2.5cc ≤ 300(280/fs)",
+                     f"x = {fmt(res['x'][i, k], 2)} m, fs = {fmt(res['fs'][i, k], 0)} MPa",
+                     f"{fmt(res['s_bars'][i, k], 0)} ≤ {fmt(res['s_max'][i, k], 0)}", "mm",
+                     ok(res['s_bars'][i, k] <= res['s_max'][i, k])])
+        k = int(np.argmax(np.where(cracked, res['crack_width'][i], 0.0)))
+        rows.append(["Crack width (Gergely-Lutz)", f"w ≤ {fmt(res['w_max'], 2)} mm",
+                     f"x = {fmt(res['x'][i, k], 2)} m", f"{fmt(res['crack_width'][i, k], 3)}", "mm",
+                     ok(res['crack_width'][i, k] <= res['w_max'])])
+    else:
+        rows.append(["Crack control", "Ma ≤ Mcr at every station", "uncracked", "-", "-", "OK"])
+    return rows
+
+
+def span_service_diagrams(beam, dead, live, span, per_span=41):
+    """x (m, from the left support), M_D and M_L (tf-m) of one span of a continuous.ContinuousBeam.
+
+    The live diagram is the pattern with the largest sagging moment at mid-span.
+    """
+    from continuous import live_load_patterns
+
+    n = len(beam.spans)
+    dead = np.broadcast_to(np.asarray(dead, dtype=float), (n,))
+    live = np.broadcast_to(np.asarray(live, dtype=float), (n,))
+    x, idx, M, _ = beam.diagrams(np.vstack([dead, live_load_patterns(n) * live]), per_span)
+    on = idx == span
+    M = M[:, on]
+    mid = per_span // 2
+    return x[on] - beam.nodes[span], M[0], M[1 + int(np.argmax(M[1:, mid]))]
+
+
+def load_service_diagrams(path, beam_ids, stations=41):
+    """x, M_D, M_L arrays (beams, stations) from a CSV with beam_id, x, M_D, M_L, resampled uniformly."""
+    by_beam = {}
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for r in csv.DictReader(f):
+            by_beam.setdefault(r['beam_id'], []).append((float(r['x']), float(r['M_D']), float(r['M_L'])))
+    x = np.empty((len(beam_ids), stations))
+    M_D = np.empty_like(x)
+    M_L = np.empty_like(x)
+    for i, b in enumerate(beam_ids):
+        if b not in by_beam:
+            raise ValueError(f"no service diagram for beam '{b}'")
+        xs, md, ml = np.array(sorted(by_beam[b])).T
+        x[i] = np.linspace(xs[0], xs[-1], stations)
+        M_D[i] = np.interp(x[i], xs, md)
+        M_L[i] = np.interp(x[i], xs, ml)
+    return x, M_D, M_L
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Deflection and crack control of a schedule from service moments.")
+    ap.add_argument('schedule', help="CSV or JSON schedule (batch_run format)")
+    ap.add_argument('diagrams', help="CSV with beam_id, x (m), M_D, M_L (tf-m, sagging positive)")
+    ap.add_argument('--stations', type=int, default=41)
+    ap.add_argument('--psi', type=float, default=0.0, help="sustained fraction of the live load")
+    ap.add_argument('--xi', type=float, default=XI, help="time-dependent factor ξ")
+    ap.add_argument('--live-limit', type=float, default=LIVE_LIMIT, help="immediate live deflection ≤ L / this")
+    ap.add_argument('--total-limit', type=float, default=TOTAL_LIMIT, help="long-term + live ≤ L / this")
+    ap.add_argument('--w-max', type=float, default=W_MAX, help="crack width limit (mm)")
+    ap.add_argument('--report', help="write the report with the serviceability sections (.zip bundle or .html)")
+    args = ap.parse_args(argv)
+
+    from batch_run import load_schedule
+
+    beams = load_schedule(args.schedule)
+    x, M_D, M_L = load_service_diagrams(args.diagrams, [b['beam_id'] for b in beams], args.stations)
+    res = service_batch(beams, x, M_D, M_L, args.psi, args.xi, args.live_limit, args.total_limit, args.w_max)
+    print(f"{'beam':<12} {'span':>6} {'δL':>7} {'allow':>7} {'δLT+δL':>8} {'allow':>7} {'crack':>6}")
+    for i, b in enumerate(beams):
+        print(f"{b['beam_id']:<12} {res['span_mm'][i] / 1000:>6.2f} {res['defl_L_max'][i]:>7.2f} "
+              f"{res['live_allow'][i]:>7.1f} {res['defl_total_max'][i]:>8.2f} {res['total_allow'][i]:>7.1f} "
+              f"{'OK' if res['crack_ok'][i] else 'FAIL':>6}  {'PASS' if res['ok'][i] else 'FAIL'}")
+    print(f"{int(res['ok'].sum())} of {len(beams)} beams pass serviceability")
+
+    if args.report:
+        from bar_arrangement import insert_rows
+        from batch_run import iter_designed
+        from report_bundle import write_report_file
+
+        designed = ((inputs, insert_rows(rows, service_rows(res, i)), bars, shears)
+                    for i, (inputs, rows, bars, shears) in enumerate(iter_designed(beams)))
+        write_report_file(args.report, designed)
+        print(f"report: {args.report}")
+    return 0 if res['ok'].all() else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
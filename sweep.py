@@ -0,0 +1,229 @@
+"""Vectorized parametric sweep over the ``inputs`` fields.
+
+Any subset of b, h, cover, agg, fc, fy, fyt, mainBar, stirrupBar and the nine
+loads becomes an axis of a regular grid; the other fields keep the values of
+the base ``inputs``.  Each axis array is shaped to broadcast along its own
+grid dimension only, so section_batch evaluates the section quantities (d,
+As_min, As_max, Vc, ...) once per combination of the section axes and the
+load axes reuse them; the six moment cases and three shear locations are
+then designed for the whole grid in one call each to the batch kernels.
+
+Per grid point the sweep gives the largest As_req, the steel ratio
+As_prov / (bw d) and the smallest φ over the active moment cases, the
+densest stirrup spacing, and the strength / spacing / shear / overall PASS
+flags; ``plot_sweep`` draws any of them as a heatmap over two axes with
+contours and the FAIL region hatched.
+
+    python sweep.py beam.json h=40:80:1 fc=210:350:1 -o sweep.png
+    python sweep.py beam.json b=20:40:5 mainBar=DB16,DB20,DB25 mu_M_p=5:25:0.5 --x mu_M_p --y b
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from beam_calc import BAR_INFO, ENGINEERING_KEYS, MU_CASES, VU_CASES
+from design_batch import bar_props, flexure_design_batch, section_batch, shear_design_batch
+
+BAR_FIELDS = ('mainBar', 'stirrupBar')
+MU_FIELDS = tuple(key for _, _, key in MU_CASES)
+VU_FIELDS = tuple(key for _, _, key in VU_CASES)
+SWEEP_FIELDS = ENGINEERING_KEYS
+METRICS = {
+    'As_req': "As,req max (mm²)", 'rho': "ρ = As,prov / (bw d) max", 'phi': "φ flexure min",
+    'n': "bars per face max", 's_prov': "stirrup spacing min (mm)", 'ok': "PASS",
+}
+
+
+def parse_axis(spec):
+    """``field=start:stop:step`` (stop included) or ``field=v1,v2,...`` as (field, values)."""
+    field, _, text = spec.partition('=')
+    field = field.strip()
+    if field not in SWEEP_FIELDS:
+        raise ValueError(f"cannot sweep '{field}'; choose from {', '.join(SWEEP_FIELDS)}")
+    if field in BAR_FIELDS:
+        values = [v.strip() for v in text.split(',') if v.strip()]
+        unknown = [v for v in values if v not in BAR_INFO]
+        if unknown:
+            raise ValueError(f"unknown bar size {', '.join(unknown)} for '{field}'")
+    elif ':' in text:
+        start, stop, step = (float(v) for v in text.split(':'))
+        if not step > 0:
+            raise ValueError(f"step of '{field}' must be positive")
+        values = np.arange(start, stop + step / 2, step).tolist()
+    else:
+        values = [float(v) for v in text.split(',') if v.strip()]
+    if not values:
+        raise ValueError(f"no values for '{field}'")
+    return field, values
+
+
+def sweep(base, axes):
+    """Design the full grid of ``axes`` ({field: values}, grid dimensions in that order).
+
+    Returns the metric arrays (shaped like the grid), 'flexure' / 'shear' with
+    the per-case kernel results (broadcastable to (case, *grid), cases in
+    MU_CASES / VU_CASES order), 'axes' and 'shape'.
+    """
+    names = list(axes)
+    for name in names:
+        if name not in SWEEP_FIELDS:
+            raise ValueError(f"cannot sweep '{name}'")
+    shape = tuple(len(axes[n]) for n in names)
+
+    def field(name):
+        if name not in axes:
+            return base[name]
+        dims = [1] * len(shape)
+        dims[names.index(name)] = -1
+        return np.reshape(axes[name], dims)
+
+    db_main, area_main = bar_props(field('mainBar'))
+    db_st, area_st = bar_props(field('stirrupBar'))
+    sec = section_batch(field('b'), field('h'), field('cover'), field('fc'), field('fy'), field('fyt'),
+                        db_main, db_st, area_st)
+    # loads as (case, *grid); broadcasting against sec reuses it over the load axes
+    Mu = np.stack(np.broadcast_arrays(*(np.asarray(field(k), dtype=float) * np.ones((1,) * len(shape))
+                                        for k in MU_FIELDS)))
+    Vu = np.stack(np.broadcast_arrays(*(np.asarray(field(k), dtype=float) * np.ones((1,) * len(shape))
+                                        for k in VU_FIELDS)))
+    flex = flexure_design_batch(sec, Mu, area_main, field('agg'))
+    shear = shear_design_batch(sec, Vu)
+
+    active = np.broadcast_to(Mu > 0.001, flex['n'].shape)
+    bd = np.broadcast_to(sec['bw'] * sec['d'], shape)
+    res = {
+        'As_req': np.broadcast_to(np.fmax.reduce(flex['As_req'], axis=0), shape),
+        'rho': np.broadcast_to(np.fmax.reduce(np.where(active, flex['As_prov'], np.nan), axis=0), shape) / bd,
+        'phi': np.broadcast_to(np.fmin.reduce(np.where(active, flex['phi'], np.nan), axis=0), shape),
+        'n': np.broadcast_to(flex['n'].max(axis=0), shape),
+        's_prov': np.broadcast_to(shear['s_prov'].min(axis=0), shape),
+        'strength_ok': np.broadcast_to(flex['strength_ok'].all(axis=0), shape),
+        'spacing_ok': np.broadcast_to(flex['spacing_ok'].all(axis=0), shape),
+        'shear_ok': np.broadcast_to(shear['ok'].all(axis=0), shape),
+    }
+    res['ok'] = res['strength_ok'] & res['spacing_ok'] & res['shear_ok']
+    res.update(flexure=flex, shear=shear, axes={n: list(axes[n]) for n in names}, shape=shape)
+    return res
+
+
+def grid_slice(res, x, y, at=None):
+    """Index tuple selecting the (y, x) plane; other axes at ``at`` values (nearest) or their first."""
+    at = at or {}
+    index = []
+    for name, values in res['axes'].items():
+        if name in (x, y):
+            index.append(slice(None))
+        elif name not in at:
+            index.append(0)
+        elif name in BAR_FIELDS:
+            index.append(values.index(at[name]))
+        else:
+            index.append(int(np.argmin(np.abs(np.asarray(values) - float(at[name])))))
+    return tuple(index)
+
+
+def plot_sweep(res, metric, x, y, at=None, ax=None):
+    """Heatmap of ``metric`` over axes ``x`` / ``y`` with contours and the FAIL region hatched."""
+    if ax is None:
+        from matplotlib.figure import Figure
+        ax = Figure(figsize=(6, 4.5)).add_subplot()
+    names = list(res['axes'])
+    index = grid_slice(res, x, y, at)
+    Z = np.asarray(res[metric], dtype=float)[index]
+    ok = res['ok'][index]
+    if names.index(x) < names.index(y):  # rows along y
+        Z, ok = Z.T, ok.T
+
+    def coords(name):
+        values = res['axes'][name]
+        return (np.arange(len(values)), values) if name in BAR_FIELDS else (np.asarray(values, dtype=float), None)
+
+    xs, xlabels = coords(x)
+    ys, ylabels = coords(y)
+    mesh = ax.pcolormesh(xs, ys, Z, shading='nearest', cmap='RdYlGn' if metric == 'ok' else 'viridis')
+    # contours only make sense between numeric values; bar sizes get whole hatched cells
+    smooth = xlabels is None and ylabels is None and len(xs) > 1 and len(ys) > 1
+    if metric != 'ok':
+        ax.figure.colorbar(mesh, ax=ax, label=METRICS.get(metric, metric))
+        if smooth and np.isfinite(Z).sum() > 3:
+            cs = ax.contour(xs, ys, Z, levels=6, colors='white', linewidths=0.6)
+            ax.clabel(cs, fontsize=7, fmt='%.3g')
+    if (~ok).any():
+        if smooth:
+            ax.contourf(xs, ys, (~ok).astype(float), levels=[0.5, 1.5], colors='none', hatches=['///'])
+            if ok.any():
+                ax.contour(xs, ys, ok.astype(float), levels=[0.5], colors='black', linewidths=1.2)
+        else:
+            ax.pcolor(xs, ys, np.ma.masked_where(ok, np.ones(ok.shape)), shading='nearest', hatch='///',
+                      facecolor='none', edgecolor='black', linewidth=0)
+    if xlabels:
+        ax.set_xticks(xs, xlabels)
+    if ylabels:
+        ax.set_yticks(ys, ylabels)
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    ax.set_title(METRICS.get(metric, metric) + ("" if metric == 'ok' else "  (hatched: FAIL)"), fontsize=10)
+    return ax
+
+
+def sweep_figure(res, x, y, metrics=('As_req', 'rho', 'phi', 'ok'), at=None):
+    """One matplotlib Figure with a plot_sweep panel per metric."""
+    from matplotlib.figure import Figure
+
+    cols = min(len(metrics), 2)
+    rows = -(-len(metrics) // cols)
+    fig = Figure(figsize=(6 * cols, 4.5 * rows), layout='constrained')
+    for i, metric in enumerate(metrics):
+        plot_sweep(res, metric, x, y, at, fig.add_subplot(rows, cols, i + 1))
+    return fig
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Sweep inputs fields over a grid and plot the design space.")
+    ap.add_argument('inputs', help="JSON with the base app inputs")
+    ap.add_argument('axes', nargs='+', help="field=start:stop:step or field=v1,v2,...")
+    ap.add_argument('--x', help="field on the plot's x axis (default: first axis)")
+    ap.add_argument('--y', help="field on the plot's y axis (default: second axis)")
+    ap.add_argument('--at', nargs='*', default=[], help="field=value for the other axes of the plot")
+    ap.add_argument('--metrics', default='As_req,rho,phi,ok', help=f"comma separated, from {', '.join(METRICS)}")
+    ap.add_argument('-o', '--output', help="write the plots (PNG, SVG or PDF)")
+    ap.add_argument('--save', help="write the metric arrays and axes to .npz")
+    args = ap.parse_args(argv)
+
+    with open(args.inputs, encoding='utf-8') as f:
+        base = json.load(f)
+    axes = dict(parse_axis(a) for a in args.axes)
+    t0 = time.perf_counter()
+    res = sweep(base, axes)
+    dt = time.perf_counter() - t0
+    n = int(np.prod(res['shape']))
+    print(f"{n:,} points {' x '.join(f'{k}[{len(v)}]' for k, v in axes.items())} in {dt * 1e3:.1f} ms "
+          f"({n / dt:,.0f} points/s)")
+    print(f"PASS {res['ok'].mean():.1%}  (strength {res['strength_ok'].mean():.1%}, "
+          f"spacing {res['spacing_ok'].mean():.1%}, shear {res['shear_ok'].mean():.1%})")
+    for m in ('As_req', 'rho', 'phi'):
+        v = res[m][np.isfinite(res[m])]
+        if v.size:
+            print(f"  {METRICS[m]:<26} {v.min():.4g} – {v.max():.4g}")
+
+    if args.save:
+        np.savez_compressed(args.save, **{k: np.asarray(res[k]) for k in (*METRICS, 'strength_ok', 'spacing_ok',
+                                                                           'shear_ok')},
+                            **{f"axis_{k}": np.asarray(v) for k, v in axes.items()})
+    if args.output:
+        names = list(axes)
+        x = args.x or names[0]
+        y = args.y or (names[1] if len(names) > 1 else None)
+        if y is None:
+            ap.error("plots need two axes")
+        at = dict(a.split('=', 1) for a in args.at)
+        sweep_figure(res, x, y, args.metrics.split(','), at).savefig(args.output, dpi=120)
+        print(f"plots: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
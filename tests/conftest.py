@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+# the modules live at the repository root, next to app.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def schedule():
+    """400 deterministic beams with the spread of bench.make_schedule (PASS and FAIL, zero moments)."""
+    from bench import make_schedule
+
+    return make_schedule(400)
+
+
+@pytest.fixture
+def base():
+    """A passing 30×60 cm beam, the base case of the input-level tests."""
+    return {"project": "P", "beam_id": "B1", "engineer": "", "b": 30, "h": 60, "cover": 4, "agg": 20, "fc": 240,
+            "fy": 4000, "fyt": 2400, "mainBar": "DB20", "stirrupBar": "RB9", "mu_L_n": 15, "mu_L_p": 4,
+            "mu_M_n": 0, "mu_M_p": 10, "mu_R_n": 15, "mu_R_p": 4, "vu_L": 15, "vu_M": 6, "vu_R": 15}
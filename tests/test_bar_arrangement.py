@@ -0,0 +1,74 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from bar_arrangement import DEFAULT_BARS, MAX_PER_SIZE, arrange_failing_cases, mark_resolved, solve_arrangement
+from beam_calc import BAR_INFO, MU_CASES
+from flexure_batch import flexure_limits, flexure_response
+
+
+def brute_force_area(Mu, fc, fy, bw, h, cover, db_st, agg, layer_gap=25.0):
+    """Smallest As of any valid arrangement, enumerated bar by bar without the catalogue."""
+    usable = bw - 2 * (cover + db_st)
+    d_top = h - cover - db_st
+    agg_req = max(25.0, 4 / 3 * agg)
+    bars = [(BAR_INFO[k]['d_mm'], BAR_INFO[k]['A_cm2'] * 100) for k in DEFAULT_BARS]
+    cands = []
+    for (d1, a1), (d2, a2) in itertools.product(bars, repeat=2):
+        for n1, n2 in itertools.product(range(2, MAX_PER_SIZE + 1), range(0, MAX_PER_SIZE + 1)):
+            As = n1 * a1 + n2 * a2
+            if n2 == 0 or d2 < d1:  # one layer, smaller bars between the corners
+                clr = (usable - n1 * d1 - n2 * d2) / (n1 + n2 - 1)
+                if clr >= max(d1, agg_req) - 1:
+                    cands.append((As, d_top - (n1 * a1 * d1 / 2 + n2 * a2 * d2 / 2) / As))
+            if 2 <= n2 <= n1 and d2 <= d1:  # two layers
+                clr1 = (usable - n1 * d1) / (n1 - 1)
+                clr2 = (usable - n2 * d2) / (n2 - 1)
+                if clr1 >= max(d1, agg_req) - 1 and clr2 >= max(d2, agg_req) - 1:
+                    y = (n1 * a1 * d1 / 2 + n2 * a2 * (d1 + layer_gap + d2 / 2)) / As
+                    cands.append((As, d_top - y))
+    As, d = np.array(cands).T
+    As_min, _ = flexure_limits(fc, fy, bw, d)
+    ok = (As >= As_min) & (flexure_response(As, fc, fy, bw, d)['phiMn'] >= Mu)
+    return As[ok].min() if ok.any() else None
+
+
+def test_as_min_bound_at_lowest_d():
+    # As_min governs; the two-layer arrangement has a lower d and needs less As_min
+    arr = solve_arrangement(59.66e6, 21, 300, 300, 500, 30, 6, 20)
+    assert arr['label'] == "2-DB16 / 2-DB12"
+    assert arr['As_prov'] == pytest.approx(628.4)
+
+
+def test_matches_brute_force():
+    rng = np.random.default_rng(8)
+    for _ in range(150):
+        args = (rng.uniform(20e6, 500e6), rng.choice([21.0, 24.0, 28.0, 32.0]), rng.choice([300.0, 400.0]),
+                rng.choice([200.0, 250.0, 300.0, 400.0]), rng.choice([400.0, 500.0, 600.0, 800.0]), 30.0,
+                rng.choice([6.0, 9.0]), rng.choice([20.0, 25.0]))
+        arr = solve_arrangement(*args)
+        ref = brute_force_area(*args)
+        if ref is None:
+            assert arr is None, args
+        else:
+            assert arr is not None and arr['As_prov'] == pytest.approx(ref), args
+
+
+def test_mark_resolved_copies_rows():
+    title = dict((k, t) for k, t, _ in MU_CASES)['L_TOP']
+    rows = [[f"{title}: Clear Spacing", "", "4.2 ≥ 26.7", "FAIL", "mm", "FAIL"],
+            [f"{title}: Check Strength", "", "", "PASS", "-", "PASS"]]
+    out = mark_resolved(rows, {'L_TOP': [['DB28', 'DB20', 'DB20', 'DB28']]})
+    assert out[0][5] == "OK (2.1)" and out[1] is rows[1]
+    assert rows[0][5] == "FAIL"
+    assert mark_resolved(rows, {}) is rows
+
+
+@pytest.mark.parametrize('objective, label', [('area', "Min. area"), ('bars', "Fewest bars")])
+def test_provide_row_names_the_objective(base, objective, label):
+    inputs = dict(base, b=30, mainBar='DB16', mu_M_p=30)  # 2.1 rearranges the mid-span bottom bars
+    layouts, extra = arrange_failing_cases(inputs, objective=objective)
+    provide = [r for r in extra if r[0].endswith(": Provide")]
+    assert list(layouts) == ['M_BOT'] and len(provide) == 1
+    assert provide[0][1].startswith(label + ",")
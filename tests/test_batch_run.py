@@ -0,0 +1,36 @@
+import json
+
+from batch_run import load_done, run_schedule
+
+
+def test_resume_retries_errors(base, tmp_path):
+    beams = [{**base, 'beam_id': f'B{i}'} for i in range(3)]
+    out = tmp_path / 'results.jsonl'
+    bad = {**beams[1], 'mainBar': 'DB99'}
+    stats = run_schedule([beams[0], bad, beams[2]], str(out), workers=1)
+    assert stats['error'] == 1
+    with open(out, 'a', encoding='utf-8') as f:
+        f.write('{"project": "P", "beam_id": "B3", "sta')  # interrupted write
+
+    assert load_done(str(out)) == {('P', 'B0'), ('P', 'B2')}
+    stats = run_schedule(beams, str(out), workers=1)
+    assert stats['designed'] == 1 and stats['error'] == 0
+    recs = [json.loads(line) for line in out.read_text(encoding='utf-8').splitlines()]
+    assert sorted(r['beam_id'] for r in recs) == ['B0', 'B1', 'B2']
+    assert all(r['status'] in ('PASS', 'FAIL') for r in recs)
+
+
+def test_resume_keeps_records_after_a_corrupted_line(base, tmp_path):
+    beams = [{**base, 'beam_id': f'B{i}'} for i in range(4)]
+    out = tmp_path / 'results.jsonl'
+    run_schedule(beams, str(out), workers=1)
+    lines = out.read_text(encoding='utf-8').splitlines(keepends=True)
+    lost = json.loads(lines[1])['beam_id']
+    lines[1] = '{"project": "P", "beam_id": garbage\n'
+    out.write_text(''.join(lines), encoding='utf-8')
+
+    assert load_done(str(out)) == {('P', b['beam_id']) for b in beams if b['beam_id'] != lost}
+    stats = run_schedule(beams, str(out), workers=1)
+    assert stats['designed'] == 1
+    recs = [json.loads(line) for line in out.read_text(encoding='utf-8').splitlines()]
+    assert sorted(r['beam_id'] for r in recs) == ['B0', 'B1', 'B2', 'B3']
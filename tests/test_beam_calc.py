@@ -0,0 +1,59 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from beam_calc import MU_CASES, SECTION_KEYS, beam_result, clear_memo, process_calculation
+
+# process_calculation of the baseline app.py (ac97908) for the `schedule` fixture, JSON encoded
+GOLDEN = os.path.join(os.path.dirname(__file__), 'data', 'process_calculation_baseline.json.gz')
+
+
+@pytest.fixture(scope='module')
+def golden():
+    with gzip.open(GOLDEN, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_matches_baseline(schedule, golden):
+    assert len(golden) == len(schedule)
+    for inputs in schedule:
+        rows, bar_counts, shear_res = json.loads(json.dumps(process_calculation(inputs, memo=False)))
+        expected = golden[inputs['beam_id']]
+        assert rows == expected['rows'], inputs['beam_id']
+        assert bar_counts == expected['bar_counts'], inputs['beam_id']
+        assert shear_res == expected['shear_res'], inputs['beam_id']
+
+
+def test_baseline_covers_fail_and_zero_moments(schedule, golden):
+    assert any(r[5] == "FAIL" for g in golden.values() for r in g['rows'] if r[0] != "SECTION")
+    assert any(inputs[k] == 0 for inputs in schedule for _, _, k in MU_CASES)
+
+
+CHANGED = {'b': 35, 'h': 65, 'cover': 3.5, 'agg': 25, 'fc': 280, 'fy': 3000, 'fyt': 3000, 'mainBar': 'DB16',
+           'stirrupBar': 'RB6'}
+
+
+@pytest.mark.parametrize('field', SECTION_KEYS)
+def test_memo_misses_on_section_change(base, field):
+    clear_memo()
+    rows = beam_result(base).rows()
+    counters = {}
+    changed = beam_result({**base, field: CHANGED[field]}, counters)
+    assert 'section_memo_hits' not in counters
+    assert changed.rows() != rows
+    assert changed.rows() == beam_result({**base, field: CHANGED[field]}, memo=False).rows()
+
+
+def test_memo_reuses_section_on_load_change(base):
+    clear_memo()
+    beam_result(base)
+    for loads in ({'mu_M_p': 12.5}, {'vu_L': 18.0, 'vu_R': 3.0}, {'mu_L_n': 0, 'mu_R_n': 0}):
+        counters = {}
+        r = beam_result({**base, **loads}, counters)
+        assert counters['section_memo_hits'] == 1
+        assert r.rows() == beam_result({**base, **loads}, memo=False).rows()
+    counters = {}
+    beam_result(base, counters)  # every case seen before
+    assert counters.get('solve_calls', 0) == 0
@@ -0,0 +1,123 @@
+import base64
+import gc
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, wait
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from beam_calc import process_calculation
+from beam_report import (PENDING_SECTION, SECTION_CACHE, SectionImageCache, create_beam_section,
+                         create_beam_section_svg, harvest_report_sections, render_beam_section,
+                         render_report_sections, submit_report_sections)
+from instrument import Trace
+
+SVG = '{http://www.w3.org/2000/svg}'
+ARGS = (25, 50, 3.0, 3, 2, "@15cm", 16, 6, "Left Support", 'DB16')
+
+
+@pytest.mark.parametrize('layers, n_bars', [({}, 5),
+                                             ({'top_layers': [['DB20', 'DB16', 'DB20'], ['DB16', 'DB16']]}, 7)])
+def test_svg_is_well_formed(layers, n_bars):
+    root = ET.fromstring(create_beam_section_svg(*ARGS, **layers))
+    assert root.tag == SVG + 'svg'
+    assert len(root.findall(f'.//{SVG}circle')) == n_bars
+    texts = [t.text for t in root.iter(SVG + 'text')]
+    assert texts[0] == "Left Support" and "Stir: @15cm" in texts
+
+
+def test_svg_data_uri_round_trips():
+    SECTION_CACHE.clear()
+    uri = render_beam_section(*ARGS, renderer='svg')
+    head, _, body = uri.partition(',')
+    assert head == "data:image/svg+xml;charset=utf-8"
+    assert urllib.parse.unquote(body) == create_beam_section_svg(*ARGS)
+
+
+def _figures():
+    from matplotlib.figure import Figure
+
+    gc.collect()
+    return sum(isinstance(o, Figure) for o in gc.get_objects())
+
+
+def test_png_renderer_uses_bare_figures_and_frees_them():
+    from matplotlib.figure import Figure
+    import matplotlib.pyplot as plt
+
+    fig = create_beam_section(*ARGS)
+    assert isinstance(fig, Figure) and not plt.get_fignums()
+    del fig
+    SECTION_CACHE.clear()
+    before = _figures()
+    uri = render_beam_section(*ARGS, renderer='png')
+    assert base64.b64decode(uri.partition(',')[2]).startswith(b'\x89PNG')
+    assert render_beam_section(*ARGS, renderer='png') == uri
+    assert (SECTION_CACHE.hits, SECTION_CACHE.misses) == (1, 1)
+    assert _figures() == before and not plt.get_fignums()
+
+
+def test_section_cache_lru():
+    cache = SectionImageCache(maxsize=2)
+    cache.put('a', 'A')
+    cache.put('b', 'B')
+    assert cache.get('a') == 'A'  # 'b' is now the least recently used
+    cache.put('c', 'C')
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A' and cache.get('c') == 'C'
+    assert cache.info()['size'] == 2
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_unchanged_sections_reuse_their_images(base):
+    SECTION_CACHE.clear()
+    _, bars, shear = process_calculation(base)
+    reuse = {}
+    first = render_report_sections(base, bars, shear, 'svg', reuse=reuse)
+    assert len(reuse) == 3
+
+    # only the mid-span stirrups change
+    changed = dict(base, vu_M=20.0)
+    _, bars2, shear2 = process_calculation(changed)
+    assert shear2['V_M'] != shear['V_M'] and shear2['V_L'] == shear['V_L']
+    trace = Trace()
+    second = render_report_sections(changed, bars2, shear2, 'svg', reuse=reuse, trace=trace)
+    assert trace.counters['section_reused'] == 2
+    assert trace.counters['section_cache_misses'] == 1
+    assert second[0] == first[0] and second[2] == first[2] and second[1] != first[1]
+    assert list(reuse.values()) == second
+
+
+@pytest.mark.parametrize('renderer', ['svg', 'png'])
+def test_background_rendering_matches_render_report_sections(base, renderer):
+    _, bars, shear = process_calculation(base)
+    SECTION_CACHE.clear()
+    reuse = {}
+    with ThreadPoolExecutor(3) as ex:
+        jobs = submit_report_sections(base, bars, shear, renderer, reuse=reuse, executor=ex)
+        wait([f for _, f in jobs])
+    images = harvest_report_sections(jobs, reuse)
+    assert PENDING_SECTION not in images
+    assert list(reuse.values()) == images
+    SECTION_CACHE.clear()
+    assert images == render_report_sections(base, bars, shear, renderer)
+
+
+def test_harvest_shows_pending_until_drawn(base):
+    _, bars, shear = process_calculation(base)
+    SECTION_CACHE.clear()
+    gate = threading.Event()
+    reuse = {'stale': 'image'}
+    with ThreadPoolExecutor(1) as ex:
+        ex.submit(gate.wait)  # the drawings queue behind this
+        jobs = submit_report_sections(base, bars, shear, 'svg', reuse=reuse, executor=ex)
+        assert harvest_report_sections(jobs, reuse) == [PENDING_SECTION] * 3
+        assert reuse == {'stale': 'image'}  # only replaced once every image is done
+        gate.set()
+        wait([f for _, f in jobs])
+    images = harvest_report_sections(jobs, reuse)
+    assert PENDING_SECTION not in images and list(reuse.values()) == images
+    # the drawings went into SECTION_CACHE, so the next submit finishes at once
+    again = submit_report_sections(base, bars, shear, 'svg', executor=ex)
+    assert all(f.done() for _, f in again) and harvest_report_sections(again) == images
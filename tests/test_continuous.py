@@ -0,0 +1,81 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from continuous import ContinuousBeam, analyze, live_load_patterns, parse_spans
+
+
+def test_simple_span():
+    x, _, M, V = ContinuousBeam([6.0]).diagrams([[2.0]], per_span=13)
+    assert M[0].max() == pytest.approx(2.0 * 6.0 ** 2 / 8)
+    assert V[0, 0] == pytest.approx(2.0 * 6.0 / 2)
+    assert M[0, 0] == pytest.approx(0.0, abs=1e-12) and M[0, -1] == pytest.approx(0.0, abs=1e-12)
+
+
+def test_fixed_fixed_span():
+    _, _, M, _ = ContinuousBeam([5.0], left='fixed', right='fixed').diagrams([[3.0]], per_span=11)
+    w, L = 3.0, 5.0
+    assert M[0, 0] == pytest.approx(-w * L ** 2 / 12)
+    assert M[0, 5] == pytest.approx(w * L ** 2 / 24)
+
+
+def test_two_equal_spans():
+    w, L = 1.5, 4.0
+    beam = ContinuousBeam([L, L])
+    M_ab, M_ba = beam.end_moments([[w, w]])
+    assert M_ba[0, 0] == pytest.approx(w * L ** 2 / 8)  # clockwise on span 1 at the middle support
+    _, _, M, V = beam.diagrams([[w, w]], per_span=9)
+    assert M[0, 8] == pytest.approx(-w * L ** 2 / 8)
+    assert V[0, 0] == pytest.approx(3 * w * L / 8)
+    assert V[0, 8] == pytest.approx(-5 * w * L / 8)
+
+
+def test_three_equal_spans_and_ei_scaling():
+    w, L = 2.0, 5.0
+    for EI in (1.0, 3.7e4):
+        _, _, M, _ = ContinuousBeam([L, L, L], EI=EI).diagrams([[w, w, w]], per_span=5)
+        assert M[0, 4] == pytest.approx(-w * L ** 2 / 10)
+        assert M[0, 9] == pytest.approx(-w * L ** 2 / 10)
+
+
+def test_combinations_superpose():
+    beam = ContinuousBeam([6.0, 5.0, 6.0])
+    x, span, Mu, Vu, names = analyze(beam, 2.5, 1.2)
+    pats = live_load_patterns(3)
+    assert len(names) == 1 + len(pats)
+    _, _, M_d, _ = beam.diagrams([[2.5] * 3])
+    _, _, M_l, _ = beam.diagrams(pats * 1.2)
+    np.testing.assert_allclose(Mu[0], 1.4 * M_d[0])
+    np.testing.assert_allclose(Mu[1:], 1.2 * M_d + 1.6 * M_l)
+
+
+def test_four_span_support_pattern():
+    assert [1, 1, 0, 1] in live_load_patterns(4).tolist()
+    # hogging at the first interior support of four equal spans under unit live load, L = 1
+    _, _, M, _ = ContinuousBeam([1.0] * 4).diagrams(live_load_patterns(4), per_span=3)
+    assert M[:, 2].min() == pytest.approx(-0.1205357, rel=1e-6)
+
+
+@pytest.mark.parametrize('spans, left, right', [([6.0, 5.0, 7.0, 4.5], 'pin', 'pin'),
+                                                ([5.0, 6.5, 4.0, 6.0, 5.5], 'pin', 'fixed'),
+                                                ([4.0] * 6, 'fixed', 'pin')])
+def test_patterns_match_brute_force(spans, left, right):
+    n, per = len(spans), 11
+    beam = ContinuousBeam(spans, left=left, right=right)
+    every = np.array(list(itertools.product((0.0, 1.0), repeat=n)))
+    _, _, M_all, _ = beam.diagrams(every, per)
+    _, _, M_aci, _ = beam.diagrams(live_load_patterns(n), per)
+    supports = per * np.arange(1, n) - 1
+    mids = per * np.arange(n) + per // 2
+    np.testing.assert_allclose(M_aci[:, supports].min(axis=0), M_all[:, supports].min(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(M_aci[:, mids].max(axis=0), M_all[:, mids].max(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(M_aci[:, mids].min(axis=0), M_all[:, mids].min(axis=0), rtol=1e-12)
+
+
+def test_parse_spans():
+    assert parse_spans("6, 6; 5") == [6.0, 6.0, 5.0]
+    assert parse_spans("4.5,") == [4.5]
+    for text in ("", " , ", "6,,x", "6, 0", "-3", "nan"):
+        with pytest.raises(ValueError):
+            parse_spans(text)
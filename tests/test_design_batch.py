@@ -0,0 +1,35 @@
+import numpy as np
+
+from beam_calc import MU_CASES, VU_CASES, beam_result
+from design_batch import bar_props, flexure_design_batch, section_batch, shear_design_batch
+
+
+def test_matches_beam_result(schedule):
+    col = {k: [b[k] for b in schedule] for k in schedule[0]}
+    db_main, area_main = bar_props(col['mainBar'])
+    db_st, area_st = bar_props(col['stirrupBar'])
+    sec = section_batch(col['b'], col['h'], col['cover'], col['fc'], col['fy'], col['fyt'], db_main, db_st, area_st)
+    sec = {k: v[None, :] for k, v in sec.items()}
+    Mu = np.array([col[k] for _, _, k in MU_CASES])
+    Vu = np.array([col[k] for _, _, k in VU_CASES])
+    flex = flexure_design_batch(sec, Mu, area_main, np.asarray(col['agg'], dtype=float))
+    shear = shear_design_batch(sec, Vu)
+
+    for j, inputs in enumerate(schedule):
+        r = beam_result(inputs, memo=False)
+        for i, c in enumerate(r.flexure):
+            assert flex['n'][i, j] == c.n
+            assert flex['strength_ok'][i, j] == c.strength_ok
+            assert flex['spacing_ok'][i, j] == c.spacing_ok
+            if c.active:
+                np.testing.assert_allclose(flex['phiMn'][i, j], c.phiMn, rtol=1e-9)
+        for i, c in enumerate(r.shear):
+            assert shear['s_prov'][i, j] == c.s_prov
+            assert shear['ok'][i, j] == c.ok
+            np.testing.assert_allclose(shear['phiVn_tf'][i, j], c.phiVn_tf, rtol=1e-12)
+
+
+def test_schedule_has_both_outcomes(schedule):
+    # the comparison above is only meaningful if the schedule exercises FAIL as well as PASS
+    ok = [beam_result(b).ok for b in schedule]
+    assert any(ok) and not all(ok)
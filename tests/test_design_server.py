@@ -0,0 +1,42 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from design_server import DesignPool, DesignServer
+
+
+@pytest.fixture
+def server():
+    srv = DesignServer(('127.0.0.1', 0), DesignPool(workers=2))
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield srv.server_address[1]
+    srv.shutdown()
+    srv.server_close()
+    srv.pool.shutdown()
+
+
+def post(port, body, length=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    conn.putrequest('POST', '/design')
+    conn.putheader('Content-Type', 'application/json')
+    conn.putheader('Content-Length', str(len(body)) if length is None else length)
+    conn.endheaders()
+    conn.send(body)
+    resp = conn.getresponse()
+    data = json.loads(resp.read())
+    conn.close()
+    return resp.status, data
+
+
+def test_design(server, base):
+    status, rec = post(server, json.dumps(base).encode())
+    assert status == 200 and rec['status'] == 'PASS'
+
+
+@pytest.mark.parametrize('length', ['abc', '-5'])
+def test_bad_content_length(server, length):
+    status, data = post(server, b'{}', length)
+    assert status == 400 and 'Content-Length' in data['error']
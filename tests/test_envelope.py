@@ -0,0 +1,94 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from envelope import bar_cutoffs, design_envelope, envelopes, load_diagrams, stirrup_zones
+
+L = 6.0
+X = np.linspace(0.0, L, 25)  # every 0.25 m
+
+
+def udl(w):
+    """Simply supported UDL diagrams, one combination per load in ``w`` (tf/m)."""
+    w = np.asarray(w, dtype=float)[:, None]
+    return w * X * (L - X) / 2, w * (L / 2 - X)
+
+
+def test_envelope_maxima():
+    Mu, Vu = udl([6.0, 3.0])
+    env = envelopes(Mu, Vu)
+    assert env['Mu_pos'].max() == pytest.approx(6.0 * L ** 2 / 8)  # wL²/8 at mid-span
+    assert env['Mu_pos'][12] == pytest.approx(27.0)
+    assert not env['Mu_neg'].any()
+    assert env['Vu'][0] == pytest.approx(6.0 * L / 2) and env['Vu'][-1] == pytest.approx(18.0)
+    assert env['Vu'][12] == pytest.approx(0.0)
+    assert (env['Vu_combo'][:12] == 0).all()
+
+
+def test_bar_cutoffs_by_hand():
+    x = np.arange(13) * 0.5
+    n = np.array([2, 2, 2, 3, 3, 4, 4, 4, 3, 3, 2, 2, 2])
+    # level 3 needed at x = 1.5..4.5: from the stations before and after (1.0, 5.0) ± 0.5
+    assert bar_cutoffs(x, n, 0.5) == [{'bars': 3, 'x_start': 0.5, 'x_end': 5.5},
+                                      {'bars': 4, 'x_start': 1.5, 'x_end': 4.5}]
+    # runs reaching a support are clipped to the span
+    assert bar_cutoffs(x, np.r_[3, n[1:]], 0.5)[0] == {'bars': 3, 'x_start': 0.0, 'x_end': 1.0}
+    assert bar_cutoffs(x, np.full(13, 2), 0.5) == []
+
+
+def test_stirrup_zones_by_hand():
+    x = np.arange(7.0)
+    s = stirrup_zones(x, np.array([120, 160, 260, 270, 260, 160, 120.0]))
+    # rounded down to 50 mm: 100, 150, 250, 250, 250, 150, 100; the denser zone takes each boundary station
+    assert [(z['s'], z['x_start'], z['x_end']) for z in s] == [(100, 0, 1), (150, 1, 2), (250, 2, 4),
+                                                              (150, 4, 5), (100, 5, 6)]
+
+
+def test_design_envelope_udl(base):
+    Mu, Vu = udl([6.0, 3.0])
+    res = design_envelope(base, X, Mu, Vu)
+    # d = 600 - 40 - 9 - 20/2 = 541 mm > 12 db = 240 mm
+    assert res['extension_m'] == pytest.approx(0.541)
+    n = res['n_bot']
+    assert (n == n[::-1]).all() and n[12] == n.max() > 2
+    assert res['cutoffs']['top'] == []
+    ext = res['extension_m']
+    for c in res['cutoffs']['bot']:
+        need = np.flatnonzero(n >= c['bars'])
+        assert c['x_start'] == pytest.approx(max(0.0, X[need[0] - 1] - ext))
+        assert c['x_end'] == pytest.approx(min(L, X[need[-1] + 1] + ext))
+    zones = res['zones']
+    assert zones[0]['x_start'] == 0.0 and zones[-1]['x_end'] == L
+    assert [z['s'] for z in zones] == [z['s'] for z in zones[::-1]]
+    assert zones[0]['s'] < zones[len(zones) // 2]['s']  # densest at the supports
+
+
+def test_load_diagrams_csv_and_json():
+    Mu, Vu = udl([6.0, 3.0])
+    lines = ["combo,x,Mu,Vu"] + [f"c{i},{x},{Mu[i, j]},{Vu[i, j]}" for i in range(2) for j, x in enumerate(X)]
+    f = io.BytesIO("\n".join(lines).encode())
+    f.name = 'diagrams.csv'
+    for _ in range(2):  # an upload is read again on the next run
+        x, M, V, names = load_diagrams(f)
+        assert names == ['c0', 'c1'] and np.allclose(x, X) and np.allclose(M, Mu) and np.allclose(V, Vu)
+    f = io.StringIO(json.dumps({'x': X.tolist(), 'combinations': {'c': {'Mu': Mu[0].tolist(),
+                                                                        'Vu': Vu[0].tolist()}}}))
+    f.name = 'd.json'
+    assert np.allclose(load_diagrams(f)[1], Mu[:1])
+
+
+@pytest.mark.parametrize('name, text', [('d.csv', "combo,x,M,Vu\nc,0,1,1\n"),
+                                        ('d.csv', "combo,x,Mu,Vu\nc,0,abc,1\n"),
+                                        ('d.csv', "combo,x,Mu,Vu\nc,0,1\n"),
+                                        ('d.csv', "combo,x,Mu,Vu\n"),
+                                        ('d.csv', "combo,x,Mu,Vu\na,0,1,1\nb,1,1,1\n"),
+                                        ('d.json', '{"x": [0, 1], "combinations": {"c": {"Mu": [1, 2]}}}'),
+                                        ('d.json', '{"x": [0, 1], "combinations": {"c": {"Mu": [1], "Vu": [1]}}}'),
+                                        ('d.json', '[1, 2]')])
+def test_load_diagrams_rejects(name, text):
+    f = io.StringIO(text)
+    f.name = name
+    with pytest.raises(ValueError):
+        load_diagrams(f)
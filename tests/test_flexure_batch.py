@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+import beam_calc
+from flexure_batch import RTOL, flexure_batch, flexure_limits, flexure_response, solve_required_as
+
+
+def section_cases(schedule):
+    """(As_prov, fc, fy, bw, d, Mu, As_min, As_max) for every moment case process_calculation designs."""
+    out = []
+    for inp in schedule:
+        r = beam_calc.beam_result(inp, memo=False)
+        for c in r.flexure:
+            if c.active:
+                out.append((c.As_prov, r.fc, r.fy, r.bw, r.d, c.Mu_Nmm, r.As_min, r.As_max))
+    return np.array(out).T
+
+
+def test_response_matches_scalar(schedule):
+    As, fc, fy, bw, d, _, As_min, As_max = section_cases(schedule)
+    res = flexure_response(As, fc, fy, bw, d)
+    for i in range(As.size):
+        ref = beam_calc.flexureSectionResponse(As[i], fc[i], fy[i], bw[i], d[i])
+        for k in ('phi', 'phiMn', 'eps_t', 'Mn'):
+            assert res[k][i] == pytest.approx(ref[k], rel=RTOL), (k, i)
+
+
+def test_required_as_matches_scalar(schedule):
+    _, fc, fy, bw, d, Mu, As_min, As_max = section_cases(schedule)
+    As_req = solve_required_as(Mu, As_min, As_max, fc, fy, bw, d)
+    for i in range(Mu.size):
+        ref = beam_calc.solve_required_as(Mu[i], As_min[i], As_max[i], fc[i], fy[i], bw[i], d[i])
+        assert As_req[i] == pytest.approx(ref, rel=RTOL), i
+
+
+def test_limits_and_batch(schedule):
+    As, fc, fy, bw, d, Mu, As_min, As_max = section_cases(schedule)
+    lo, hi = flexure_limits(fc, fy, bw, d)
+    np.testing.assert_allclose(lo, As_min, rtol=RTOL)
+    np.testing.assert_allclose(hi, As_max, rtol=RTOL)
+    res = flexure_batch(As, fc, fy, bw, d, Mu)
+    np.testing.assert_allclose(res['As_req'], solve_required_as(Mu, As_min, As_max, fc, fy, bw, d), rtol=RTOL)
+
+
+def test_beyond_as_max_falls_back():
+    # a moment no As up to As_max carries returns As_max, as the scalar solver does
+    fc, fy, bw, d = 21.0, 400.0, 250.0, 450.0
+    As_min, As_max = (float(v[0]) for v in flexure_limits(fc, fy, bw, d))
+    Mu = 2 * beam_calc.flexureSectionResponse(As_max, fc, fy, bw, d)['phiMn']
+    assert solve_required_as(Mu, As_min, As_max, fc, fy, bw, d)[0] == pytest.approx(
+        beam_calc.solve_required_as(Mu, As_min, As_max, fc, fy, bw, d), rel=RTOL)
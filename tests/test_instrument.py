@@ -0,0 +1,52 @@
+import json
+import logging
+import time
+
+from batch_run import design_beam
+from beam_calc import MU_CASES, beam_result, clear_memo
+from instrument import Trace, aggregate
+
+
+def test_stages_counters_and_payloads():
+    tr = Trace('run', beam_id='B1')
+    for _ in range(2):
+        with tr.stage('draw'):
+            time.sleep(0.01)
+    with tr.stage('html'):
+        pass
+    tr.count('hits')
+    tr.count('hits', 2)
+    tr.payload('html', 'ก' * 10)  # bytes, not characters
+    tr.payload('html', b'1234')
+    d = json.loads(tr.to_json())
+    assert [(s['stage'], s['calls']) for s in d['stages']] == [('draw', 2), ('html', 1)]
+    assert d['stages'][0]['wall_s'] >= 0.02
+    assert d['total_s'] >= d['stages'][0]['wall_s'] + d['stages'][1]['wall_s']
+    assert d['counters'] == {'hits': 3} and d['payload_bytes'] == {'html': 34}
+    assert d['meta'] == {'beam_id': 'B1'}
+
+
+def test_solver_counters(base):
+    tr = Trace()
+    beam_result(base, counters=tr.counters, memo=False)
+    c = tr.counters
+    active = sum(base[k] > 0.001 for _, _, k in MU_CASES)
+    assert c['solve_calls'] == active
+    assert c['bisection_steps'] == 50 * active
+    # every expansion and bisection step evaluates the section, plus one check of the provided bars per case
+    assert c['flexure_calls'] == c['expansion_steps'] + c['bisection_steps'] + active
+    assert c['flexure_iterations'] >= c['flexure_calls']
+
+
+def test_batch_traces_aggregate(base, caplog):
+    clear_memo()  # the first beam solves, the other two hit the memo
+    recs = [design_beam(dict(base, beam_id=f'B{i}'), trace=True)['trace'] for i in range(3)]
+    agg = aggregate(recs)
+    assert agg['runs'] == 3 and agg['stages']['solve']['calls'] == 3
+    assert agg['counters']['solve_calls'] == sum(r['counters'].get('solve_calls', 0) for r in recs)
+    assert agg['counters']['solve_calls'] == recs[0]['counters']['solve_calls'] > 0
+    with caplog.at_level(logging.INFO, logger='beam_design.trace'):
+        tr = Trace('app')
+        tr.count('x')
+        tr.log()
+    assert json.loads(caplog.records[-1].getMessage())['counters'] == {'x': 1}
@@ -0,0 +1,51 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from beam_calc import process_calculation
+from optimizer import (DEFAULT_COST, DEFAULT_DEPTHS, DEFAULT_MAIN_BARS, DEFAULT_STIRRUPS, DEFAULT_WIDTHS,
+                       _evaluate, optimize_section)
+
+# pass/fail flips more than once over h for this beam; only h = 70 passes with DB20 / RB6 at b = 20
+NON_MONOTONIC = dict(cover=4, agg=25, fc=320, fy=3000, fyt=2400, mu_L_n=4.76, mu_L_p=0.0, mu_M_n=0.0,
+                     mu_M_p=0.0, mu_R_n=10.16, mu_R_p=0.0, vu_L=8.8, vu_M=22.0, vu_R=14.5)
+
+
+def random_loads(seed):
+    rng = np.random.default_rng(seed)
+    return dict(cover=float(rng.choice([3, 4])), agg=float(rng.choice([20, 25])),
+                fc=float(rng.choice([240, 280, 320])), fy=float(rng.choice([3000, 4000])), fyt=2400.0,
+                **{k: round(float(rng.uniform(0, 15)), 2)
+                   for k in ('mu_L_n', 'mu_L_p', 'mu_M_n', 'mu_M_p', 'mu_R_n', 'mu_R_p')},
+                **{k: round(float(rng.uniform(0, 30)), 2) for k in ('vu_L', 'vu_M', 'vu_R')})
+
+
+def exhaustive_best(base):
+    """Cheapest design that passes process_calculation, scanning every combination and depth."""
+    best = None
+    for b, h, m, s in itertools.product(DEFAULT_WIDTHS, DEFAULT_DEPTHS, DEFAULT_MAIN_BARS, DEFAULT_STIRRUPS):
+        rows, _, _ = process_calculation(dict(base, b=b, h=h, mainBar=m, stirrupBar=s))
+        if any(r[0] != "SECTION" and r[5] == "FAIL" for r in rows):
+            continue
+        cost = float(_evaluate(base, b, [h], m, s, DEFAULT_COST)['cost'][0])
+        if best is None or cost < best[0]:
+            best = (cost, b, h, m, s)
+    return best
+
+
+def test_non_monotonic_depth():
+    best = optimize_section(NON_MONOTONIC, top_k=1, workers=1)[0]
+    assert (best['b'], best['h'], best['mainBar'], best['stirrupBar']) == (20, 70, 'DB20', 'RB6')
+    assert best['cost'] == pytest.approx(756.44, abs=0.01)
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_matches_exhaustive_scan(seed):
+    base = random_loads(seed)
+    ref = exhaustive_best(base)
+    best = optimize_section(base, top_k=1, workers=1)
+    if ref is None:
+        assert best == []
+    else:
+        assert best[0]['cost'] == pytest.approx(ref[0])
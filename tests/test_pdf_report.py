@@ -0,0 +1,12 @@
+from batch_run import iter_designed
+from pdf_report import build_pdf, pdf_bytes
+
+
+def test_pdf_smoke(schedule):
+    data = pdf_bytes(list(iter_designed(schedule[:3])))
+    assert data.startswith(b'%PDF-') and data.rstrip().endswith(b'%%EOF')
+    assert build_pdf(schedule[:3]).page >= 3
+    # section drawings are form XObjects embedded once, however many beams show them
+    forms = data.count(b'/Subtype /Form')
+    assert 0 < forms <= 9
+    assert pdf_bytes(list(iter_designed(schedule[:3] * 2))).count(b'/Subtype /Form') == forms
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+import project_store
+from batch_run import iter_designed
+from beam_calc import beam_result
+from project_store import ProjectStore
+from result_table import results_table
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ProjectStore(str(tmp_path / 'projects.db')) as s:
+        yield s
+
+
+def test_identical_beams_share_one_result(store, schedule):
+    beams = schedule[:40]
+    assert store.upsert_beams(beams) == {'beams': 40, 'designed': 40, 'reused': 0}
+    copy = [{**b, 'project': "Copy"} for b in beams]
+    assert store.upsert_beams(copy) == {'beams': 40, 'designed': 0, 'reused': 40}
+    assert store._select("SELECT COUNT(*) FROM results") == [(40,)]
+    assert store._select("SELECT COUNT(*) FROM beams") == [(80,)]
+
+
+def test_query_filters_match_recomputing(store, schedule):
+    store.upsert_beams(schedule)
+    results = {b['beam_id']: beam_result(b) for b in schedule}
+    expected = {
+        'spacing': lambda r: not all(c.spacing_ok for c in r.flexure),
+        'shear': lambda r: not all(c.ok for c in r.shear),
+        'strength': lambda r: not all(c.strength_ok for c in r.flexure),
+    }
+    for fails, test in expected.items():
+        got = store.query(project="Benchmark", fails=fails)
+        assert [b for _, b, _ in got] == sorted(k for k, r in results.items() if test(r))
+    assert len(store.query(fails='spacing')) > 0
+    for status in ('PASS', 'FAIL'):
+        got = store.query(status=status)
+        assert [b for _, b, _ in got] == sorted(
+            k for k, r in results.items() if (r.failed_checks() and 'FAIL' or 'PASS') == status)
+        assert all((f != []) == (status == 'FAIL') for _, _, f in got)
+    assert store.query(project="Other") == []
+
+
+def test_delete_beams_removes_orphan_results(store, base):
+    beams = [{**base, 'beam_id': 'B1'}, {**base, 'beam_id': 'B2', 'vu_M': 20}]
+    store.upsert_beams(beams)
+    store.upsert_beams([{**beams[0], 'project': "Q"}])
+    store.delete_beams("P", ['B2'])
+    assert store._select("SELECT COUNT(*) FROM results") == [(1,)]
+    store.delete_beams("P")
+    assert store._select("SELECT COUNT(*) FROM results") == [(1,)]  # still used by project Q
+    store.delete_beams("Q")
+    assert store._select("SELECT COUNT(*) FROM results") == [(0,)]
+
+
+def test_delete_between_read_and_write_keeps_results(store, base, monkeypatch):
+    store.upsert_beams([base])
+    record, calls = project_store.result_record, []
+
+    def delete_then_design(inputs):
+        if not calls:
+            store.delete_beams("P")  # drops the result the second upsert already counted as known
+        calls.append(inputs['beam_id'])
+        return record(inputs)
+
+    monkeypatch.setattr(project_store, 'result_record', delete_then_design)
+    store.upsert_beams([{**base, 'project': "Q"}, {**base, 'project': "Q", 'beam_id': 'B2', 'vu_M': 20}])
+    assert store._select(
+        "SELECT COUNT(*) FROM beams b LEFT JOIN results r ON r.hash = b.hash WHERE r.hash IS NULL") == [(0,)]
+    assert len(store.summary("Q")) == 2 and calls == ['B2', 'B1']
+
+
+def test_table_and_iter_designed_match_recomputing(store, schedule):
+    beams = schedule[:60]
+    store.upsert_beams(beams)
+    ordered = sorted(beams, key=lambda b: b['beam_id'])
+    assert list(store.iter_designed("Benchmark")) == list(iter_designed(ordered))
+
+    got, want = store.table("Benchmark"), results_table([beam_result(b) for b in ordered])
+    assert got.keys() == want.keys()
+    for col in want:
+        if want[col].dtype.kind == 'f':
+            np.testing.assert_array_equal(got[col], want[col])
+        else:
+            assert list(got[col]) == list(want[col])
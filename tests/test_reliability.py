@@ -0,0 +1,73 @@
+import json
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pytest
+
+from reliability import VARIABLES, RunningStats, json_safe, limit_states, margins, merge_spec, run_reliability
+
+
+@pytest.mark.parametrize('kwargs', [{'samples': 0}, {'samples': 100, 'chunk': 0}])
+def test_rejects_empty_runs(base, kwargs):
+    with pytest.raises(ValueError):
+        run_reliability(base, **kwargs)
+
+
+def test_output_is_strict_json(base):
+    res = run_reliability(base, samples=2000, chunk=500, seed=1)
+    assert res['samples'] == 2000
+    json.dumps(json_safe(res), allow_nan=False)
+    assert json_safe({'a': [math.inf, 1.0, (math.nan,)]}) == {'a': [None, 1.0, [None]]}
+
+
+def test_pf_matches_the_normal_load_closed_form(base):
+    # fixed capacities and a normal load multiplier L ~ N(1, σ): g_i = C_i − L·Mu_i fails when
+    # L > C_i / Mu_i, so Pf_i = Φ(−(C_i / Mu_i − 1) / σ) and the beam fails at the smallest ratio
+    fixed = {v: {'dist': 'fixed'} for v in VARIABLES if v != 'load'}
+    model, spec = limit_states(base), merge_spec({**fixed, 'load': {'dist': 'fixed', 'bias': 0.0}})
+    demand = np.array(model['Mu'] + model['Vu'])
+    ratio = margins(model, spec, 1, np.random.default_rng(0))[:, 0] / demand
+    sigma = (ratio.min() - 1) / 2.0  # β = 2 for the governing limit state
+
+    n = 200_000
+    res = run_reliability(base, samples=n, chunk=50_000, seed=3,
+                          spec={**fixed, 'load': {'dist': 'normal', 'std': sigma}})
+    for state, r in zip(res['limit_states'], ratio):
+        pf = NormalDist().cdf(-(r - 1) / sigma)
+        assert abs(state['pf'] - pf) <= 4 * math.sqrt(pf * (1 - pf) / n) + 1e-12
+    pf = NormalDist().cdf(-2.0)
+    assert abs(res['system']['pf'] - pf) <= 4 * math.sqrt(pf * (1 - pf) / n)
+    assert res['system']['beta'] == pytest.approx(2.0, abs=0.05)
+
+
+def test_result_does_not_depend_on_workers(base):
+    one = run_reliability(base, samples=40_000, chunk=10_000, seed=7, workers=1)
+    two = run_reliability(base, samples=40_000, chunk=10_000, seed=7, workers=2)
+    assert one['system'] == two['system'] and one['history'] == two['history']
+    assert [s['g_mean'] for s in one['limit_states']] == [s['g_mean'] for s in two['limit_states']]
+
+
+def test_chunk_size_changes_only_the_sampling_noise(base):
+    # each chunk draws from its own spawned seed, so another chunk size is another (equally valid) sample
+    a = run_reliability(base, samples=100_000, chunk=100_000, seed=5)
+    b = run_reliability(base, samples=100_000, chunk=12_345, seed=5)
+    assert a['samples'] == b['samples'] == 100_000
+    for sa, sb in zip(a['limit_states'], b['limit_states']):
+        se = math.hypot(sa['g_std'], sb['g_std']) / math.sqrt(100_000)
+        assert abs(sa['g_mean'] - sb['g_mean']) <= 5 * se
+        assert sa['g_std'] == pytest.approx(sb['g_std'], rel=0.02)
+    lo, hi = a['system']['pf_95']
+    assert lo - 0.01 <= b['system']['pf'] <= hi + 0.01
+
+
+def test_running_stats_merge_matches_one_pass():
+    g = np.random.default_rng(11).normal([[1.0], [-0.5], [3.0]], [[2.0], [0.1], [5.0]], (3, 1000))
+    total = RunningStats(3)
+    for lo, hi in [(0, 1), (1, 1), (1, 250), (250, 999), (999, 1000)]:
+        total.merge(RunningStats.of(g[:, lo:hi]) if hi > lo else RunningStats(3))
+    assert total.n == 1000
+    np.testing.assert_allclose(total.mean, g.mean(axis=1), rtol=1e-12)
+    np.testing.assert_allclose(total.m2 / (total.n - 1), g.var(axis=1, ddof=1), rtol=1e-12)
+    assert list(total.fails) == list((g < 0).sum(axis=1))
+    assert total.system_fails == int((g < 0).any(axis=0).sum())
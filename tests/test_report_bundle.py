@@ -0,0 +1,39 @@
+import io
+import re
+import zipfile
+
+import pytest
+
+from batch_run import iter_designed
+from beam_report import write_multi_beam_report
+from report_bundle import REPORT_NAME, bundle_bytes, inline_bundle, write_bundle
+
+
+@pytest.fixture
+def beams(schedule):
+    # the first beams twice over: repeated sections must be stored once
+    return schedule[:6] + schedule[:6]
+
+
+def test_bundle_deduplicates_assets(beams):
+    buf = io.BytesIO()
+    info = write_bundle(buf, iter_designed(beams), 'svg').info()
+    assert info['references'] == 3 * len(beams)
+    assert info['assets'] <= 3 * 6
+    with zipfile.ZipFile(buf) as zf:
+        names = set(zf.namelist())
+        html = zf.read(REPORT_NAME).decode('utf-8')
+    refs = set(re.findall(r'src="(assets/[0-9a-f]{64}\.svg)"', html))
+    assert refs == names - {REPORT_NAME}
+    assert 'data:image' not in html
+
+
+def test_bundle_is_deterministic_and_inlines_to_single_file(beams, tmp_path):
+    data = bundle_bytes(iter_designed(beams))
+    assert data == bundle_bytes(iter_designed(beams))
+    path = tmp_path / 'report.zip'
+    path.write_bytes(data)
+    inline_bundle(str(path), str(tmp_path / 'inline.html'))
+    single = io.StringIO()
+    write_multi_beam_report(single, iter_designed(beams))
+    assert (tmp_path / 'inline.html').read_text(encoding='utf-8') == single.getvalue()
@@ -0,0 +1,23 @@
+from result_cache import ResultCache, cached_process_calculation, inputs_hash
+
+
+def test_hash_ignores_metadata_and_extra_fields(base):
+    key = inputs_hash(base)
+    assert inputs_hash({**base, 'project': 'Q', 'beam_id': 'B9', 'engineer': 'X', 'note': 'n'}) == key
+    assert inputs_hash({**base, 'h': '60'}) == key
+    assert inputs_hash({**base, 'h': 65}) != key
+
+
+def test_results_are_copies(base, tmp_path):
+    for cache in (ResultCache(), ResultCache(disk_dir=str(tmp_path))):
+        rows, bars, shear, hit = cached_process_calculation(base, cache)
+        assert not hit
+        expected = [list(r) for r in rows]
+        rows.insert(0, ['changed'])
+        rows[1][0] = 'changed'
+        bars.clear()
+        rows2, bars2, _, hit = cached_process_calculation(base, cache)
+        assert hit and rows2 == expected and bars2
+        rows2.append(['changed'])
+        assert cached_process_calculation(base, cache)[0] == expected
+        assert cache.info()['misses'] == 1
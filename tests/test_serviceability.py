@@ -0,0 +1,85 @@
+import math
+
+import numpy as np
+import pytest
+
+from beam_calc import BAR_INFO
+from serviceability import service_batch
+
+L = 6.0
+X = np.linspace(0.0, L, 201)
+MID = 100
+TFM = 9806650.0
+BARS = {'L_TOP': 3, 'L_BOT': 2, 'M_TOP': 2, 'M_BOT': 4, 'R_TOP': 3, 'R_BOT': 2}
+
+
+def udl(w):
+    return w * X * (L - X) / 2  # tf-m
+
+
+def section(base):
+    """Ec, n, Ig, Mcr (N·mm) of the 30×60 base section, by hand."""
+    fc = base['fc'] * 0.0980665
+    Ec = 4700 * math.sqrt(fc)
+    Ig = 300 * 600 ** 3 / 12
+    return Ec, 200000 / Ec, Ig, 0.62 * math.sqrt(fc) * Ig / 300
+
+
+def test_uncracked_udl_matches_closed_form(base):
+    Ec, _, Ig, Mcr = section(base)
+    w = 0.5  # tf/m: wL²/8 = 2.25 tf-m, below 2/3 Mcr
+    assert w * L ** 2 / 8 * TFM < 2 / 3 * Mcr
+    res = service_batch([(base, BARS)], X, udl(w), np.zeros_like(X))
+    w_Nmm = w * 9.80665  # N/mm
+    expected = 5 * w_Nmm * (L * 1000) ** 4 / (384 * Ec * Ig)
+    assert res['defl_D'][0].max() == pytest.approx(expected, rel=1e-4)
+    assert res['Ie'][0] == pytest.approx(Ig)
+    assert not res['cracked'].any() and res['ok'][0]
+
+
+def test_cracked_midspan_by_hand(base):
+    Ec, n, Ig, Mcr = section(base)
+    res = service_batch([(base, BARS)], X, udl(2.0), udl(2.0))
+    Ma = 4.0 * L ** 2 / 8 * TFM  # 18 tf-m at mid-span, D + L
+    assert Ma > Mcr and res['cracked'][0, MID]
+
+    db, cover, db_st = BAR_INFO['DB20']['d_mm'], 40.0, BAR_INFO['RB9']['d_mm']
+    d = 600 - cover - db_st - db / 2
+    d2 = 600 - d
+    As, As2 = 4 * 314.2, 2 * 314.2
+    # neutral axis: first moment of the transformed section about it is zero
+    lo, hi = 0.0, d
+    for _ in range(100):
+        c = (lo + hi) / 2
+        if 300 * c * c / 2 + (n - 1) * As2 * (c - d2) - n * As * (d - c) > 0:
+            hi = c
+        else:
+            lo = c
+    Icr = 300 * c ** 3 / 3 + n * As * (d - c) ** 2 + (n - 1) * As2 * (c - d2) ** 2
+    Ie = Icr / (1 - (2 / 3 * Mcr / Ma) ** 2 * (1 - Icr / Ig))
+    fs = n * Ma * (d - c) / Icr
+    dc = cover + db_st + db / 2
+    width = 11e-6 * (600 - c) / (d - c) * fs * (dc * 2 * dc * 300 / 4) ** (1 / 3)
+
+    assert res['c'][0, MID] == pytest.approx(c, rel=1e-9)
+    assert res['Icr'][0, MID] == pytest.approx(Icr, rel=1e-9)
+    assert res['Ie'][0, MID] == pytest.approx(Ie, rel=1e-9)
+    assert Icr < res['Ie'][0, MID] < Ig
+    assert res['fs'][0, MID] == pytest.approx(fs, rel=1e-9)
+    assert res['crack_width'][0, MID] == pytest.approx(width, rel=1e-9)
+    # spacing of the 4 bottom bars: (bw - 2 (cover + db_st) - db) / 3
+    assert res['s_bars'][0, MID] == pytest.approx((300 - 2 * (cover + db_st) - db) / 3)
+
+
+def test_rearranged_bars_replace_the_counts(base):
+    layouts = {'M_BOT': [['DB25', 'DB25', 'DB25'], ['DB16', 'DB16']]}
+    M = udl(2.0)
+    res = service_batch([(base, BARS), (base, BARS, layouts), (base, BARS, {})], X, M, M)
+    _, n, _, _ = section(base)
+    d = 600 - 40 - 9 - 10
+    As = 3 * 490.9 + 2 * 201.1  # every bar of both layers
+    c = res['c'][1, MID]
+    assert 300 * c * c / 2 + (n - 1) * 2 * 314.2 * (c - (600 - d)) == pytest.approx(n * As * (d - c))
+    assert res['Icr'][1, MID] > res['Icr'][0, MID]
+    assert res['s_bars'][1, MID] == pytest.approx((300 - 2 * 49 - 20) / 2)  # outer layer: 3 bars
+    assert res['Icr'][2, MID] == res['Icr'][0, MID]
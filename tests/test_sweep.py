@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from beam_calc import beam_result
+from sweep import parse_axis, sweep
+
+def test_parse_axis():
+    assert parse_axis('h=40:60:10') == ('h', [40.0, 50.0, 60.0])
+    assert parse_axis('mainBar=DB16, DB20') == ('mainBar', ['DB16', 'DB20'])
+
+
+@pytest.mark.parametrize('spec', ['h=40:60:0', 'h=60:40:-10', 'h=', 'mainBar=DB99', 'mainBar=', 'span=1,2'])
+def test_parse_axis_rejects(spec):
+    with pytest.raises(ValueError):
+        parse_axis(spec)
+
+
+def test_grid_matches_beam_result(base):
+    axes = dict([parse_axis('h=35:75:10'), parse_axis('mainBar=DB16,DB20,DB25'), parse_axis('mu_M_p=4,12,25')])
+    res = sweep(base, axes)
+    for i, h in enumerate(axes['h']):
+        for j, bar in enumerate(axes['mainBar']):
+            for k, mu in enumerate(axes['mu_M_p']):
+                r = beam_result({**base, 'h': h, 'mainBar': bar, 'mu_M_p': mu}, memo=False)
+                assert res['ok'][i, j, k] == r.ok
+                assert res['n'][i, j, k] == max(c.n for c in r.flexure)
+                assert res['s_prov'][i, j, k] == min(c.s_prov for c in r.shear)
+    assert res['ok'].any() and not res['ok'].all()